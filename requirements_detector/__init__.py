@@ -1,21 +1,37 @@
+from requirements_detector.archives import (
+    find_requirements_in_archive,
+    find_requirements_in_archives,
+)
 from requirements_detector.detect import (  # from_setup_py,
     CouldNotParseRequirements,
+    RequirementSet,
     RequirementsNotFound,
+    SetupModuleCache,
+    SetupPyPool,
     find_requirements,
     from_pyproject_toml,
     from_requirements_blob,
     from_requirements_dir,
     from_requirements_txt,
+    from_setup_cfg,
     from_setup_py,
 )
+from requirements_detector.git import find_requirements_at_revision
 
 __all__ = [
     "CouldNotParseRequirements",
+    "RequirementSet",
     "RequirementsNotFound",
+    "SetupModuleCache",
+    "SetupPyPool",
     "find_requirements",
+    "find_requirements_at_revision",
+    "find_requirements_in_archive",
+    "find_requirements_in_archives",
     "from_pyproject_toml",
     "from_requirements_blob",
     "from_requirements_dir",
     "from_requirements_txt",
+    "from_setup_cfg",
     "from_setup_py",
 ]
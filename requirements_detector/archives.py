@@ -0,0 +1,246 @@
+"""
+Requirements detection inside sdists, wheels and zip archives, in place.
+
+Archives are never extracted: the member list is indexed, the project root is
+located inside it, and only the members which the parsers need are read into
+memory. Wheels carry no setup.py, so their requirements come from the
+`Requires-Dist` fields of the `METADATA` file instead.
+"""
+
+import re
+import tarfile
+import zipfile
+import zlib
+from email.parser import Parser
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from .detect import _find_requirements_in_tree
+from .exceptions import RequirementsNotFound
+from .requirement import DetectedRequirement
+from .tree import SourceTree
+
+__all__ = [
+    "ARCHIVE_SUFFIXES",
+    "find_requirements_in_archive",
+    "find_requirements_in_archives",
+]
+
+
+ARCHIVE_SUFFIXES = (".tar.gz", ".tgz", ".tar.bz2", ".tar.xz", ".tar", ".zip", ".whl")
+
+# files which mark the root of a project inside an archive
+_ROOT_MARKERS = (
+    "setup.py",
+    "setup.cfg",
+    "pyproject.toml",
+    "PKG-INFO",
+    "requirements.txt",
+    "requirements.pip",
+)
+
+
+P = Union[str, Path]
+
+# the extra of a `Requires-Dist` entry which only applies to one, such as
+# `pytest ; extra == "test"`
+_EXTRA = re.compile(r"""\bextra\s*==\s*(["'])(.*?)\1|(["'])(.*?)\3\s*==\s*extra\b""")
+
+# what a corrupt or unreadable archive, or a member which cannot be parsed, can
+# raise: decoding and TOML errors are ValueErrors
+_ARCHIVE_ERRORS = (
+    tarfile.TarError,
+    zipfile.BadZipFile,
+    zlib.error,
+    EOFError,
+    OSError,
+    ValueError,
+)
+
+
+class ArchiveTree(SourceTree):
+    """
+    The project inside an archive, seen from its root. Subclasses only need to
+    know how to read a member.
+    """
+
+    def __init__(self, archive: Path, member_names: Iterable[str]):
+        super().__init__(archive)
+        self._files: Dict[str, Dict[str, str]] = {}
+        self._dirs = set()
+        for member_name in member_names:
+            directory, _, name = member_name.strip("/").rpartition("/")
+            self._files.setdefault(directory, {})[name] = member_name
+            while directory:
+                self._dirs.add(directory)
+                directory = directory.rpartition("/")[0]
+        self._prefix = self._project_root()
+
+    def _project_root(self) -> str:
+        candidates = [
+            directory
+            for directory, files in self._files.items()
+            if any(marker in files for marker in _ROOT_MARKERS)
+        ]
+        if not candidates:
+            return ""
+        return min(candidates, key=lambda directory: (directory.count("/"), directory))
+
+    def _full_name(self, name: str) -> str:
+        name = name.strip("/")
+        if self._prefix and name:
+            return f"{self._prefix}/{name}"
+        return self._prefix or name
+
+    def _member(self, name: str) -> str:
+        directory, _, filename = self._full_name(name).rpartition("/")
+        try:
+            return self._files[directory][filename]
+        except KeyError:
+            raise FileNotFoundError(name)
+
+    def _read_member(self, member_name: str) -> bytes:
+        raise NotImplementedError()
+
+    def list_files(self, directory: str = "") -> List[str]:
+        return list(self._files.get(self._full_name(directory), {}))
+
+    def is_dir(self, directory: str) -> bool:
+        return self._full_name(directory) in self._dirs
+
+    def read_bytes(self, name: str) -> bytes:
+        return self._read_member(self._member(name))
+
+    def location(self, name: str) -> Path:
+        return self.root / self._full_name(name)
+
+    def top_level_directories(self) -> List[str]:
+        """
+        The directories at the top of the archive, whatever the project root.
+        """
+        return sorted(directory for directory in self._dirs if "/" not in directory)
+
+    def read_archive_file(self, name: str) -> bytes:
+        """
+        Reads `name`, which is relative to the top of the archive rather than
+        to the project root.
+        """
+        directory, _, filename = name.strip("/").rpartition("/")
+        try:
+            member_name = self._files[directory][filename]
+        except KeyError:
+            raise FileNotFoundError(name)
+        return self._read_member(member_name)
+
+
+class TarArchiveTree(ArchiveTree):
+    def __init__(self, archive: Path, tar: tarfile.TarFile):
+        self._members = {member.name: member for member in tar if member.isfile()}
+        self._tar = tar
+        super().__init__(archive, self._members)
+
+    def _read_member(self, member_name: str) -> bytes:
+        with self._tar.extractfile(self._members[member_name]) as member:
+            return member.read()
+
+
+class ZipArchiveTree(ArchiveTree):
+    def __init__(self, archive: Path, zip_file: zipfile.ZipFile):
+        self._zip = zip_file
+        super().__init__(
+            archive,
+            [info.filename for info in zip_file.infolist() if not info.is_dir()],
+        )
+
+    def _read_member(self, member_name: str) -> bytes:
+        return self._zip.read(member_name)
+
+
+def _from_metadata(metadata: str, location: Path) -> List[DetectedRequirement]:
+    requirements = []
+    for requires_dist in Parser().parsestr(metadata).get_all("Requires-Dist") or []:
+        req = DetectedRequirement.parse(requires_dist, location)
+        if req is not None:
+            # as for the optional dependencies of a pyproject.toml
+            m = _EXTRA.search(req.markers or "")
+            if m is not None:
+                req.extra = m.group(2) if m.group(1) else m.group(4)
+            requirements.append(req)
+    requirements.sort()
+    return requirements
+
+
+def _find_requirements_in_archive_tree(tree: ArchiveTree) -> List[DetectedRequirement]:
+    if tree.root.name.endswith(".whl"):
+        # the metadata of a wheel is always at its top level, whatever else it holds
+        for directory in tree.top_level_directories():
+            if not directory.endswith(".dist-info"):
+                continue
+            name = f"{directory}/METADATA"
+            try:
+                metadata = tree.read_archive_file(name)
+            except FileNotFoundError:
+                continue
+            return _from_metadata(
+                metadata.decode("utf-8", errors="replace"), tree.root / name
+            )
+        raise RequirementsNotFound
+
+    try:
+        return _find_requirements_in_tree(tree)
+    except RequirementsNotFound:
+        # sdists built by modern backends record their requirements in PKG-INFO
+        if "PKG-INFO" not in tree.list_files():
+            raise
+        requirements = _from_metadata(
+            tree.read_text("PKG-INFO"), tree.location("PKG-INFO")
+        )
+        if not requirements:
+            raise
+        return requirements
+
+
+def find_requirements_in_archive(archive: P) -> List[DetectedRequirement]:
+    """
+    Like `find_requirements`, but for the project packed inside an sdist, a
+    wheel or a zip archive. Nothing is extracted to disk.
+    """
+    if isinstance(archive, str):
+        archive = Path(archive)
+
+    if archive.name.endswith((".zip", ".whl")):
+        with zipfile.ZipFile(archive) as zip_file:
+            return _find_requirements_in_archive_tree(ZipArchiveTree(archive, zip_file))
+
+    if archive.name.endswith(ARCHIVE_SUFFIXES):
+        with tarfile.open(archive, "r:*") as tar:
+            return _find_requirements_in_archive_tree(TarArchiveTree(archive, tar))
+
+    raise ValueError(f"{archive} is not a supported archive")
+
+
+def find_requirements_in_archives(
+    directory: P, errors: Optional[Dict[Path, Exception]] = None
+) -> Dict[Path, List[DetectedRequirement]]:
+    """
+    Runs `find_requirements_in_archive` over every archive in a directory. An
+    archive in which no requirements can be found maps to an empty list. One
+    which is corrupt or cannot be read is left out instead, with its error
+    recorded in `errors` if given, so that a single bad archive does not stop
+    the others from being scanned.
+    """
+    if isinstance(directory, str):
+        directory = Path(directory)
+
+    found = {}
+    for entry in sorted(directory.iterdir()):
+        if not entry.is_file() or not entry.name.endswith(ARCHIVE_SUFFIXES):
+            continue
+        try:
+            found[entry] = find_requirements_in_archive(entry)
+        except RequirementsNotFound:
+            found[entry] = []
+        except _ARCHIVE_ERRORS as e:
+            if errors is not None:
+                errors[entry] = e
+    return found
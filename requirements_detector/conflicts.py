@@ -0,0 +1,141 @@
+"""
+Finds packages whose version constraints cannot all be met at once across many
+projects, such as services which share a deployment image.
+
+Rather than intersecting the constraints of every pair of projects, each
+package is settled with a single sweep: the constraint of every project is
+turned into the ranges of versions it allows, the ends of all the ranges are
+sorted, and walking over them in order finds the versions allowed by the most
+projects at once. Those projects are the largest group which can share a
+version; any project left out of it conflicts with them.
+"""
+
+from typing import Dict, Hashable, Iterable, List, Mapping, NamedTuple, Tuple
+
+from packaging.utils import canonicalize_name
+
+from .poetry_semver.interval_set import _ranges
+from .poetry_semver.version_constraint import VersionConstraint
+from .requirement import DetectedRequirement
+from .requirement_set import RequirementSet
+
+__all__ = ["Conflict", "find_conflicts"]
+
+
+# where a range starts or ends: the rank of a version among all those bounding
+# the ranges, and whether the position is just before it (0), at it (1) or just
+# after it (2); the unbounded ends sort first and last whatever the versions are
+_BEFORE, _AT, _AFTER = 0, 1, 2
+_LOWEST = (-1, 0)
+_HIGHEST = (1 << 62, 0)
+
+# at the same position, a range starting there overlaps one ending there
+_START, _END = 0, 1
+
+
+class Conflict(NamedTuple):
+    name: str
+    # the largest group of projects whose constraints can all be met together
+    compatible: List[Hashable]
+    # the projects whose constraints can't be met along with those
+    conflicting: List[Hashable]
+    constraints: Dict[Hashable, str]
+
+
+def _sweep(constraints: List[Tuple[Hashable, VersionConstraint]]) -> List[Hashable]:
+    """
+    The largest group of projects whose constraints overlap.
+    """
+    ranges = [
+        (index, version_range)
+        for index, (_, constraint) in enumerate(constraints)
+        for version_range in _ranges(constraint)
+    ]
+
+    # comparing versions is slow, so each distinct one is compared only while
+    # ranking them, and the endpoints are then sorted by rank
+    versions = set()
+    for _, version_range in ranges:
+        versions.update(
+            version
+            for version in (version_range.min, version_range.max)
+            if version is not None
+        )
+    rank = {version: position for position, version in enumerate(sorted(versions))}
+
+    events = []
+    for index, version_range in ranges:
+        start = _LOWEST
+        if version_range.min is not None:
+            position = _AT if version_range.include_min else _AFTER
+            start = (rank[version_range.min], position)
+        end = _HIGHEST
+        if version_range.max is not None:
+            position = _AT if version_range.include_max else _BEFORE
+            end = (rank[version_range.max], position)
+        events.append((start, _START, index))
+        events.append((end, _END, index))
+    events.sort()
+
+    active = set()
+    best = set()
+    for _, kind, index in events:
+        if kind == _START:
+            active.add(index)
+            if len(active) > len(best):
+                best = set(active)
+        else:
+            active.discard(index)
+
+    return [project for index, (project, _) in enumerate(constraints) if index in best]
+
+
+def find_conflicts(
+    projects: Mapping[Hashable, Iterable[DetectedRequirement]],
+) -> List[Conflict]:
+    """
+    Returns a `Conflict` for each package required by several of `projects`
+    (a mapping of any label to the requirements of the project) in versions no
+    single release can satisfy. Requirements on the same package within one
+    project are combined first. Constraints which cannot be parsed as version
+    constraints are left out of the analysis.
+    """
+    by_package: Dict[str, List[Tuple[Hashable, VersionConstraint, str]]] = {}
+    for project, requirements in projects.items():
+        if not isinstance(requirements, RequirementSet):
+            requirements = RequirementSet(requirements)
+        seen = set()
+        for requirement in requirements:
+            if not requirement.name:
+                continue
+            # of the entries under different markers, however they spell the
+            # name, the one which applies everywhere
+            name = canonicalize_name(requirement.name)
+            if name in seen:
+                continue
+            seen.add(name)
+            requirement = requirements[name]
+            constraint = requirements.constraint(requirement.name)
+            if constraint is None:
+                continue
+            by_package.setdefault(name, []).append(
+                (project, constraint, requirement._format_specs() or "*")
+            )
+
+    conflicts = []
+    for name, found in sorted(by_package.items()):
+        if len(found) < 2:
+            continue
+        compatible = _sweep([(project, constraint) for project, constraint, _ in found])
+        if len(compatible) == len(found):
+            continue
+        in_group = set(compatible)
+        conflicts.append(
+            Conflict(
+                name=name,
+                compatible=compatible,
+                conflicting=[p for p, _, _ in found if p not in in_group],
+                constraints={project: specs for project, _, specs in found},
+            )
+        )
+    return conflicts
@@ -1,19 +1,20 @@
+import configparser
+import mmap
 import re
-from pathlib import Path
-from typing import List, Optional, Union
+from pathlib import Path, PurePath
+from typing import Callable, Iterable, List, Optional, Sequence, Union
+
+from packaging.utils import canonicalize_name
 
 from .exceptions import CouldNotParseRequirements, RequirementsNotFound
-from .handle_setup import from_setup_py
-from .poetry_semver import parse_constraint
+from .handle_setup import SetupModuleCache, from_setup_py
+from .poetry_semver import Version, VersionUnion, parse_constraint
 from .poetry_semver.version_constraint import VersionConstraint
+from .pyproject import load_dependency_tables
 from .requirement import DetectedRequirement
-
-try:
-    # added in Python 3.11: https://docs.python.org/3/library/tomllib.html
-    import tomllib
-except ImportError:
-    # for Python <= 3.10:
-    import tomli as tomllib
+from .requirement_set import RequirementSet
+from .setup_pool import SetupPyPool
+from .tree import FilesystemTree, SourceTree
 
 __all__ = [
     "find_requirements",
@@ -21,9 +22,13 @@ __all__ = [
     "from_requirements_dir",
     "from_requirements_blob",
     "from_pyproject_toml",
+    "from_setup_cfg",
     "from_setup_py",
     "RequirementsNotFound",
     "CouldNotParseRequirements",
+    "SetupModuleCache",
+    "SetupPyPool",
+    "RequirementSet",
 ]
 
 
@@ -38,85 +43,119 @@ _PIP_OPTIONS = (
 )
 
 
+# requirements files larger than this (in bytes) are memory-mapped and scanned as
+# bytes, so that the comment, hash and option lines which make up most of a
+# large lock export are skipped without ever being decoded
+MMAP_THRESHOLD = 1024 * 1024
+
+_SKIPPED_LINE = re.compile(
+    rb"[ \t\r\f\v]*(?:$|#|--hash=|(?:%s)(?:[ \t\r\f\v]|$))"
+    % b"|".join(re.escape(option.encode("ascii")) for option in _PIP_OPTIONS)
+)
+
+
 P = Union[str, Path]
 
 
-def find_requirements(path: P) -> List[DetectedRequirement]:
+def find_requirements(
+    path: P,
+    lockfiles: bool = False,
+    module_cache: Optional[SetupModuleCache] = None,
+    setup_pool: Optional[SetupPyPool] = None,
+    as_set: bool = False,
+    names_only: bool = False,
+    strategy: Union[str, Sequence[str]] = "default",
+) -> Union[List[DetectedRequirement], RequirementSet]:
     """
     This method tries to determine the requirements of a particular project
     by inspecting the possible places that they could be defined.
 
     It will attempt, in order:
 
-    1) to parse setup.py in the root for an install_requires value
-    2) to read a requirements.txt file or a requirements.pip in the root
-    3) to read all .txt files in a folder called 'requirements' in the root
-    4) to read files matching "*requirements*.txt" and "*reqs*.txt" in the root,
+    1) to read install_requires from setup.cfg in the root, without astroid
+    2) to parse setup.py in the root for an install_requires value
+    3) to read a requirements.txt file or a requirements.pip in the root
+    4) to read all .txt files in a folder called 'requirements' in the root
+    5) to read files matching "*requirements*.txt" and "*reqs*.txt" in the root,
        excluding any starting or ending with 'test'
 
     If one of these succeeds, then a list of pkg_resources.Requirement's
     will be returned. If none can be found, then a RequirementsNotFound
     will be raised
-    """
-    requirements = []
 
+    With `lockfiles=True`, a poetry.lock, uv.lock or Pipfile.lock in the root
+    is tried before anything else, giving the exact pinned versions.
+
+    When scanning many projects, share one `SetupModuleCache` between the calls
+    so that modules which setup.py files import their requirements from are
+    only parsed once. To protect a long scan from pathological setup.py files,
+    pass a `SetupPyPool` to parse them in isolated worker processes instead.
+
+    With `as_set=True`, a `RequirementSet` is returned rather than a list, with
+    one entry per package however many files require it.
+
+    With `names_only=True`, only the name of each package is read, and the
+    requirements carry nothing but their canonical name: no version specifiers
+    or URLs are parsed, which is much faster when only the names are needed.
+
+    `strategy` changes which of those places are used: "first-hit" stops at the
+    first which has any requirements, even a requirements file, "exhaustive"
+    combines them all, and a list of source names, such as
+    `["pyproject.toml", "requirements"]`, tries only those, in that order.
+    """
     if isinstance(path, str):
         path = Path(path)
 
-    setup_py = path / "setup.py"
-    if setup_py.exists() and setup_py.is_file():
-        try:
-            requirements = from_setup_py(setup_py)
-            requirements.sort()
-            return requirements
-        except CouldNotParseRequirements:
-            pass
-
-    poetry_toml = path / "pyproject.toml"
-    if poetry_toml.exists() and poetry_toml.is_file():
-        try:
-            requirements = from_pyproject_toml(poetry_toml)
-            if len(requirements) > 0:
-                requirements.sort()
-                return requirements
-        except CouldNotParseRequirements:
-            pass
-
-    for reqfile_name in ("requirements.txt", "requirements.pip"):
-        reqfile = path / reqfile_name
-        if reqfile.exists and reqfile.is_file():
-            try:
-                requirements += from_requirements_txt(reqfile)
-            except CouldNotParseRequirements:
-                pass
-
-    requirements_dir = path / "requirements"
-    if requirements_dir.exists() and requirements_dir.is_dir():
-        from_dir = from_requirements_dir(requirements_dir)
-        if from_dir is not None:
-            requirements += from_dir
-
-    from_blob = from_requirements_blob(path)
-    if from_blob is not None:
-        requirements += from_blob
-
-    requirements = list(set(requirements))
-    if len(requirements) > 0:
-        requirements.sort()
-        return requirements
-
-    raise RequirementsNotFound
+    requirements = _find_requirements_in_tree(
+        FilesystemTree(path), lockfiles, module_cache, setup_pool, names_only, strategy
+    )
+    if as_set:
+        return RequirementSet(requirements)
+    return requirements
+
+
+def _find_requirements_in_tree(
+    tree: SourceTree,
+    lockfiles: bool = False,
+    module_cache: Optional[SetupModuleCache] = None,
+    setup_pool: Optional[SetupPyPool] = None,
+    names_only: bool = False,
+    strategy: Union[str, Sequence[str]] = "default",
+) -> List[DetectedRequirement]:
+    # the sources are read by the stages of a pipeline, which imports from here
+    from .pipeline import Pipeline
+
+    pipeline = Pipeline(
+        lockfiles=lockfiles,
+        module_cache=module_cache,
+        setup_pool=setup_pool,
+        names_only=names_only,
+        strategy=strategy,
+    )
+    return pipeline.detect(tree)
+
+
+def _names_only(requirements: List[DetectedRequirement]) -> List[DetectedRequirement]:
+    # for sources which are quick to read in full, such as lockfiles
+    return [
+        DetectedRequirement(
+            name=canonicalize_name(req.name),
+            location_defined=req.location_defined,
+            group=req.group,
+            extra=req.extra,
+        )
+        for req in requirements
+        if req.name
+    ]
 
 
 def _version_from_spec(spec: Union[list, dict, str]) -> Optional[VersionConstraint]:
     if isinstance(spec, list):
-        constraint = None
-        for new_constraint in [_version_from_spec(s) for s in spec]:
-            if constraint is None:
-                constraint = new_constraint
-            elif new_constraint is not None:
-                constraint = constraint.union(new_constraint)
-        return constraint
+        constraints = [_version_from_spec(s) for s in spec]
+        constraints = [c for c in constraints if c is not None]
+        if not constraints:
+            return None
+        return VersionConstraint.union_all(constraints)
 
     if isinstance(spec, dict):
         if "version" in spec:
@@ -127,77 +166,378 @@ def _version_from_spec(spec: Union[list, dict, str]) -> Optional[VersionConstrai
     return parse_constraint(spec)
 
 
-def from_pyproject_toml(toml_file: P) -> List[DetectedRequirement]:
-    requirements = []
+def _python_marker(python: str) -> Optional[str]:
+    """
+    The environment marker for a Poetry `python` constraint, such as
+    `python_version >= "3.8" and python_version < "4.0"` for "^3.8".
+    """
+    constraint = parse_constraint(python)
+    if constraint.is_any():
+        return None
+    if constraint.is_empty():
+        return 'python_version < "0"'
+
+    alternatives = []
+    ranges = constraint.ranges if isinstance(constraint, VersionUnion) else [constraint]
+    for version_range in ranges:
+        comparisons = []
+        bounds = (
+            (version_range.min, ">=" if version_range.include_min else ">"),
+            (version_range.max, "<=" if version_range.include_max else "<"),
+        )
+        if isinstance(version_range, Version):
+            bounds = ((version_range, "=="),)
+        for version, operator in bounds:
+            if version is None:
+                continue
+            # python_version only has the major and minor versions
+            variable = "python_version"
+            if version.text.count(".") >= 2:
+                variable = "python_full_version"
+            comparisons.append('%s %s "%s"' % (variable, operator, version.text))
+        alternatives.append(" and ".join(comparisons))
+
+    if len(alternatives) == 1:
+        return alternatives[0]
+    return " or ".join("(%s)" % alternative for alternative in alternatives)
+
 
+def _markers_from_spec(spec: Union[list, dict, str]) -> Optional[str]:
+    """
+    The environment markers of a Poetry dependency: its `markers` and its
+    `python` constraint together. Of multiple constraints, the requirement
+    applies wherever any of them does.
+    """
+    if isinstance(spec, list):
+        markers = [_markers_from_spec(s) for s in spec]
+        if not markers or None in markers:
+            return None
+        markers = list(dict.fromkeys(markers))
+        if len(markers) == 1:
+            return markers[0]
+        return " or ".join("(%s)" % m for m in markers)
+
+    if not isinstance(spec, dict):
+        return None
+
+    markers = [spec["markers"]] if spec.get("markers") else []
+    if spec.get("python"):
+        try:
+            python = _python_marker(spec["python"])
+        except ValueError:
+            python = None
+        if python is not None:
+            markers.append(python)
+
+    if not markers:
+        return None
+    if len(markers) == 1:
+        return markers[0]
+    return " and ".join("(%s)" % m for m in markers)
+
+
+def from_pyproject_toml(
+    toml_file: P, include_build_system: bool = False, names_only: bool = False
+) -> List[DetectedRequirement]:
+    """
+    Reads every dependency table of a pyproject.toml file in a single parse:
+    PEP 621 `project.dependencies` and `project.optional-dependencies`, and
+    Poetry's main, `dev-dependencies` and `group.*.dependencies` tables. The
+    `group` or `extra` each requirement was declared in is recorded on it.
+    Only the tables which can hold these are parsed, not the configuration of
+    other tools.
+
+    `build-system.requires` is only included (in the "build-system" group) if
+    asked for, as those are not requirements of the project itself.
+    """
     if isinstance(toml_file, str):
         toml_file = Path(toml_file)
 
-    with open(toml_file, "rb") as toml_file_open:
-        parsed = tomllib.load(toml_file_open)
+    parsed = load_dependency_tables(toml_file.read_bytes())
+
+    return _from_pyproject_data(parsed, toml_file, include_build_system, names_only)
+
+
+def _from_pyproject_data(
+    parsed: dict,
+    toml_file: Path,
+    include_build_system: bool = False,
+    names_only: bool = False,
+) -> List[DetectedRequirement]:
+    requirements = []
+
+    project_section = parsed.get("project", {})
+    requirements += _from_pep508_list(
+        project_section.get("dependencies", []), toml_file, names_only=names_only
+    )
+    for extra, lines in project_section.get("optional-dependencies", {}).items():
+        requirements += _from_pep508_list(
+            lines, toml_file, extra=extra, names_only=names_only
+        )
 
     poetry_section = parsed.get("tool", {}).get("poetry", {})
-    dependencies = poetry_section.get("dependencies", {})
-    dependencies.update(poetry_section.get("dev-dependencies", {}))
+    # optional Poetry dependencies are only installed as part of an extra
+    poetry_extras = {}
+    for extra, names in poetry_section.get("extras", {}).items():
+        for name in names:
+            poetry_extras.setdefault(name.lower(), extra)
+
+    requirements += _from_poetry_dependencies(
+        poetry_section.get("dependencies", {}),
+        toml_file,
+        poetry_extras,
+        names_only=names_only,
+    )
+    requirements += _from_poetry_dependencies(
+        poetry_section.get("dev-dependencies", {}),
+        toml_file,
+        poetry_extras,
+        group="dev",
+        names_only=names_only,
+    )
+    for group, group_section in poetry_section.get("group", {}).items():
+        requirements += _from_poetry_dependencies(
+            group_section.get("dependencies", {}),
+            toml_file,
+            poetry_extras,
+            group=group,
+            names_only=names_only,
+        )
+
+    if include_build_system:
+        requirements += _from_pep508_list(
+            parsed.get("build-system", {}).get("requires", []),
+            toml_file,
+            group="build-system",
+            names_only=names_only,
+        )
+
+    return requirements
+
+
+def _from_pep508_list(
+    lines: List[str],
+    toml_file: Path,
+    group: Optional[str] = None,
+    extra: Optional[str] = None,
+    names_only: bool = False,
+) -> List[DetectedRequirement]:
+    requirements = []
+    for line in lines:
+        req = DetectedRequirement.parse(line, toml_file, names_only)
+        if req is not None:
+            req.group = group
+            req.extra = extra
+            requirements.append(req)
+    return requirements
+
+
+def _from_poetry_dependencies(
+    dependencies: dict,
+    toml_file: Path,
+    poetry_extras: dict,
+    group: Optional[str] = None,
+    names_only: bool = False,
+) -> List[DetectedRequirement]:
+    requirements = []
 
     for name, spec in dependencies.items():
         if name.lower() == "python":
             continue
 
-        parsed_spec_obj = _version_from_spec(spec)
+        if names_only:
+            # the keys are the names, so the specs need not be read at all
+            parsed_spec_obj = None
+        else:
+            parsed_spec_obj = _version_from_spec(spec)
+
         if parsed_spec_obj is None:
             # A dependency can be pinned by something other than a version: a
             # path, a URL or a git reference. Poetry also allows a list of such
             # entries -- multiple constraints -- and every entry in it may be
             # version-less, in which case there is no constraint to record at
             # all. Keep the name, which is what the caller asked for.
-            req = DetectedRequirement.parse(f"{name}", toml_file)
-            if req is not None:
-                requirements.append(req)
-            continue
-        parsed_spec = str(parsed_spec_obj)
-        if (
-            "," not in parsed_spec
-            and "<" not in parsed_spec
-            and ">" not in parsed_spec
-            and "=" not in parsed_spec
-        ):
-            parsed_spec = f"=={parsed_spec}"
-
-        req = DetectedRequirement.parse(f"{name}{parsed_spec}", toml_file)
+            req = DetectedRequirement.parse(f"{name}", toml_file, names_only)
+        else:
+            parsed_spec = str(parsed_spec_obj)
+            if (
+                "," not in parsed_spec
+                and "<" not in parsed_spec
+                and ">" not in parsed_spec
+                and "=" not in parsed_spec
+            ):
+                parsed_spec = f"=={parsed_spec}"
+
+            req = DetectedRequirement.parse(f"{name}{parsed_spec}", toml_file)
+
         if req is not None:
+            req.group = group
+            req.extra = poetry_extras.get(name.lower())
+            if not names_only:
+                req.markers = _markers_from_spec(spec)
             requirements.append(req)
 
     return requirements
 
 
-def from_requirements_txt(requirements_file: P) -> List[DetectedRequirement]:
-    # see http://www.pip-installer.org/en/latest/logic.html
+def from_setup_cfg(setup_cfg: P, names_only: bool = False) -> List[DetectedRequirement]:
+    """
+    Reads the declarative `options.install_requires` and `options.extras_require`
+    of a setup.cfg file, following `file:` references relative to it, as long as
+    they stay inside its directory. Extras are recorded on each requirement.
+    """
+    if isinstance(setup_cfg, str):
+        setup_cfg = Path(setup_cfg)
+
+    def read_file(name: str) -> str:
+        _check_inside(setup_cfg.parent, setup_cfg.parent / name)
+        return (setup_cfg.parent / name).read_text()
+
+    return _from_setup_cfg_source(
+        setup_cfg.read_text(), setup_cfg, read_file, names_only
+    )
+
+
+def _check_inside(root: Path, path: Path):
+    # a link can still lead outside of the project
+    root = root.resolve()
+    resolved = path.resolve()
+    if resolved != root and root not in resolved.parents:
+        raise CouldNotParseRequirements
+
+
+def _from_setup_cfg_source(
+    source: str,
+    setup_cfg: Path,
+    read_file: Callable[[str], str],
+    names_only: bool = False,
+) -> List[DetectedRequirement]:
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read_string(source)
+    except configparser.Error:
+        raise CouldNotParseRequirements
+
     requirements = []
+    if parser.has_option("options", "install_requires"):
+        requirements += _from_setup_cfg_list(
+            parser.get("options", "install_requires"), setup_cfg, read_file, names_only
+        )
+    if parser.has_section("options.extras_require"):
+        for extra, value in parser.items("options.extras_require"):
+            for req in _from_setup_cfg_list(value, setup_cfg, read_file, names_only):
+                req.extra = extra
+                requirements.append(req)
+
+    return requirements
+
+
+def _from_setup_cfg_list(
+    value: str,
+    setup_cfg: Path,
+    read_file: Callable[[str], str],
+    names_only: bool = False,
+) -> List[DetectedRequirement]:
+    # mirrors how setuptools reads a requirements list: either "file:" followed
+    # by comma separated file names, or the value itself, which is one
+    # requirement per line, or separated by ";" if it is all on one line
+    if value.startswith("file:"):
+        names = [name.strip() for name in value.split(":", 1)[1].split(",")]
+        for name in names:
+            # as setuptools, only read files inside the project
+            path = PurePath(name)
+            if path.anchor or ".." in path.parts:
+                raise CouldNotParseRequirements
+        try:
+            value = "\n".join(read_file(name) for name in names if name)
+        except OSError:
+            raise CouldNotParseRequirements
+
+    if "\n" in value:
+        lines = value.splitlines()
+    else:
+        lines = value.split(";")
+
+    requirements = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.split()[0] in _PIP_OPTIONS:
+            # the files are often requirements files, pip options and all
+            continue
+        req = DetectedRequirement.parse(line, setup_cfg, names_only)
+        if req is not None:
+            requirements.append(req)
+    return requirements
 
+
+def from_requirements_txt(
+    requirements_file: P, names_only: bool = False
+) -> List[DetectedRequirement]:
     if isinstance(requirements_file, str):
         requirements_file = Path(requirements_file)
 
+    if requirements_file.stat().st_size > MMAP_THRESHOLD:
+        with requirements_file.open("rb") as f, mmap.mmap(
+            f.fileno(), 0, access=mmap.ACCESS_READ
+        ) as buffer:
+            return _from_requirements_buffer(buffer, requirements_file, names_only)
+
     with requirements_file.open() as f:
-        for req in f.readlines():
-            if req.strip() == "":
-                # empty line
-                continue
-            if req.strip().startswith("#"):
-                # this is a comment
-                continue
-            if req.strip().split()[0] in _PIP_OPTIONS:
-                # this is a pip option
-                continue
-            detected = DetectedRequirement.parse(req, requirements_file)
-            if detected is None:
-                continue
-            requirements.append(detected)
+        return _from_requirements_lines(f.readlines(), requirements_file, names_only)
+
+
+def _from_requirements_lines(
+    lines: Iterable[str], requirements_file: Path, names_only: bool = False
+) -> List[DetectedRequirement]:
+    # see http://www.pip-installer.org/en/latest/logic.html
+    requirements = []
+
+    for req in lines:
+        if req.strip() == "":
+            # empty line
+            continue
+        if req.strip().startswith("#"):
+            # this is a comment
+            continue
+        if req.strip().split()[0] in _PIP_OPTIONS:
+            # this is a pip option
+            continue
+        detected = DetectedRequirement.parse(req, requirements_file, names_only)
+        if detected is None:
+            continue
+        requirements.append(detected)
+
+    return requirements
+
+
+def _from_requirements_buffer(
+    buffer: Union[bytes, mmap.mmap], requirements_file: Path, names_only: bool = False
+) -> List[DetectedRequirement]:
+    # the same filtering as _from_requirements_lines, but only the lines which
+    # might be requirements are sliced out of the buffer and decoded
+    requirements = []
+
+    start = 0
+    size = len(buffer)
+    while start < size:
+        end = buffer.find(b"\n", start)
+        if end == -1:
+            end = size
+        if _SKIPPED_LINE.match(buffer, start, end) is None:
+            line = buffer[start:end].decode("utf-8", errors="replace")
+            detected = DetectedRequirement.parse(line, requirements_file, names_only)
+            if detected is not None:
+                requirements.append(detected)
+        start = end + 1
 
     return requirements
 
 
-def from_requirements_dir(path: P) -> List[DetectedRequirement]:
+def from_requirements_dir(
+    path: P, names_only: bool = False
+) -> List[DetectedRequirement]:
     requirements = []
 
     if isinstance(path, str):
@@ -207,12 +547,14 @@ def from_requirements_dir(path: P) -> List[DetectedRequirement]:
         if not entry.is_file():
             continue
         if entry.name.endswith(".txt") or entry.name.endswith(".pip"):
-            requirements += from_requirements_txt(entry)
+            requirements += from_requirements_txt(entry, names_only)
 
     return list(set(requirements))
 
 
-def from_requirements_blob(path: P) -> List[DetectedRequirement]:
+def from_requirements_blob(
+    path: P, names_only: bool = False
+) -> List[DetectedRequirement]:
     requirements = []
 
     if isinstance(path, str):
@@ -221,11 +563,15 @@ def from_requirements_blob(path: P) -> List[DetectedRequirement]:
     for entry in path.iterdir():
         if not entry.is_file():
             continue
-        m = re.match(r"^(\w*)req(uirement)?s(\w*)\.txt$", entry.name)
-        if m is None:
+        if not _is_requirements_blob_name(entry.name):
             continue
-        if m.group(1).startswith("test") or m.group(3).endswith("test"):
-            continue
-        requirements += from_requirements_txt(entry)
+        requirements += from_requirements_txt(entry, names_only)
 
     return requirements
+
+
+def _is_requirements_blob_name(name: str) -> bool:
+    m = re.match(r"^(\w*)req(uirement)?s(\w*)\.txt$", name)
+    if m is None:
+        return False
+    return not (m.group(1).startswith("test") or m.group(3).endswith("test"))
@@ -0,0 +1,170 @@
+"""
+Requirements detection straight from git objects, without a checkout.
+
+All objects are read through one persistent `git cat-file --batch` process: the
+root tree of the revision is listed from its tree object, and only the blobs the
+parsers actually need are fetched. This works equally on bare mirrors and on
+historical commits of a normal clone.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from .detect import _find_requirements_in_tree
+from .exceptions import RequirementsNotFound
+from .requirement import DetectedRequirement
+from .tree import SourceTree
+
+__all__ = ["GitObjectReader", "GitRevisionTree", "find_requirements_at_revision"]
+
+
+_TREE_MODE = b"40000"
+_BLOB_MODE_PREFIX = b"100"
+
+
+class GitObjectReader:
+    """
+    A persistent `git cat-file --batch` process for one repository. It can be
+    shared between any number of revisions and should be closed when done.
+    Raises `RequirementsNotFound` if `repo_path` is not a git repository.
+    """
+
+    def __init__(self, repo_path: Union[str, Path]):
+        # cat-file would only fail once first asked for an object, with a
+        # broken pipe or no answer at all
+        try:
+            checked = subprocess.run(
+                ["git", "-C", str(repo_path), "rev-parse", "--git-dir"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise RequirementsNotFound(f"git could not be run: {e}")
+        if checked.returncode != 0:
+            raise RequirementsNotFound(f"{repo_path} is not a git repository")
+        self._process = subprocess.Popen(
+            ["git", "-C", str(repo_path), "cat-file", "--batch"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def read(self, object_name: str) -> Optional[Tuple[str, str, bytes]]:
+        """
+        Returns `(object_id, object_type, content)` for an object name as git
+        understands it (a hash, `rev:path`, `rev^{tree}` ...), or `None` if
+        there is no such object.
+        """
+        self._process.stdin.write(object_name.encode("utf-8") + b"\n")
+        self._process.stdin.flush()
+
+        header = self._process.stdout.readline()
+        if not header:
+            raise RuntimeError("git cat-file exited unexpectedly")
+        if header.endswith((b" missing\n", b" ambiguous\n")):
+            return None
+
+        object_id, object_type, size = header.split()
+        content = self._process.stdout.read(int(size))
+        # every object is followed by a newline which is not part of its content
+        self._process.stdout.read(1)
+        return object_id.decode("ascii"), object_type.decode("ascii"), content
+
+    def close(self):
+        if self._process.poll() is None:
+            self._process.stdin.close()
+            self._process.wait()
+        self._process.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _parse_tree(content: bytes, oid_size: int) -> Dict[str, Tuple[bytes, str]]:
+    # each entry is "<mode> <name>\0<raw object id>"
+    entries = {}
+    pos = 0
+    while pos < len(content):
+        nul = content.index(b"\0", pos)
+        mode, name = content[pos:nul].split(b" ", 1)
+        oid_start = nul + 1
+        pos = oid_start + oid_size
+        name = name.decode("utf-8", errors="surrogateescape")
+        entries[name] = (mode, content[oid_start:pos].hex())
+    return entries
+
+
+class GitRevisionTree(SourceTree):
+    def __init__(self, reader: GitObjectReader, rev: str, root: Path):
+        super().__init__(root)
+        self._reader = reader
+        found = reader.read(f"{rev}^{{tree}}")
+        if found is None:
+            raise RequirementsNotFound(f"{rev} is not a revision of {root}")
+        object_id, _, content = found
+        # the raw ids in tree entries are as long as the hash the repo uses
+        self._oid_size = len(object_id) // 2
+        self._trees = {"": _parse_tree(content, self._oid_size)}
+
+    def _read_object(self, object_id: str, name: str) -> bytes:
+        found = self._reader.read(object_id)
+        if found is None:
+            # listed in its tree, but not in the repository, as in a partial
+            # clone
+            raise FileNotFoundError(f"{name}: object {object_id} is missing")
+        return found[2]
+
+    def _entries(self, directory: str) -> Dict[str, Tuple[bytes, str]]:
+        directory = directory.strip("/")
+        if directory not in self._trees:
+            parent, _, name = directory.rpartition("/")
+            mode, object_id = self._entries(parent).get(name, (None, None))
+            entries = {}
+            if mode == _TREE_MODE:
+                content = self._read_object(object_id, directory)
+                entries = _parse_tree(content, self._oid_size)
+            self._trees[directory] = entries
+        return self._trees[directory]
+
+    def list_files(self, directory: str = "") -> List[str]:
+        return [
+            name
+            for name, (mode, _) in self._entries(directory).items()
+            if mode.startswith(_BLOB_MODE_PREFIX)
+        ]
+
+    def is_dir(self, directory: str) -> bool:
+        parent, _, name = directory.strip("/").rpartition("/")
+        mode, _ = self._entries(parent).get(name, (None, None))
+        return mode == _TREE_MODE
+
+    def read_bytes(self, name: str) -> bytes:
+        directory, _, filename = name.rpartition("/")
+        mode, object_id = self._entries(directory).get(filename, (None, None))
+        if mode is None or not mode.startswith(_BLOB_MODE_PREFIX):
+            raise FileNotFoundError(name)
+        return self._read_object(object_id, name)
+
+
+def find_requirements_at_revision(
+    repo_path: Union[str, Path],
+    rev: str = "HEAD",
+    reader: Optional[GitObjectReader] = None,
+) -> List[DetectedRequirement]:
+    """
+    Like `find_requirements`, but for the tree of a revision of a git repository
+    rather than a directory on disk. The repository may be bare.
+
+    Pass a `GitObjectReader` to reuse one `git cat-file` process when scanning
+    many revisions of the same repository.
+    """
+    repo_path = Path(repo_path)
+    if reader is not None:
+        return _find_requirements_in_tree(GitRevisionTree(reader, rev, repo_path))
+
+    with GitObjectReader(repo_path) as reader:
+        return _find_requirements_in_tree(GitRevisionTree(reader, rev, repo_path))
@@ -1,23 +1,244 @@
 from pathlib import Path
-from typing import Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from astroid import MANAGER, AstroidSyntaxError
 from astroid.builder import AstroidBuilder
-from astroid.nodes import Assign, AssignName, Call, Const, Keyword, List, Name, Tuple
+from astroid.nodes import (
+    Assign,
+    AssignName,
+    Attribute,
+    Call,
+    Const,
+    Import,
+    ImportFrom,
+    Keyword,
+)
+from astroid.nodes import List as ListNode
+from astroid.nodes import Name
+from astroid.nodes import Tuple as TupleNode
 
 from .exceptions import CouldNotParseRequirements
 from .requirement import DetectedRequirement
+from .tree import FilesystemTree, SourceTree
 
 
-class SetupWalker:
+class _ReadOnlyBuilder(AstroidBuilder):
+    """
+    Nothing is ever inferred from the trees built here, so brain transforms are
+    skipped, and wildcard imports are not followed: doing so would load (and
+    cache, for the life of the process) every module they name.
+    """
+
+    def __init__(self):
+        super().__init__(MANAGER, apply_transforms=False)
+
+    # a private hook, called for every "from" import to follow wildcards, which
+    # is why astroid is pinned to the minor releases it has been checked against
+    def add_from_names_to_locals(self, node, global_name):
+        pass
+
+
+def _build(source: str):
+    try:
+        module = _ReadOnlyBuilder().string_build(source)
+    except (SyntaxError, AstroidSyntaxError, RecursionError):
+        # if the file is broken (or too deeply nested for astroid), we can't do
+        # much about that...
+        raise CouldNotParseRequirements
+
+    # astroid caches every module it builds under its name, which is empty here,
+    # so the first file parsed would otherwise stay in memory for good
+    if MANAGER.astroid_cache.get(module.name) is module:
+        del MANAGER.astroid_cache[module.name]
+    return module
+
+
+def _get_list_value(list_node) -> List[str]:
+    values = []
+    for child_node in list_node.get_children():
+        if not isinstance(child_node, Const):
+            # we can't handle anything fancy, only constant values
+            raise CouldNotParseRequirements
+        values.append(child_node.value)
+    return values
+
+
+def _constant(node) -> tuple:
+    """
+    Reduces an assigned value to the plain data needed to resolve it, so that
+    no reference to the tree it was read from is kept: `("list", values)`,
+    `("name", name)`, `("attribute", name, attrname)` or `("other",)`.
+    """
+    if isinstance(node, (ListNode, TupleNode)):
+        try:
+            return ("list", _get_list_value(node))
+        except CouldNotParseRequirements:
+            return ("other",)
+    if isinstance(node, Name):
+        return ("name", node.name)
+    if isinstance(node, Attribute) and isinstance(node.expr, Name):
+        return ("attribute", node.expr.name, node.attrname)
+    return ("other",)
+
+
+class ModuleConstants:
+    """
+    The top level assignments and imports of a module, which is all that is
+    needed to statically resolve a constant defined in, or imported into, it.
+    """
+
     def __init__(self, ast):
+        self.assigns: Dict[str, tuple] = {}
+        # local name -> (module name, imported name or None for a module, level)
+        self.imports: Dict[str, Tuple[str, Optional[str], int]] = {}
+
+        for node in ast.get_children():
+            if isinstance(node, Assign):
+                for target in node.targets:
+                    if isinstance(target, AssignName):
+                        self.assigns[target.name] = _constant(node.value)
+            elif isinstance(node, ImportFrom):
+                for name, alias in node.names:
+                    self.imports[alias or name] = (node.modname, name, node.level or 0)
+            elif isinstance(node, Import):
+                for name, alias in node.names:
+                    if alias:
+                        self.imports[alias] = (name, None, 0)
+                    else:
+                        top = name.split(".")[0]
+                        self.imports[top] = (top, None, 0)
+
+
+class SetupModuleCache:
+    """
+    Helper modules which setup.py files import their requirements from, parsed
+    once and shared for the whole of a scan. Besides the project itself (and its
+    `src` folder), modules are looked for in the directories of `search_path`,
+    such as the root of a monorepo holding constants shared by all its projects.
+
+    The cache assumes files do not change while it is in use, so use a new one
+    (or `clear` it) for each scan.
+    """
+
+    def __init__(self, search_path: Iterable[Union[str, Path]] = ()):
+        self.search_path = [FilesystemTree(Path(path)) for path in search_path]
+        self._modules: Dict[Path, ModuleConstants] = {}
+
+    def __len__(self):
+        return len(self._modules)
+
+    def clear(self):
+        self._modules.clear()
+
+    def module(self, tree: SourceTree, name: str) -> ModuleConstants:
+        location = tree.location(name)
+        if location not in self._modules:
+            self._modules[location] = ModuleConstants(_build(tree.read_text(name)))
+        return self._modules[location]
+
+
+# a module, as the tree it was found in and the directory of its package
+_Package = Tuple[SourceTree, str]
+
+
+class _ConstantResolver:
+    def __init__(self, tree: Optional[SourceTree], cache: SetupModuleCache):
+        # without a tree, only constants of the setup.py itself can be resolved
+        self._tree = tree
+        self._cache = cache
+
+    def _find_module(
+        self, modname: str, level: int, package: _Package
+    ) -> Optional[Tuple[SourceTree, str, str]]:
+        if level:
+            tree, directory = package
+            for _ in range(level - 1):
+                directory = directory.rpartition("/")[0]
+            bases = [(tree, directory)]
+        else:
+            bases = []
+            if self._tree is not None:
+                bases += [(self._tree, ""), (self._tree, "src")]
+            bases += [(tree, "") for tree in self._cache.search_path]
+
+        parts = modname.split(".") if modname else []
+        for tree, base in bases:
+            path = "/".join([part for part in [base] + parts if part])
+            directory, _, stem = path.rpartition("/")
+            if stem and f"{stem}.py" in tree.list_files(directory):
+                return tree, f"{path}.py", directory
+            if "__init__.py" in tree.list_files(path):
+                return tree, f"{path}/__init__.py", path
+        return None
+
+    def _load_module(
+        self, modname: str, level: int, package: _Package
+    ) -> Tuple[ModuleConstants, _Package]:
+        found = self._find_module(modname, level, package)
+        if found is None:
+            # not part of the project, or not a module at all
+            raise CouldNotParseRequirements
+        tree, filename, module_package = found
+        return self._cache.module(tree, filename), (tree, module_package)
+
+    def resolve(
+        self, constants: ModuleConstants, name: str, package: _Package, seen=None
+    ) -> List[str]:
+        seen = set() if seen is None else seen
+        if (id(constants), name) in seen:
+            # a circular definition
+            raise CouldNotParseRequirements
+        seen.add((id(constants), name))
+
+        if name in constants.assigns:
+            return self.values(constants.assigns[name], constants, package, seen)
+
+        if name not in constants.imports:
+            raise CouldNotParseRequirements
+        modname, imported, level = constants.imports[name]
+        if imported is None:
+            # a module rather than a constant
+            raise CouldNotParseRequirements
+        module, module_package = self._load_module(modname, level, package)
+        return self.resolve(module, imported, module_package, seen)
+
+    def root_values(self, value: tuple, constants: ModuleConstants) -> List[str]:
+        """
+        Resolves `value` as found in the setup.py at the root of the tree.
+        """
+        return self.values(value, constants, (self._tree, ""))
+
+    def values(
+        self, value: tuple, constants: ModuleConstants, package: _Package, seen=None
+    ) -> List[str]:
+        kind = value[0]
+        if kind == "list":
+            return value[1]
+        if kind == "name":
+            return self.resolve(constants, value[1], package, seen)
+        if kind == "attribute":
+            # a constant of an imported module, "module.CONSTANT"
+            _, name, attrname = value
+            if name not in constants.imports:
+                raise CouldNotParseRequirements
+            modname, imported, level = constants.imports[name]
+            if imported is not None:
+                # "from package import module"
+                modname = f"{modname}.{imported}" if modname else imported
+            module, module_package = self._load_module(modname, level, package)
+            return self.resolve(module, attrname, module_package, seen)
+        raise CouldNotParseRequirements
+
+
+class SetupWalker:
+    def __init__(self, ast, resolver: Optional[_ConstantResolver] = None):
         self._ast = ast
         self._setup_call = None
-        self._top_level_assigns = {}
+        self._constants = ModuleConstants(ast)
+        self._resolver = resolver or _ConstantResolver(None, SetupModuleCache())
         self.walk()
 
     def walk(self, node=None):
-        top = node is None
         node = node or self._ast
 
         # test to see if this is a call to setup()
@@ -28,21 +249,8 @@ class SetupWalker:
                     self._setup_call = node
 
         for child_node in node.get_children():
-            if top and isinstance(child_node, Assign):
-                for target in child_node.targets:
-                    if isinstance(target, AssignName):
-                        self._top_level_assigns[target.name] = child_node.value
             self.walk(child_node)
 
-    def _get_list_value(self, list_node):
-        values = []
-        for child_node in list_node.get_children():
-            if not isinstance(child_node, Const):
-                # we can't handle anything fancy, only constant values
-                raise CouldNotParseRequirements
-            values.append(child_node.value)
-        return values
-
     def get_requires(self):
         # first, if we have a call to setup, then we can see what its "install_requires" argument is
         if not self._setup_call:
@@ -58,26 +266,18 @@ class SetupWalker:
             if child_node.arg not in ("install_requires", "requires"):
                 continue
 
-            if isinstance(child_node.value, (List, Tuple)):
+            if isinstance(child_node.value, (ListNode, TupleNode)):
                 # joy! this is a simple list or tuple of requirements
                 # this is a Keyword -> List or Keyword -> Tuple
-                found_requirements += self._get_list_value(child_node.value)
+                found_requirements += _get_list_value(child_node.value)
                 continue
 
-            if isinstance(child_node.value, Name):
-                # otherwise, it's referencing a value defined elsewhere
-                # this will be a Keyword -> Name
-                try:
-                    reqs = self._top_level_assigns[child_node.value.name]
-                except KeyError:
-                    raise CouldNotParseRequirements
-                else:
-                    if isinstance(reqs, (List, Tuple)):
-                        found_requirements += self._get_list_value(reqs)
-                        continue
-
-            # otherwise it's something funky and we can't handle it
-            raise CouldNotParseRequirements
+            # otherwise, it's referencing a value defined elsewhere, either in this
+            # file or in a module it imports: this will be a Keyword -> Name or a
+            # Keyword -> Attribute, and anything funkier raises
+            found_requirements += self._resolver.root_values(
+                _constant(child_node.value), self._constants
+            )
 
         # if we've fallen off the bottom with nothing in our list of requirements,
         #  we simply didn't find anything useful
@@ -86,20 +286,54 @@ class SetupWalker:
         raise CouldNotParseRequirements
 
 
-def from_setup_py(setup_file: Union[str, Path]):
+def from_setup_py(
+    setup_file: Union[str, Path],
+    module_cache: Optional[SetupModuleCache] = None,
+    names_only: bool = False,
+):
+    """
+    Reads install_requires from a setup.py file without running it. A name
+    passed as install_requires is resolved statically to a constant list or
+    tuple, following imports of modules inside the project; pass a shared
+    `SetupModuleCache` to parse such modules only once across many files.
+    """
     if isinstance(setup_file, str):
         setup_file = Path(setup_file)
 
-    try:
-        ast = AstroidBuilder(MANAGER).string_build(setup_file.open().read())
-    except (SyntaxError, AstroidSyntaxError):
-        # if the setup file is broken, we can't do much about that...
-        raise CouldNotParseRequirements
+    with setup_file.open() as f:
+        source = f.read()
+
+    return _from_setup_source(
+        source, setup_file, FilesystemTree(setup_file.parent), module_cache, names_only
+    )
 
-    walker = SetupWalker(ast)
 
+def _from_setup_source(
+    source: str,
+    setup_file: Path,
+    tree: Optional[SourceTree] = None,
+    module_cache: Optional[SetupModuleCache] = None,
+    names_only: bool = False,
+):
     requirements = []
-    for req in walker.get_requires():
-        requirements.append(DetectedRequirement.parse(req, setup_file))
+    for req in _setup_requires(source, tree, module_cache):
+        requirements.append(DetectedRequirement.parse(req, setup_file, names_only))
 
     return [requirement for requirement in requirements if requirement is not None]
+
+
+def _setup_requires(
+    source: str,
+    tree: Optional[SourceTree] = None,
+    module_cache: Optional[SetupModuleCache] = None,
+) -> List[str]:
+    if module_cache is None:
+        module_cache = SetupModuleCache()
+
+    ast = _build(source)
+    resolver = _ConstantResolver(tree, module_cache)
+    try:
+        walker = SetupWalker(ast, resolver)
+    except RecursionError:
+        raise CouldNotParseRequirements
+    return walker.get_requires()
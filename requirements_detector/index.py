@@ -0,0 +1,407 @@
+"""
+A persistent index of the requirements of many projects, to answer questions
+such as "which projects depend on package X in a range including version Y"
+without scanning them all again.
+
+Scan results are stored in a SQLite database, one row per requirement, indexed
+by canonical package name. Each project is recorded with the directories its
+scan listed and the files it read, such as the helper modules its setup.py takes
+its requirements from, and a fingerprint of them, so that updating the index
+only rescans the projects which changed since. A project which cannot be scanned
+is recorded with its error instead, and scanned again by the next update.
+Version questions are answered with `poetry_semver`.
+
+Projects are scanned by a `Scheduler`, the most expensive first. How long each
+took is kept in the index too, and the cost model of every later update is tuned
+from those timings.
+
+The index can be used from Python, or from the command line:
+
+    python -m requirements_detector.index build fleet.db /srv/projects/* --workers 8
+    python -m requirements_detector.index query fleet.db django --version 4.2.1
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Union
+
+from packaging.utils import canonicalize_name
+
+from .exceptions import RequirementsNotFound
+from .pipeline import Pipeline
+from .poetry_semver import Version, parse_constraint
+from .poetry_semver.version_constraint import VersionConstraint
+from .scheduler import CostModel, RootTiming, Scheduler
+from .tree import FilesystemTree
+
+__all__ = ["IndexEntry", "RequirementIndex"]
+
+
+P = Union[str, Path]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    root TEXT NOT NULL UNIQUE,
+    fingerprint TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS requirements (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    specifier TEXT NOT NULL,
+    url TEXT,
+    source TEXT
+);
+CREATE INDEX IF NOT EXISTS requirements_by_name ON requirements (name);
+CREATE INDEX IF NOT EXISTS requirements_by_project ON requirements (project_id);
+CREATE TABLE IF NOT EXISTS inputs (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    -- "directory" or "file", relative to the root of the project
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS inputs_by_project ON inputs (project_id);
+CREATE TABLE IF NOT EXISTS errors (
+    root TEXT PRIMARY KEY,
+    error TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS timings (
+    root TEXT PRIMARY KEY,
+    estimate REAL NOT NULL,
+    seconds REAL NOT NULL,
+    features TEXT NOT NULL
+);
+"""
+
+
+class IndexEntry(NamedTuple):
+    project: Path
+    name: str
+    specifier: str
+    source: Optional[Path]
+
+
+class _RecordingTree(FilesystemTree):
+    """
+    Remembers every directory detection looks into and every file it reads.
+    """
+
+    def __init__(self, root: Path):
+        super().__init__(root)
+        self.directories: Set[str] = set()
+        self.files: Set[str] = set()
+
+    def list_files(self, directory: str = "") -> List[str]:
+        self.directories.add(directory)
+        return super().list_files(directory)
+
+    def is_dir(self, directory: str) -> bool:
+        self.directories.add(directory)
+        return super().is_dir(directory)
+
+    def read_bytes(self, name: str) -> bytes:
+        self.files.add(name)
+        return super().read_bytes(name)
+
+    def location(self, name: str) -> Path:
+        # requirements files are read straight from their location
+        self.files.add(name)
+        return super().location(name)
+
+
+def _fingerprint(root: Path, directories: Iterable[str], files: Iterable[str]) -> str:
+    """
+    The names of the files in each of `directories`, and the size and
+    modification time of each of `files`, all relative to `root`.
+    """
+    digest = hashlib.sha1()
+    for directory in sorted(directories):
+        path = root / directory
+        names = None
+        if path.is_dir():
+            names = sorted(entry.name for entry in path.iterdir() if entry.is_file())
+        digest.update(json.dumps(["directory", directory, names]).encode() + b"\n")
+    for name in sorted(files):
+        try:
+            stat = (root / name).stat()
+        except OSError:
+            state = None
+        else:
+            state = [stat.st_size, stat.st_mtime_ns]
+        digest.update(json.dumps(["file", name, state]).encode() + b"\n")
+    return digest.hexdigest()
+
+
+class RequirementIndex:
+    def __init__(self, database: P):
+        self._db = sqlite3.connect(str(database))
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(_SCHEMA)
+        # queries see the same few specifiers over and over
+        self._constraints: Dict[str, Optional[VersionConstraint]] = {}
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def update(
+        self,
+        roots: Iterable[P],
+        force: bool = False,
+        lockfiles: bool = False,
+        workers: int = 1,
+    ) -> int:
+        """
+        Scans each project in `roots` whose files changed since it was last
+        indexed (or every one of them, with `force`), on `workers` threads, and
+        returns how many were scanned. A project in which no requirements are
+        found is still recorded, with none; one which fails to scan is left out
+        of the index, and its error recorded in `errors` instead.
+        """
+        changed: List[Path] = []
+        for root in roots:
+            root = Path(root).resolve()
+            row = self._db.execute(
+                "SELECT id, fingerprint FROM projects WHERE root = ?", (str(root),)
+            ).fetchone()
+            if row is not None and not force:
+                project_id, fingerprint = row
+                inputs = self._db.execute(
+                    "SELECT kind, name FROM inputs WHERE project_id = ?", (project_id,)
+                ).fetchall()
+                directories = [name for kind, name in inputs if kind == "directory"]
+                files = [name for kind, name in inputs if kind == "file"]
+                if _fingerprint(root, directories, files) == fingerprint:
+                    continue
+            changed.append(root)
+
+        scheduler = Scheduler(
+            Pipeline(lockfiles=lockfiles), CostModel().tuned(self.timings()), workers
+        )
+        scanned = 0
+        for result, timing in scheduler.run(_RecordingTree(root) for root in changed):
+            root = result.tree.root
+            if isinstance(result.error, RequirementsNotFound):
+                requirements = []
+            elif result.error is not None:
+                # rather than leave the rest of the projects unscanned
+                with self._db:
+                    self._db.execute(
+                        "DELETE FROM projects WHERE root = ?", (str(root),)
+                    )
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO errors VALUES (?, ?)",
+                        (str(root), repr(result.error)),
+                    )
+                continue
+            else:
+                requirements = result.requirements
+
+            tree = result.tree
+            with self._db:
+                self._db.execute("DELETE FROM projects WHERE root = ?", (str(root),))
+                self._db.execute("DELETE FROM errors WHERE root = ?", (str(root),))
+                project_id = self._db.execute(
+                    "INSERT INTO projects (root, fingerprint) VALUES (?, ?)",
+                    (str(root), _fingerprint(root, tree.directories, tree.files)),
+                ).lastrowid
+                self._db.executemany(
+                    "INSERT INTO inputs VALUES (?, ?, ?)",
+                    [(project_id, "directory", name) for name in tree.directories]
+                    + [(project_id, "file", name) for name in tree.files],
+                )
+                self._db.executemany(
+                    "INSERT INTO requirements VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (
+                            project_id,
+                            canonicalize_name(req.name) if req.name else "",
+                            req._format_specs(),
+                            req.url,
+                            str(req.location_defined) if req.location_defined else None,
+                        )
+                        for req in requirements
+                    ],
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO timings VALUES (?, ?, ?, ?)",
+                    (
+                        str(root),
+                        timing.estimate,
+                        timing.seconds,
+                        json.dumps(timing.features),
+                    ),
+                )
+            scanned += 1
+        return scanned
+
+    def timings(self, roots: Optional[Iterable[P]] = None) -> List[RootTiming]:
+        """
+        How long the last scan of each project (or of those in `roots`) took,
+        and how long it was estimated to take, slowest first.
+        """
+        rows = self._db.execute(
+            "SELECT root, estimate, seconds, features FROM timings"
+            " ORDER BY seconds DESC"
+        )
+        wanted = (
+            None if roots is None else {str(Path(root).resolve()) for root in roots}
+        )
+        return [
+            RootTiming(
+                Path(root),
+                estimate,
+                seconds,
+                {
+                    source: tuple(value)
+                    for source, value in json.loads(features).items()
+                },
+            )
+            for root, estimate, seconds, features in rows
+            if wanted is None or root in wanted
+        ]
+
+    def errors(self, roots: Optional[Iterable[P]] = None) -> Dict[Path, str]:
+        """
+        The error each project (or each of those in `roots`) which failed its
+        last scan failed with.
+        """
+        rows = self._db.execute("SELECT root, error FROM errors ORDER BY root")
+        wanted = (
+            None if roots is None else {str(Path(root).resolve()) for root in roots}
+        )
+        return {
+            Path(root): error
+            for root, error in rows
+            if wanted is None or root in wanted
+        }
+
+    def remove(self, root: P):
+        root = str(Path(root).resolve())
+        with self._db:
+            self._db.execute("DELETE FROM projects WHERE root = ?", (root,))
+            self._db.execute("DELETE FROM errors WHERE root = ?", (root,))
+            self._db.execute("DELETE FROM timings WHERE root = ?", (root,))
+
+    def projects(self) -> List[Path]:
+        rows = self._db.execute("SELECT root FROM projects ORDER BY root")
+        return [Path(root) for root, in rows]
+
+    def _constraint(self, specifier: str) -> Optional[VersionConstraint]:
+        if specifier not in self._constraints:
+            try:
+                constraint = parse_constraint(specifier or "*")
+            except ValueError:
+                constraint = None
+            self._constraints[specifier] = constraint
+        return self._constraints[specifier]
+
+    def query(
+        self,
+        name: str,
+        version: Optional[str] = None,
+        constraint: Optional[str] = None,
+    ) -> List[IndexEntry]:
+        """
+        Every requirement on the package `name`, optionally only those which
+        allow `version`, or any of the versions of `constraint` (such as
+        `">=2.0,<2.3"`). Requirements whose specifier cannot be understood are
+        always included, as they may allow it.
+        """
+        wanted = None
+        if version is not None:
+            wanted = Version.parse(version)
+        elif constraint is not None:
+            wanted = parse_constraint(constraint)
+
+        rows = self._db.execute(
+            "SELECT projects.root, requirements.name, specifier, source"
+            " FROM requirements JOIN projects ON projects.id = project_id"
+            " WHERE requirements.name = ? ORDER BY projects.root",
+            (canonicalize_name(name),),
+        )
+        entries = []
+        for root, req_name, specifier, source in rows:
+            if wanted is not None:
+                allowed = self._constraint(specifier)
+                if allowed is not None and not allowed.allows_any(wanted):
+                    continue
+            entries.append(
+                IndexEntry(Path(root), req_name, specifier, source and Path(source))
+            )
+        return entries
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m requirements_detector.index",
+        description="Index the requirements of many projects, and query the index.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="index or re-index projects")
+    build.add_argument("database")
+    build.add_argument("roots", nargs="+", metavar="root")
+    build.add_argument("--force", action="store_true", help="rescan unchanged projects")
+    build.add_argument("--lockfiles", action="store_true", help="prefer lockfiles")
+    build.add_argument("--workers", type=int, default=1, help="threads to scan with")
+    build.add_argument(
+        "--timings",
+        action="store_true",
+        help="list how long each project took to scan, and its estimate",
+    )
+
+    query = commands.add_parser("query", help="find the projects requiring a package")
+    query.add_argument("database")
+    query.add_argument("name")
+    versions = query.add_mutually_exclusive_group()
+    versions.add_argument("--version", help="only requirements allowing this version")
+    versions.add_argument("--range", help="only requirements allowing any of these")
+
+    args = parser.parse_args(argv)
+    with RequirementIndex(args.database) as index:
+        if args.command == "build":
+            scanned = index.update(
+                args.roots,
+                force=args.force,
+                lockfiles=args.lockfiles,
+                workers=args.workers,
+            )
+            print("%d of %d projects scanned" % (scanned, len(args.roots)))
+            errors = index.errors(args.roots)
+            for root, error in errors.items():
+                print("%s\t%s" % (root, error), file=sys.stderr)
+            if args.timings:
+                for timing in index.timings(args.roots):
+                    print(
+                        "%s\t%.3fs\t(estimated %.3fs)"
+                        % (timing.root, timing.seconds, timing.estimate)
+                    )
+            return 1 if errors else 0
+
+        try:
+            entries = index.query(
+                args.name, version=args.version, constraint=args.range
+            )
+        except ValueError as e:
+            # a ParseVersionError, or a range which is not a constraint
+            parser.error(str(e))
+        for entry in entries:
+            print(
+                "%s\t%s%s\t%s"
+                % (entry.project, entry.name, entry.specifier, entry.source or "")
+            )
+        return 0 if entries else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
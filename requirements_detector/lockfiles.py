@@ -0,0 +1,154 @@
+"""
+Exact pins straight from lockfiles.
+
+A lockfile already holds the resolved version of every package, so there is no
+constraint to parse: `poetry.lock` and `uv.lock` are read a line at a time, one
+`[[package]]` table after the other, picking out only the `name` and `version`
+keys, and `Pipfile.lock` (which is JSON) is read with the json module.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+from .exceptions import CouldNotParseRequirements
+from .requirement import DetectedRequirement
+
+__all__ = [
+    "LOCKFILE_NAMES",
+    "from_lockfile",
+    "from_pipfile_lock",
+    "from_poetry_lock",
+    "from_uv_lock",
+]
+
+
+# in order of preference when a project has several
+LOCKFILE_NAMES = ("poetry.lock", "uv.lock", "Pipfile.lock")
+
+_PACKAGE_KEY = re.compile(r'^(name|version)\s*=\s*"([^"\\]*)"\s*(?:#.*)?$')
+# uv records the project being locked as a package of its own
+_PROJECT_SOURCE = re.compile(r'^source\s*=\s*\{\s*(?:editable|virtual)\s*=\s*"\."')
+
+
+P = Union[str, Path]
+
+
+def _pinned(
+    name: str, version: Optional[str], location: Path, group: Optional[str] = None
+) -> DetectedRequirement:
+    return DetectedRequirement(
+        name=name,
+        version_specs=[("==", version)] if version else [],
+        location_defined=location,
+        group=group,
+    )
+
+
+def _from_toml_lock_lines(
+    lines: Iterable[str], lockfile: Path
+) -> List[DetectedRequirement]:
+    requirements = []
+
+    in_package = False
+    name = version = None
+    for line in lines:
+        if line.startswith("["):
+            # any table header ends the top-level keys of the current package
+            if in_package and name is not None:
+                requirements.append(_pinned(name, version, lockfile))
+            in_package = line.startswith("[[package]]")
+            name = version = None
+            continue
+
+        if not in_package:
+            continue
+
+        if line.startswith(("name", "version")):
+            m = _PACKAGE_KEY.match(line)
+            if m is None:
+                continue
+            if m.group(1) == "name":
+                name = m.group(2)
+            else:
+                version = m.group(2)
+        elif _PROJECT_SOURCE.match(line):
+            in_package = False
+
+    if in_package and name is not None:
+        requirements.append(_pinned(name, version, lockfile))
+
+    return requirements
+
+
+def _load_pipfile_lock(content: bytes) -> dict:
+    try:
+        data = json.loads(content)
+    except ValueError:
+        # not JSON (or not text) at all
+        raise CouldNotParseRequirements
+    if not isinstance(data, dict):
+        raise CouldNotParseRequirements
+    return data
+
+
+def _from_pipfile_lock_data(data: dict, lockfile: Path) -> List[DetectedRequirement]:
+    requirements = []
+    for section, group in (("default", None), ("develop", "dev")):
+        packages = data.get(section, {})
+        if not isinstance(packages, dict):
+            continue
+        for name, spec in packages.items():
+            if not isinstance(spec, dict):
+                continue
+            version = spec.get("version", "")
+            if not isinstance(version, str):
+                version = ""
+            # anything pinned by a path, a URL or VCS reference has no version
+            version = version[2:] if version.startswith("==") else None
+            requirements.append(_pinned(name, version, lockfile, group=group))
+    return requirements
+
+
+def from_poetry_lock(lockfile: P) -> List[DetectedRequirement]:
+    if isinstance(lockfile, str):
+        lockfile = Path(lockfile)
+
+    with lockfile.open(encoding="utf-8") as f:
+        return _from_toml_lock_lines(f, lockfile)
+
+
+# both are TOML with one [[package]] array table per locked package
+from_uv_lock = from_poetry_lock
+
+
+def from_pipfile_lock(lockfile: P) -> List[DetectedRequirement]:
+    if isinstance(lockfile, str):
+        lockfile = Path(lockfile)
+
+    return _from_pipfile_lock_data(_load_pipfile_lock(lockfile.read_bytes()), lockfile)
+
+
+def from_lockfile(lockfile: P) -> List[DetectedRequirement]:
+    """
+    Reads any of the lockfiles in `LOCKFILE_NAMES`, chosen by file name.
+    """
+    if isinstance(lockfile, str):
+        lockfile = Path(lockfile)
+
+    if lockfile.name == "Pipfile.lock":
+        return from_pipfile_lock(lockfile)
+    if lockfile.name in LOCKFILE_NAMES:
+        return from_poetry_lock(lockfile)
+    raise ValueError(f"{lockfile} is not a supported lockfile")
+
+
+def _from_lockfile_content(
+    name: str, content: bytes, lockfile: Path
+) -> List[DetectedRequirement]:
+    if name == "Pipfile.lock":
+        return _from_pipfile_lock_data(_load_pipfile_lock(content), lockfile)
+    return _from_toml_lock_lines(
+        content.decode("utf-8", errors="replace").splitlines(), lockfile
+    )
@@ -0,0 +1,110 @@
+"""
+Evaluates the environment markers of requirements against many target
+environments at once, such as every Python version and platform a project is
+built for.
+
+Each distinct marker is compiled once, and the result of evaluating it is kept
+for each environment (and the extra the requirement belongs to), so a marker
+shared by many requirements, or many projects, is only evaluated once per
+environment however often it appears.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from packaging.markers import InvalidMarker, Marker
+
+from .requirement import DetectedRequirement
+
+__all__ = ["MarkerEvaluator", "for_environments"]
+
+
+Environment = Mapping[str, str]
+
+
+class MarkerEvaluator:
+    """
+    Evaluates markers with a cache of compiled markers and of their results.
+
+    An environment gives the values of marker variables, such as
+    `{"python_version": "3.12", "sys_platform": "linux"}`; any variable it
+    does not give takes its value from the running interpreter, as with
+    `packaging.markers.Marker.evaluate`.
+    """
+
+    def __init__(self):
+        self._compiled: Dict[str, Optional[Marker]] = {}
+        self._results: Dict[Tuple[str, tuple, str], bool] = {}
+
+    def _compile(self, markers: str) -> Optional[Marker]:
+        if markers not in self._compiled:
+            try:
+                self._compiled[markers] = Marker(markers)
+            except InvalidMarker:
+                self._compiled[markers] = None
+        return self._compiled[markers]
+
+    def applies(
+        self, requirement: DetectedRequirement, environment: Environment
+    ) -> bool:
+        """
+        Whether `requirement` is required in `environment`. A requirement with
+        no markers, or with markers which cannot be understood, always is.
+        """
+        if requirement.markers is None:
+            return True
+        return self._evaluate(
+            requirement.markers, tuple(sorted(environment.items())), requirement
+        )
+
+    def _evaluate(
+        self, markers: str, environment: tuple, requirement: DetectedRequirement
+    ) -> bool:
+        # an `extra` marker is true for requirements of that extra of the project
+        extra = requirement.extra or ""
+        key = (markers, environment, extra)
+        if key not in self._results:
+            marker = self._compile(markers)
+            if marker is None:
+                self._results[key] = True
+            else:
+                values = dict(environment)
+                values["extra"] = extra
+                self._results[key] = marker.evaluate(values)
+        return self._results[key]
+
+    def for_environments(
+        self,
+        requirements: Iterable[DetectedRequirement],
+        environments: Iterable[Environment],
+    ) -> List[List[DetectedRequirement]]:
+        """
+        The requirements which apply in each of `environments`, in order: one
+        list per environment, of the same requirement objects.
+        """
+        requirements = list(requirements)
+        views = []
+        for environment in environments:
+            key = tuple(sorted(environment.items()))
+            views.append(
+                [
+                    requirement
+                    for requirement in requirements
+                    if requirement.markers is None
+                    or self._evaluate(requirement.markers, key, requirement)
+                ]
+            )
+        return views
+
+
+def for_environments(
+    requirements: Iterable[DetectedRequirement],
+    environments: Iterable[Environment],
+    evaluator: Optional[MarkerEvaluator] = None,
+) -> List[List[DetectedRequirement]]:
+    """
+    The requirements which apply in each of `environments`. Pass the same
+    `evaluator` to share its cache between calls.
+    """
+    if evaluator is None:
+        evaluator = MarkerEvaluator()
+    return evaluator.for_environments(requirements, environments)
@@ -0,0 +1,146 @@
+"""
+Evaluates many version constraints against many versions at once, such as
+every constraint found on a package against every release of it.
+
+Versions are slow to compare, so each distinct version (whether one of those
+being checked or the bound of a constraint) is compared only once, while ranking
+them all. Every constraint then becomes a list of intervals of ranks, and which
+versions it allows follows from where the versions fall among those intervals.
+With NumPy installed this last step is vectorised over the whole matrix;
+without it, the same is done in pure Python.
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .poetry_semver import Version
+from .poetry_semver.interval_set import _ranges
+from .poetry_semver.version_constraint import VersionConstraint
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = ["allows_matrix"]
+
+
+def _rank(
+    constraints: Sequence[VersionConstraint], versions: Sequence[Version]
+) -> Dict[Version, int]:
+    distinct = set(versions)
+    for constraint in constraints:
+        for version_range in _ranges(constraint):
+            if version_range.min is not None:
+                distinct.add(version_range.min)
+            if version_range.max is not None:
+                distinct.add(version_range.max)
+    return {version: rank for rank, version in enumerate(sorted(distinct))}
+
+
+def _bounds(
+    constraints: Sequence[VersionConstraint], rank: Dict[Version, int]
+) -> List[Tuple[int, int, bool, int, bool]]:
+    """
+    One `(constraint index, min rank, include min, max rank, include max)` per
+    range, with -1 and len(rank) standing for unbounded ends.
+    """
+    bounds = []
+    for index, constraint in enumerate(constraints):
+        for version_range in _ranges(constraint):
+            low = -1 if version_range.min is None else rank[version_range.min]
+            high = len(rank) if version_range.max is None else rank[version_range.max]
+            bounds.append(
+                (
+                    index,
+                    low,
+                    version_range.include_min,
+                    high,
+                    version_range.include_max,
+                )
+            )
+    return bounds
+
+
+def _python_matrix(
+    constraints: Sequence[VersionConstraint], versions: Sequence[Version]
+) -> List[List[bool]]:
+    rank = _rank(constraints, versions)
+    version_ranks = [rank[version] for version in versions]
+    known = sorted(set(version_ranks))
+    column = {version_rank: position for position, version_rank in enumerate(known)}
+
+    # how many ranges of each constraint cover each of the known versions,
+    # accumulated from where the ranges start and end among them
+    changes = [[0] * (len(known) + 1) for _ in constraints]
+    for index, low, include_min, high, include_max in _bounds(constraints, rank):
+        start = (bisect_left if include_min else bisect_right)(known, low)
+        end = (bisect_right if include_max else bisect_left)(known, high)
+        if start < end:
+            changes[index][start] += 1
+            changes[index][end] -= 1
+
+    matrix = []
+    for row in changes:
+        covered = []
+        depth = 0
+        for change in row[:-1]:
+            depth += change
+            covered.append(depth > 0)
+        matrix.append([covered[column[version_rank]] for version_rank in version_ranks])
+    return matrix
+
+
+def _numpy_matrix(
+    constraints: Sequence[VersionConstraint], versions: Sequence[Version]
+):
+    rank = _rank(constraints, versions)
+    version_ranks = numpy.array([rank[v] for v in versions], dtype=numpy.int64)
+    known = numpy.unique(version_ranks)
+
+    bounds = numpy.array(_bounds(constraints, rank), dtype=numpy.int64).reshape(-1, 5)
+    index, low, include_min, high, include_max = bounds.T
+    include_min = include_min.astype(bool)
+    include_max = include_max.astype(bool)
+
+    start = numpy.where(
+        include_min,
+        numpy.searchsorted(known, low, side="left"),
+        numpy.searchsorted(known, low, side="right"),
+    )
+    end = numpy.where(
+        include_max,
+        numpy.searchsorted(known, high, side="right"),
+        numpy.searchsorted(known, high, side="left"),
+    )
+    nonempty = start < end
+
+    changes = numpy.zeros((len(constraints), len(known) + 1), dtype=numpy.int64)
+    numpy.add.at(changes, (index[nonempty], start[nonempty]), 1)
+    numpy.add.at(changes, (index[nonempty], end[nonempty]), -1)
+    covered = numpy.cumsum(changes[:, :-1], axis=1) > 0
+
+    return covered[:, numpy.searchsorted(known, version_ranks)]
+
+
+def allows_matrix(
+    constraints: Sequence[VersionConstraint],
+    versions: Sequence[Version],
+    use_numpy: Optional[bool] = None,
+):
+    """
+    Returns a matrix with one row per constraint and one column per version,
+    true where the constraint allows the version: the same as calling
+    `constraint.allows(version)` for every pair.
+
+    The matrix is a NumPy array of booleans when NumPy is installed, and a list
+    of lists otherwise. Pass `use_numpy=False` to get lists regardless.
+    """
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    if use_numpy and numpy is None:
+        raise ImportError("NumPy is not installed")
+
+    if use_numpy:
+        return _numpy_matrix(constraints, versions)
+    return _python_matrix(constraints, versions)
@@ -0,0 +1,73 @@
+"""
+Reads the PEP 508 requirements found in nearly every project: a name, perhaps
+some extras, and version specifiers in their usual spelling, such as
+`Django[argon2] >= 4.2, < 5`.
+
+Constructing a `packaging.requirements.Requirement` runs a general tokenizer
+over the line and builds a `SpecifierSet` of `Specifier` objects, only for
+`DetectedRequirement` to copy the name and the text of each specifier back out.
+Such lines are read here with two regular expressions instead. Anything else,
+such as URLs, markers, epochs, local versions, `===` or other spellings of
+pre-releases, is not recognised, and is left to `packaging`: every line which
+is recognised is read by it in exactly the same way.
+"""
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+__all__ = ["SimpleRequirement", "parse_simple"]
+
+_NAME = r"[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?"
+_HEAD = re.compile(
+    r"[ \t]*({name})[ \t]*(?:\[[ \t]*((?:{name})(?:[ \t]*,[ \t]*(?:{name}))*)?[ \t]*\])?".format(
+        name=_NAME
+    )
+)
+# the release is matched apart from what follows it, as `.*` may only follow the
+# release of `==` and `!=`, and `~=` needs a release of two numbers or more
+_SPECIFIER = re.compile(
+    r"[ \t]*(==|!=|~=|<=|>=|<|>)[ \t]*([0-9]+(?:\.[0-9]+)*)"
+    r"(\.\*|(?:(?:a|b|rc)[0-9]+)?(?:\.post[0-9]+)?(?:\.dev[0-9]+)?)[ \t]*"
+)
+_EXTRAS_SEPARATOR = re.compile(r"[ \t]*,[ \t]*")
+
+
+class SimpleRequirement(NamedTuple):
+    name: str
+    extras: Tuple[str, ...]
+    # (operator, version) pairs, in the order they were written
+    specs: List[Tuple[str, str]]
+
+
+def parse_simple(text: str) -> Optional[SimpleRequirement]:
+    """
+    Parses `text` if it is a requirement of the common form, and returns None
+    if it is anything else, whether a valid requirement or not.
+    """
+    head = _HEAD.match(text)
+    if head is None:
+        return None
+
+    rest = text[head.end() :].strip(" \t")  # noqa: E203
+    if rest.startswith("(") and rest.endswith(")"):
+        rest = rest[1:-1].strip(" \t")
+
+    specs = []
+    if rest:
+        for specifier in rest.split(","):
+            m = _SPECIFIER.fullmatch(specifier)
+            if m is None:
+                return None
+            operator, release, suffix = m.groups()
+            if suffix == ".*" and operator not in ("==", "!="):
+                return None
+            if operator == "~=" and "." not in release:
+                return None
+            specs.append((operator, release + suffix))
+
+    extras = head.group(2)
+    return SimpleRequirement(
+        head.group(1),
+        tuple(_EXTRAS_SEPARATOR.split(extras)) if extras else (),
+        specs,
+    )
@@ -0,0 +1,674 @@
+"""
+Detection as a pipeline of stages, each handing projects on to the next:
+
+1. discover: list the files of a project which each registered source reads
+2. read: read those files
+3. parse: turn each file into requirements
+4. normalise: settle which of those are the requirements of the project
+
+and finally emit, which hands the result back to the caller.
+
+Sources are plugins, kept in `SOURCES` in order of preference; `register_source`
+adds new ones. Most sources are conclusive: the first of their files which
+answers for a project settles it, and nothing after it is needed. The others,
+the requirements files, are combined when no conclusive source answers.
+
+That is the default strategy, and one of `STRATEGIES`: "first-hit" takes the
+first source to answer, conclusive or not, and "exhaustive" combines every
+source, which shows where projects declare their requirements inconsistently. A
+pipeline can also be given the names of the sources to try, in order, which is
+"first-hit" over just those.
+
+`Pipeline.detect` runs the stages for one project, lazily, stopping at the first
+answer the strategy settles for; this is what `find_requirements` does. `Pipeline.run` streams
+many projects through the stages, with a bounded queue between each pair of
+them, and can run any stage serially, in threads or in worker processes.
+"""
+
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+from .detect import (
+    _check_inside,
+    _from_pyproject_data,
+    _from_requirements_buffer,
+    _from_setup_cfg_source,
+    _is_requirements_blob_name,
+    _names_only,
+    from_requirements_txt,
+)
+from .exceptions import CouldNotParseRequirements, RequirementsNotFound
+from .handle_setup import SetupModuleCache, _from_setup_source
+from .lockfiles import LOCKFILE_NAMES, _from_lockfile_content
+from .pyproject import load_dependency_tables
+from .requirement import DetectedRequirement
+from .setup_pool import SetupPyPool
+from .tree import FilesystemTree, SourceTree
+
+__all__ = [
+    "EXECUTORS",
+    "SOURCES",
+    "STAGES",
+    "STRATEGIES",
+    "DetectOptions",
+    "Pipeline",
+    "ProjectResult",
+    "Source",
+    "register_source",
+]
+
+STAGES = ("discover", "read", "parse", "normalise")
+EXECUTORS = ("serial", "thread", "process")
+# "default": the first conclusive source to answer, or else every other source
+# combined; "first-hit": the first source to answer, whichever it is;
+# "exhaustive": every source combined
+STRATEGIES = ("default", "first-hit", "exhaustive")
+
+
+class DetectOptions(NamedTuple):
+    lockfiles: bool = False
+    module_cache: Optional[SetupModuleCache] = None
+    setup_pool: Optional[SetupPyPool] = None
+    names_only: bool = False
+    strategy: str = "default"
+
+
+class Source:
+    """
+    A kind of file requirements can be declared in.
+    """
+
+    name = ""
+    # whether the first file of this source to answer for a project settles it
+    conclusive = True
+
+    def discover(
+        self, tree: SourceTree, root_files: List[str], options: DetectOptions
+    ) -> List[str]:
+        """
+        The files of `tree` to read, in order of preference.
+        """
+        raise NotImplementedError()
+
+    def read(self, tree: SourceTree, name: str) -> Union[bytes, Path]:
+        return tree.read_bytes(name)
+
+    def parse(
+        self,
+        data: Union[bytes, Path],
+        name: str,
+        tree: SourceTree,
+        options: DetectOptions,
+    ) -> List[DetectedRequirement]:
+        """
+        The requirements declared in the file `name`, which was read as `data`.
+        Raises `CouldNotParseRequirements` if it declares none that can be read.
+        """
+        raise NotImplementedError()
+
+    def answers(self, requirements: List[DetectedRequirement]) -> bool:
+        return len(requirements) > 0
+
+
+class LockfileSource(Source):
+    name = "lockfile"
+
+    def discover(self, tree, root_files, options):
+        if not options.lockfiles:
+            return []
+        return [name for name in LOCKFILE_NAMES if name in root_files]
+
+    def parse(self, data, name, tree, options):
+        requirements = _from_lockfile_content(name, data, tree.location(name))
+        if options.names_only:
+            requirements = _names_only(requirements)
+        return requirements
+
+
+class SetupCfgSource(Source):
+    name = "setup.cfg"
+
+    def discover(self, tree, root_files, options):
+        return ["setup.cfg"] if "setup.cfg" in root_files else []
+
+    def parse(self, data, name, tree, options):
+        def read_file(name: str) -> str:
+            if isinstance(tree, FilesystemTree):
+                _check_inside(tree.root, tree.location(name))
+            return tree.read_text(name)
+
+        return _from_setup_cfg_source(
+            data.decode("utf-8", errors="replace"),
+            tree.location(name),
+            read_file,
+            options.names_only,
+        )
+
+    def answers(self, requirements):
+        # a setup.cfg holding only extras (or only tool configuration) does
+        # not say what the project itself requires
+        return any(req.extra is None for req in requirements)
+
+
+class SetupPySource(Source):
+    name = "setup.py"
+
+    def discover(self, tree, root_files, options):
+        return ["setup.py"] if "setup.py" in root_files else []
+
+    def parse(self, data, name, tree, options):
+        source = data.decode("utf-8", errors="replace")
+        if options.setup_pool is not None:
+            return options.setup_pool.parse(
+                source, tree.location(name), tree, options.names_only
+            )
+        return _from_setup_source(
+            source,
+            tree.location(name),
+            tree,
+            options.module_cache,
+            options.names_only,
+        )
+
+    def answers(self, requirements):
+        # install_requires was found, even if it is empty
+        return True
+
+
+class PyprojectSource(Source):
+    name = "pyproject.toml"
+
+    def discover(self, tree, root_files, options):
+        return ["pyproject.toml"] if "pyproject.toml" in root_files else []
+
+    def parse(self, data, name, tree, options):
+        return _from_pyproject_data(
+            load_dependency_tables(data),
+            tree.location(name),
+            names_only=options.names_only,
+        )
+
+
+class RequirementsFileSource(Source):
+    """
+    requirements.txt or requirements.pip in the root.
+    """
+
+    name = "requirements"
+    conclusive = False
+
+    def discover(self, tree, root_files, options):
+        return [
+            name
+            for name in ("requirements.txt", "requirements.pip")
+            if name in root_files
+        ]
+
+    def read(self, tree, name):
+        if isinstance(tree, FilesystemTree):
+            # read when parsed, so that large files are memory-mapped
+            return tree.location(name)
+        return tree.read_bytes(name)
+
+    def parse(self, data, name, tree, options):
+        if isinstance(data, Path):
+            return from_requirements_txt(data, options.names_only)
+        return _from_requirements_buffer(data, tree.location(name), options.names_only)
+
+
+class RequirementsDirSource(RequirementsFileSource):
+    """
+    The .txt and .pip files in a folder called requirements.
+    """
+
+    name = "requirements-dir"
+
+    def discover(self, tree, root_files, options):
+        if not tree.is_dir("requirements"):
+            return []
+        return [
+            f"requirements/{name}"
+            for name in tree.list_files("requirements")
+            if name.endswith(".txt") or name.endswith(".pip")
+        ]
+
+
+class RequirementsBlobSource(RequirementsFileSource):
+    """
+    The files in the root named like "*requirements*.txt" or "*reqs*.txt".
+    """
+
+    name = "requirements-blob"
+
+    def discover(self, tree, root_files, options):
+        return [name for name in root_files if _is_requirements_blob_name(name)]
+
+
+SOURCES: List[Source] = [
+    LockfileSource(),
+    SetupCfgSource(),
+    SetupPySource(),
+    PyprojectSource(),
+    RequirementsFileSource(),
+    RequirementsDirSource(),
+    RequirementsBlobSource(),
+]
+
+
+def register_source(source: Source, before: Optional[str] = None) -> None:
+    """
+    Adds `source` to the sources every new `Pipeline` dispatches to, last or just
+    before the source named `before`.
+    """
+    if before is None:
+        SOURCES.append(source)
+        return
+    names = [existing.name for existing in SOURCES]
+    SOURCES.insert(names.index(before), source)
+
+
+class _File:
+    def __init__(self, source: Source, name: str):
+        self.source = source
+        self.name = name
+        self.data: Union[bytes, Path, None] = None
+        self.parsed = False
+        # None if it could not be parsed
+        self.requirements: Optional[List[DetectedRequirement]] = None
+        # whatever went wrong reading or parsing it, which only matters if the
+        # strategy needs the file
+        self.error: Optional[Exception] = None
+
+    @property
+    def answered(self) -> bool:
+        return self.requirements is not None and self.source.answers(self.requirements)
+
+
+class _Project:
+    def __init__(self, tree: SourceTree, options: DetectOptions):
+        self.tree = tree
+        self.options = options
+        self.files: List[_File] = []
+        self.requirements: Optional[List[DetectedRequirement]] = None
+        # the requirements each source which was used found
+        self.by_source: Dict[str, List[DetectedRequirement]] = {}
+        self.error: Optional[Exception] = None
+
+
+class ProjectResult(NamedTuple):
+    tree: SourceTree
+    # None if detection failed, with the reason in `error`
+    requirements: Optional[List[DetectedRequirement]]
+    error: Optional[Exception]
+    by_source: Dict[str, List[DetectedRequirement]]
+
+    @classmethod
+    def _of(cls, project: "_Project") -> "ProjectResult":
+        return cls(project.tree, project.requirements, project.error, project.by_source)
+
+
+def _discover(sources: Sequence[Source], project: _Project) -> _Project:
+    root_files = project.tree.list_files()
+    discovered = set()
+    for source in sources:
+        for name in source.discover(project.tree, root_files, project.options):
+            # such as requirements.txt, which also matches the blob patterns
+            if name in discovered:
+                continue
+            discovered.add(name)
+            project.files.append(_File(source, name))
+    return project
+
+
+def _read_file(project: _Project, file: _File) -> None:
+    try:
+        file.data = file.source.read(project.tree, file.name)
+    except Exception as e:
+        file.error = e
+
+
+def _parse_file(project: _Project, file: _File) -> None:
+    file.parsed = True
+    if file.error is not None:
+        return
+    try:
+        file.requirements = file.source.parse(
+            file.data, file.name, project.tree, project.options
+        )
+    except CouldNotParseRequirements:
+        file.requirements = None
+    except Exception as e:
+        file.error = e
+
+
+def _read(project: _Project) -> _Project:
+    for file in project.files:
+        _read_file(project, file)
+    return project
+
+
+def _parse(project: _Project) -> _Project:
+    for file in project.files:
+        _parse_file(project, file)
+        if (
+            file.source.conclusive
+            and file.answered
+            and project.options.strategy != "exhaustive"
+        ):
+            # as in `detect`, nothing after a conclusive answer is needed
+            break
+    return project
+
+
+def _answer(
+    project: _Project, source: Source, files: List[_File]
+) -> Optional[List[DetectedRequirement]]:
+    """
+    What `source` found in `files`, which are read and parsed if they have not
+    been yet: the first to answer if the source is conclusive, or all of them.
+    None if the source has no answer.
+    """
+    requirements = []
+    for file in files:
+        if not file.parsed:
+            _read_file(project, file)
+            _parse_file(project, file)
+        if file.error is not None:
+            raise file.error
+        if file.requirements is None:
+            continue
+        if source.conclusive:
+            if file.answered:
+                return sorted(file.requirements)
+        else:
+            requirements += file.requirements
+    if source.conclusive or not requirements:
+        return None
+    return sorted(set(requirements))
+
+
+def _settle(project: _Project) -> _Project:
+    """
+    Sets the requirements of the project following its strategy, reading and
+    parsing only the files that strategy needs.
+    """
+    sources: Dict[Source, List[_File]] = {}
+    for file in project.files:
+        sources.setdefault(file.source, []).append(file)
+
+    strategy = project.options.strategy
+    by_source = {}
+    if strategy == "default":
+        for source, files in sources.items():
+            if source.conclusive:
+                requirements = _answer(project, source, files)
+                if requirements is not None:
+                    by_source = {source.name: requirements}
+                    break
+        else:
+            for source, files in sources.items():
+                if not source.conclusive:
+                    by_source[source.name] = _answer(project, source, files)
+    elif strategy == "first-hit":
+        for source, files in sources.items():
+            requirements = _answer(project, source, files)
+            if requirements is not None:
+                by_source = {source.name: requirements}
+                break
+    else:
+        for source, files in sources.items():
+            by_source[source.name] = _answer(project, source, files)
+
+    project.by_source = {
+        name: requirements
+        for name, requirements in by_source.items()
+        if requirements is not None
+    }
+    if not project.by_source:
+        raise RequirementsNotFound
+    if len(project.by_source) == 1:
+        project.requirements = next(iter(project.by_source.values()))
+    else:
+        combined = set()
+        for requirements in project.by_source.values():
+            combined.update(requirements)
+        project.requirements = sorted(combined)
+    return project
+
+
+def _normalise(project: _Project) -> _Project:
+    return _settle(project)
+
+
+def _guarded(function: Callable[[_Project], _Project], project: _Project) -> _Project:
+    # a project failing in any stage is passed on with its error, rather than
+    # stopping the whole pipeline
+    if project.error is not None:
+        return project
+    try:
+        return function(project)
+    except Exception as e:
+        project.error = e
+        return project
+
+
+def _without_shared_state(project: _Project) -> _Project:
+    # neither caches nor pools can be sent to another process
+    project.options = project.options._replace(module_cache=None, setup_pool=None)
+    return project
+
+
+_DONE = object()
+
+
+class Pipeline:
+    """
+    Detects requirements in projects with the given `sources`, which default to
+    those registered in `SOURCES` when the pipeline is created.
+
+    `executors` maps the name of a stage to how it runs in `run`: "serial" (the
+    default) for a single thread, "thread" for `workers` threads, or "process"
+    for `workers` worker processes, in which case the trees of the projects must
+    be picklable, and setup.py files are parsed without `module_cache` and
+    `setup_pool`. At most `queue_size` projects wait between two stages.
+
+    `strategy` is one of `STRATEGIES`, or the names of the sources to use, in
+    the order to try them, the first to answer settling the project. Naming
+    "lockfile" among them reads lockfiles without passing `lockfiles` as well.
+    """
+
+    def __init__(
+        self,
+        sources: Optional[Sequence[Source]] = None,
+        lockfiles: bool = False,
+        module_cache: Optional[SetupModuleCache] = None,
+        setup_pool: Optional[SetupPyPool] = None,
+        names_only: bool = False,
+        executors: Optional[Dict[str, str]] = None,
+        workers: int = 4,
+        queue_size: int = 64,
+        strategy: Union[str, Sequence[str]] = "default",
+    ):
+        self.sources = list(SOURCES if sources is None else sources)
+        if isinstance(strategy, str):
+            if strategy not in STRATEGIES:
+                raise ValueError("Unknown strategy: %s" % strategy)
+        else:
+            by_name = {source.name: source for source in self.sources}
+            for name in strategy:
+                if name not in by_name:
+                    raise ValueError("Unknown source: %s" % name)
+            self.sources = [by_name[name] for name in strategy]
+            # naming the lockfile source is asking for lockfiles to be read
+            lockfiles = lockfiles or LockfileSource.name in strategy
+            strategy = "first-hit"
+        self.options = DetectOptions(
+            lockfiles, module_cache, setup_pool, names_only, strategy
+        )
+        self.executors = dict.fromkeys(STAGES, "serial")
+        for stage, executor in (executors or {}).items():
+            if stage not in STAGES:
+                raise ValueError("Unknown stage: %s" % stage)
+            if executor not in EXECUTORS:
+                raise ValueError("Unknown executor: %s" % executor)
+            self.executors[stage] = executor
+        self.workers = workers
+        self.queue_size = queue_size
+
+    def detect(self, tree: SourceTree) -> List[DetectedRequirement]:
+        """
+        The requirements of the project in `tree`, reading and parsing its files
+        only until the strategy is settled.
+        """
+        return self._settled(tree).requirements
+
+    def detect_by_source(
+        self, tree: SourceTree
+    ) -> Dict[str, List[DetectedRequirement]]:
+        """
+        The requirements of the project in `tree` found by each source used,
+        in the order of the sources, leaving out those which found none.
+        """
+        return self._settled(tree).by_source
+
+    def _settled(self, tree: SourceTree) -> _Project:
+        return _settle(_discover(self.sources, _Project(tree, self.options)))
+
+    def _stages(self) -> List[Callable[[_Project], _Project]]:
+        return [partial(_discover, self.sources), _read, _parse, _normalise]
+
+    def run(self, trees: Iterable[SourceTree]) -> Iterator[ProjectResult]:
+        """
+        Detects the requirements of every project in `trees`, yielding a
+        `ProjectResult` for each. With every stage serial, the results come in
+        the order of `trees`; otherwise, in the order they are ready.
+        """
+        stages = [partial(_guarded, stage) for stage in self._stages()]
+        if all(executor == "serial" for executor in self.executors.values()):
+            for tree in trees:
+                project = _Project(tree, self.options)
+                for stage in stages:
+                    project = stage(project)
+                yield ProjectResult._of(project)
+            return
+
+        pools = []
+        queues = [queue.Queue(self.queue_size) for _ in range(len(STAGES) + 1)]
+        # set when the caller stops early, for every thread to give up waiting
+        stop = threading.Event()
+        threads = [threading.Thread(target=self._feed, args=(trees, queues[0], stop))]
+        for index, (name, stage) in enumerate(zip(STAGES, stages)):
+            executor = self.executors[name]
+            if executor == "process":
+                pool = ProcessPoolExecutor(self.workers)
+                pools.append(pool)
+                stage = partial(_in_process, pool, stage)
+            workers = 1 if executor == "serial" else self.workers
+            threads.append(
+                threading.Thread(
+                    target=self._run_stage,
+                    args=(stage, workers, queues[index], queues[index + 1], stop),
+                )
+            )
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            while True:
+                project = queues[-1].get()
+                if project is _DONE:
+                    break
+                yield ProjectResult._of(project)
+        finally:
+            stop.set()
+            for pool in pools:
+                pool.shutdown(cancel_futures=True)
+            for thread in threads:
+                thread.join()
+
+    def _feed(
+        self, trees: Iterable[SourceTree], outbox: queue.Queue, stop: threading.Event
+    ) -> None:
+        for tree in trees:
+            if not _put(outbox, _Project(tree, self.options), stop):
+                return
+        _put(outbox, _DONE, stop)
+
+    @staticmethod
+    def _run_stage(
+        stage: Callable[[_Project], _Project],
+        workers: int,
+        inbox: queue.Queue,
+        outbox: queue.Queue,
+        stop: threading.Event,
+    ) -> None:
+        def work():
+            while True:
+                project = _get(inbox, stop)
+                if project is _DONE:
+                    # for the other threads of this stage to see too
+                    _put(inbox, _DONE, stop)
+                    return
+                if not _put(outbox, stage(project), stop):
+                    return
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        _put(outbox, _DONE, stop)
+
+
+# how often a thread blocked on a queue checks whether the run was stopped
+_POLL_INTERVAL = 0.1
+
+
+def _put(outbox: queue.Queue, item, stop: threading.Event) -> bool:
+    # False if the run was stopped before there was room for the item
+    while not stop.is_set():
+        try:
+            outbox.put(item, timeout=_POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(inbox: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return inbox.get(timeout=_POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def _in_process(
+    pool: ProcessPoolExecutor,
+    stage: Callable[[_Project], _Project],
+    project: _Project,
+) -> _Project:
+    if project.error is not None:
+        return project
+    try:
+        return pool.submit(stage, _without_shared_state(project)).result()
+    except Exception as e:
+        # such as a tree which cannot be sent to the worker
+        project.error = e
+        return project
@@ -26,5 +26,11 @@ class EmptyConstraint(VersionConstraint):
     def difference(self, other):
         return self
 
+    def __eq__(self, other):
+        return isinstance(other, EmptyConstraint)
+
+    def __hash__(self):
+        return hash(EmptyConstraint)
+
     def __str__(self):
         return "<empty>"
@@ -0,0 +1,293 @@
+"""
+A compact form of a version constraint, for set algebra over many ranges.
+
+A `VersionUnion` is a list of `VersionRange` objects, and each operation on it
+creates many intermediate ranges. An `IntervalSet` instead keeps the bounds of
+its intervals in one sorted list, alternating between the start and the end of
+each interval, with the `Version` of each bound in a parallel list. Whether a
+bound is inclusive is part of its sort key, so intersections, unions and
+differences are single linear merges of two such lists.
+
+Each bound is the position just before or just after a version: `(key, 0)` is
+just before the version with that key, and `(key, 1)` just after it. An interval
+starts at one bound and ends at the next, so `>=1.0,<2.0` runs from just before
+1.0 to just before 2.0, and `1.5` alone from just before 1.5 to just after it.
+"""
+
+from bisect import bisect_right
+from functools import reduce
+from math import inf
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .empty_constraint import EmptyConstraint
+from .version import Version
+from .version_constraint import VersionConstraint
+from .version_range import VersionRange
+from .version_union import VersionUnion
+
+_BEFORE, _AFTER = 0, 1
+# the bounds of an interval unbounded below or above
+_LOWEST = ((), _BEFORE)
+_HIGHEST = ((inf,), _BEFORE)
+
+
+def _parts_key(parts) -> tuple:
+    # numbers sort before names, and fewer parts before more
+    return tuple((0, part) if isinstance(part, int) else (1, part) for part in parts)
+
+
+def _version_key(version: Version) -> tuple:
+    """
+    A key which sorts versions in the same order as comparing them does.
+    """
+    return (
+        version.major,
+        version.minor,
+        version.patch,
+        version.rest,
+        # pre-releases come before the release, builds after it
+        0 if version.is_prerelease() else 1,
+        _parts_key(version.prerelease),
+        1 if version.build else 0,
+        _parts_key(version.build),
+    )
+
+
+def _range_bounds(version_range: VersionRange) -> Tuple[tuple, tuple]:
+    if version_range.min is None:
+        start = _LOWEST
+    else:
+        position = _BEFORE if version_range.include_min else _AFTER
+        start = (_version_key(version_range.min), position)
+    if version_range.max is None:
+        end = _HIGHEST
+    else:
+        position = _AFTER if version_range.include_max else _BEFORE
+        end = (_version_key(version_range.max), position)
+    return start, end
+
+
+def _ranges(constraint: VersionConstraint) -> List[VersionRange]:
+    # the ranges a constraint allows, in order, which conflicts.py and
+    # matrix.py sweep over too
+    if constraint.is_empty():
+        return []
+    if isinstance(constraint, VersionUnion):
+        return list(constraint.ranges)
+    # a Version is a range of its own, from itself to itself
+    return [constraint]
+
+
+def _piece(
+    start: tuple, low: Optional[Version], end: tuple, high: Optional[Version]
+) -> VersionRange:
+    if low is not None and low == high:
+        return low
+    return VersionRange(
+        low,
+        high,
+        include_min=low is not None and start[1] == _BEFORE,
+        include_max=high is not None and end[1] == _AFTER,
+    )
+
+
+class IntervalSet:
+    """
+    The versions allowed by a constraint, as sorted, disjoint intervals.
+
+    Only which versions are allowed is kept: a range created with
+    `always_include_max_prerelease` becomes an interval ending at its maximum,
+    and comes back from `to_constraint` as a plain `VersionRange`.
+    """
+
+    def __init__(self, bounds: List[tuple], versions: List[Optional[Version]]):
+        # not meant to be called directly: see `of`
+        self._bounds = bounds
+        self._versions = versions
+        self._hash = None
+
+    @classmethod
+    def of(cls, constraint: VersionConstraint) -> "IntervalSet":
+        bounds = []
+        versions = []
+        for version_range in sorted(_ranges(constraint)):
+            start, end = _range_bounds(version_range)
+            if bounds and start <= bounds[-1]:
+                # overlapping or touching the previous interval, which a union
+                # never has but a list of ranges may
+                if end > bounds[-1]:
+                    bounds[-1] = end
+                    versions[-1] = version_range.max
+                continue
+            bounds += (start, end)
+            versions += (version_range.min, version_range.max)
+        return cls(bounds, versions)
+
+    def to_constraint(self) -> VersionConstraint:
+        ranges = []
+        for index in range(0, len(self._bounds), 2):
+            start, end = self._bounds[index : index + 2]  # noqa: E203
+            low, high = self._versions[index : index + 2]  # noqa: E203
+            ranges.append(_piece(start, low, end, high))
+
+        if not ranges:
+            return EmptyConstraint()
+        if len(ranges) == 1:
+            return ranges[0]
+        return VersionUnion(*ranges)
+
+    def is_empty(self) -> bool:
+        return not self._bounds
+
+    def is_any(self) -> bool:
+        return self._bounds == [_LOWEST, _HIGHEST]
+
+    def allows(self, version: Version) -> bool:
+        # inside an interval when an odd number of bounds come before it
+        return bisect_right(self._bounds, (_version_key(version), _BEFORE)) % 2 == 1
+
+    def _merge(
+        self, other: "IntervalSet", keep: Callable[[bool, bool], bool]
+    ) -> "IntervalSet":
+        """
+        The intervals where `keep` holds, given whether each position is in this
+        set and in `other`, found by walking both lists of bounds in order.
+        """
+        ours, theirs = self._bounds, other._bounds
+        bounds = []
+        versions = []
+        i = j = 0
+        in_ours = in_theirs = inside = False
+        while i < len(ours) or j < len(theirs):
+            if j == len(theirs) or (i < len(ours) and ours[i] <= theirs[j]):
+                bound, version = ours[i], self._versions[i]
+            else:
+                bound, version = theirs[j], other._versions[j]
+            if i < len(ours) and ours[i] == bound:
+                in_ours = not in_ours
+                i += 1
+            if j < len(theirs) and theirs[j] == bound:
+                in_theirs = not in_theirs
+                j += 1
+
+            if keep(in_ours, in_theirs) != inside:
+                inside = not inside
+                bounds.append(bound)
+                versions.append(version)
+        return IntervalSet(bounds, versions)
+
+    def intersect(self, other: "IntervalSet") -> "IntervalSet":
+        return self._merge(other, lambda ours, theirs: ours and theirs)
+
+    def union(self, other: "IntervalSet") -> "IntervalSet":
+        return self._merge(other, lambda ours, theirs: ours or theirs)
+
+    def difference(self, other: "IntervalSet") -> "IntervalSet":
+        return self._merge(other, lambda ours, theirs: ours and not theirs)
+
+    __and__ = intersect
+    __or__ = union
+    __sub__ = difference
+
+    def intervals(
+        self,
+    ) -> List[Tuple[Optional[Version], bool, Optional[Version], bool]]:
+        """
+        One `(min, include min, max, include max)` per interval, in order, with
+        None for an unbounded end.
+        """
+        return [
+            (
+                self._versions[index],
+                self._versions[index] is not None and self._bounds[index][1] == _BEFORE,
+                self._versions[index + 1],
+                self._versions[index + 1] is not None
+                and self._bounds[index + 1][1] == _AFTER,
+            )
+            for index in range(0, len(self._bounds), 2)
+        ]
+
+    def __len__(self):
+        return len(self._bounds) // 2
+
+    def __eq__(self, other):
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return self._bounds == other._bounds
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(tuple(self._bounds))
+        return self._hash
+
+    def __str__(self):
+        return str(self.to_constraint())
+
+    def __repr__(self):
+        return "<IntervalSet {}>".format(str(self))
+
+
+def intersect_all(constraints: Iterable[VersionConstraint]) -> VersionConstraint:
+    """
+    The versions allowed by every one of `constraints`, found with one sort of
+    the bounds of all their ranges and one sweep over them. Wherever a range of
+    each constraint overlaps, only those ranges are intersected, so the result
+    is equal to that of intersecting the constraints one after the other.
+    """
+    constraints = list(constraints)
+    if not constraints:
+        return VersionRange()
+    if len(constraints) == 1:
+        return constraints[0]
+    if len(constraints) == 2:
+        # a single intersection costs less than setting up the sweep
+        return constraints[0].intersect(constraints[1])
+    if any(constraint.is_empty() for constraint in constraints):
+        return EmptyConstraint()
+
+    events = []
+    for index, constraint in enumerate(constraints):
+        previous_end = None
+        for version_range in _ranges(constraint):
+            start, end = _range_bounds(version_range)
+            if previous_end is not None and start <= previous_end:
+                # a union whose ranges touch or overlap (which one ending
+                # before the pre-releases of its maximum can): rare enough to
+                # intersect the constraints in turn
+                return reduce(
+                    lambda result, other: result.intersect(other), constraints
+                )
+            previous_end = end
+            events.append((start, index, version_range))
+            events.append((end, index, None))
+    events.sort(key=lambda event: (event[0], event[1]))
+
+    # the range of each constraint the sweep is in
+    active: Dict[int, VersionRange] = {}
+    pieces = []
+    position = 0
+    while position < len(events):
+        bound = events[position][0]
+        while position < len(events) and events[position][0] == bound:
+            _, index, version_range = events[position]
+            if version_range is None:
+                del active[index]
+            else:
+                active[index] = version_range
+            position += 1
+
+        if len(active) == len(constraints):
+            # intersected in the order of their constraints, which matters
+            # for a range always including the pre-releases of its maximum
+            # and one starting among those
+            piece = reduce(
+                lambda result, other: result.intersect(other),
+                [active[index] for index in sorted(active)],
+            )
+            if not piece.is_empty():
+                pieces.append(piece)
+
+    if len(pieces) == 1:
+        return pieces[0]
+    # sorted, with any pieces which touch merged, as every union is
+    return VersionUnion.of(*pieces)
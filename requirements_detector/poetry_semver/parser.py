@@ -0,0 +1,550 @@
+"""
+A hand-written parser for Poetry's constraint syntax.
+
+The constraints used to be split and matched with regular expressions, some of
+which (those anchored at the end of the constraint, and the lookbehinds used to
+split it) can backtrack exponentially on long, crafted inputs. This parser
+accepts exactly the same constraints, with the same results, but reads each one
+in a single pass: it only ever looks a bounded distance back, and the rare
+version which the simple left-to-right reading can't settle is decided by one
+right-to-left pass over it.
+"""
+
+from typing import List, Optional, Tuple
+
+from .interval_set import intersect_all
+from .version import Version, _is_numbers
+from .version_constraint import VersionConstraint
+from .version_range import VersionRange
+from .version_union import VersionUnion
+
+# what the end of a constraint may be followed by, "$" in a regular expression
+_NEWLINE = "\n"
+
+_OPERATORS = ("<>", "!=", ">=", ">", "<=", "<", "==", "=")
+_SEPARATORS = " ,"
+_WILDCARDS = "xX*"
+# the pre-release modifiers, in the order they are tried
+_PRERELEASES = ("beta", "b", "c", "pre", "rc", "alpha", "a", "patch", "pl", "p", "dev")
+_BUILD_CHARS = frozenset(
+    "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ-"
+)
+# a character which can't be part of a version, to pad the text being read with
+_PADDING = "\0\0\0\0"
+
+
+def _end(text: str) -> int:
+    # where "$" matches: the end, or before a final newline
+    if text.endswith(_NEWLINE):
+        return len(text) - 1
+    return len(text)
+
+
+def _digits(text: str, pos: int) -> int:
+    while text[pos].isdecimal():
+        pos += 1
+    return pos
+
+
+def _build_chars(text: str, pos: int) -> int:
+    while text[pos] in _BUILD_CHARS:
+        pos += 1
+    return pos
+
+
+def _prereleases(text: str, pos: int) -> List[str]:
+    # the modifiers a pre-release could start with at pos, in order
+    start = text[pos : pos + 5].lower()  # noqa: E203
+    if start.startswith("post"):
+        return []
+    return [modifier for modifier in _PRERELEASES if start.startswith(modifier)]
+
+
+def _scan_version(text: str, pos: int) -> Tuple[int, int]:
+    """
+    Reads the longest version starting at `pos` (`text` must be padded), and
+    returns where it ends and how many of its numeric parts were given, or
+    `(-1, 0)` if there is no version there.
+    """
+    size = len(text) - len(_PADDING)
+    if text[pos] in "vV" and text[pos + 1].isdecimal():
+        pos += 1
+    if not text[pos].isdecimal():
+        return -1, 0
+
+    pos = _digits(text, pos)
+    numbers = 1
+    while numbers < 4 and text[pos] == "." and text[pos + 1].isdecimal():
+        pos = _digits(text, pos + 1)
+        numbers += 1
+
+    if text[pos] in "._-":
+        pos += 1
+
+    modifiers = _prereleases(text, pos)
+    if modifiers:
+        pos += len(modifiers[0])
+        while True:
+            if text[pos] in ".-" and text[pos + 1].isdecimal():
+                pos = _digits(text, pos + 1)
+            elif text[pos].isdecimal():
+                pos = _digits(text, pos)
+            else:
+                break
+
+    if text[pos] in "+-" and text[pos + 1] in _BUILD_CHARS:
+        pos += 1
+    if text[pos] in _BUILD_CHARS:
+        pos = _build_chars(text, pos)
+        while text[pos] == "." and text[pos + 1] in _BUILD_CHARS:
+            pos = _build_chars(text, pos + 1)
+
+    if text[pos] == "+" and pos + 1 < size and not text[pos + 1].isspace():
+        pos += 2
+        while pos < size and not text[pos].isspace():
+            pos += 1
+
+    return pos, numbers
+
+
+def _match_whole_version(text: str) -> Optional[int]:
+    """
+    Whether all of `text` can be read as a version, and if so how many of its
+    numeric parts are given. Going left to right, the longest reading of each
+    part is taken, which is not always the one which reads all of it (such as
+    "1.0a1.x", where "a1" is not a pre-release but part of the build): in that
+    case, every position is marked with whether the rest of the text can be
+    read from there, from the end back, and the parts are read again following
+    those marks.
+    """
+    if _is_numbers(text):
+        return text.count(".") + 1
+
+    padded = text + _PADDING
+    end, numbers = _scan_version(padded, 0)
+    if end == len(text):
+        return numbers
+
+    size = len(text)
+
+    def at(pos):
+        return padded[pos] if pos < size else "\0"
+
+    def marks():
+        return [False] * (size + 3)
+
+    # "+build" up to the end
+    plus = marks()
+    plus[size] = True
+    spaceless = size
+    for pos in range(size - 1, -1, -1):
+        if text[pos].isspace():
+            spaceless = pos
+        plus[pos] = text[pos] == "+" and spaceless == size and pos + 1 < size
+
+    # build characters in dot-separated segments, then "+build"
+    segment = marks()
+    in_segment = marks()
+    for pos in range(size, -1, -1):
+        char = at(pos)
+        in_segment[pos] = (
+            plus[pos]
+            or (char == "." and segment[pos + 1])
+            or (char in _BUILD_CHARS and in_segment[pos + 1])
+        )
+        segment[pos] = char in _BUILD_CHARS and in_segment[pos + 1]
+
+    build = marks()
+    for pos in range(size, -1, -1):
+        build[pos] = plus[pos] or segment[pos] or (at(pos) in "+-" and segment[pos + 1])
+
+    # the numbers of a pre-release, then the build
+    numbered = marks()
+    in_number = marks()
+    for pos in range(size, -1, -1):
+        char = at(pos)
+        numbered[pos] = (
+            build[pos]
+            or (char.isdecimal() and in_number[pos + 1])
+            or (char in ".-" and at(pos + 1).isdecimal() and in_number[pos + 2])
+        )
+        in_number[pos] = numbered[pos] or (char.isdecimal() and in_number[pos + 1])
+
+    modified = marks()
+    for pos in range(size, -1, -1):
+        modified[pos] = build[pos] or any(
+            numbered[pos + len(modifier)] for modifier in _prereleases(padded, pos)
+        )
+
+    suffix = marks()
+    for pos in range(size, -1, -1):
+        suffix[pos] = modified[pos] or (at(pos) in "._-" and modified[pos + 1])
+
+    # the optional numeric parts, from the fourth back to the second; each
+    # `within` marks a digit from which the rest of its number may be followed
+    # by what comes next
+    following = suffix
+    optional_parts = []
+    for _ in range(3):
+        within = marks()
+        for pos in range(size - 1, -1, -1):
+            within[pos] = text[pos].isdecimal() and (
+                following[pos + 1] or (at(pos + 1).isdecimal() and within[pos + 1])
+            )
+        part = marks()
+        for pos in range(size, -1, -1):
+            part[pos] = following[pos] or (
+                at(pos) == "." and at(pos + 1).isdecimal() and within[pos + 1]
+            )
+        optional_parts.append((following, within))
+        following = part
+
+    pos = 1 if at(0) in "vV" and at(1).isdecimal() else 0
+    if not at(pos).isdecimal():
+        return None
+
+    def longest_number(pos, then):
+        # the longest run of digits from `pos` which `then` can follow
+        last = None
+        while at(pos).isdecimal():
+            pos += 1
+            if then[pos]:
+                last = pos
+        return last
+
+    pos = longest_number(pos, following)
+    if pos is None:
+        return None
+    numbers = 1
+    for then, within in reversed(optional_parts):
+        if at(pos) == "." and at(pos + 1).isdecimal() and within[pos + 1]:
+            pos = longest_number(pos + 1, then)
+            numbers += 1
+    return numbers
+
+
+def _split_or(constraints: str) -> List[str]:
+    if "|" not in constraints:
+        return [constraints]
+    parts = []
+    start = 0
+    while True:
+        pipe = constraints.find("|", start)
+        if pipe == -1:
+            parts.append(constraints[start:])
+            return parts
+        parts.append(constraints[start:pipe].rstrip())
+        start = pipe + 1
+        if constraints[start : start + 1] == "|":  # noqa: E203
+            start += 1
+        while start < len(constraints) and constraints[start].isspace():
+            start += 1
+
+
+def _separator_end(constraints: str, start: int, end: int) -> Optional[int]:
+    """
+    Where the separator in `constraints[start:end]`, a run of spaces and commas,
+    ends, or None if the run doesn't separate two constraints. A run separates
+    constraints unless it only trails the last one, or a comma right after it
+    or a hyphen touching it make it part of a constraint.
+    """
+    size = len(constraints)
+
+    def stops(pos):
+        # whether the constraints can continue from pos: not at a comma, nor
+        # at the end, nor before a final newline
+        if pos >= size or constraints[pos] == ",":
+            return False
+        return not (pos == size - 1 and constraints[pos] == _NEWLINE)
+
+    def at(pos):
+        return constraints[pos] if pos < size else ""
+
+    spaces = start
+    while spaces < end and constraints[spaces] == " ":
+        spaces += 1
+    after_comma = spaces + 1
+    while after_comma < end and constraints[after_comma] == " ":
+        after_comma += 1
+
+    # the separator is the comma after the leading spaces, or failing that one
+    # of the spaces, the last one first
+    for separator in range(spaces, start - 1, -1):
+        if separator == end:
+            continue
+        if separator == start and constraints[start - 1] == "-":
+            continue
+        if at(separator + 1) == "-":
+            continue
+        last = spaces if separator < spaces else after_comma
+        if stops(last):
+            return last
+        if last > separator + 1:
+            return last - 1
+    return None
+
+
+def _split_and(constraints: str) -> List[str]:
+    if " " not in constraints and "," not in constraints:
+        return [constraints]
+    parts = []
+    start = 0
+    pos = 0
+    size = len(constraints)
+    while pos < size:
+        if constraints[pos] not in _SEPARATORS:
+            pos += 1
+            continue
+        end = pos + 1
+        while end < size and constraints[end] in _SEPARATORS:
+            end += 1
+        if pos > 0 and constraints[pos - 1] not in "=><":
+            separator_end = _separator_end(constraints, pos, end)
+            if separator_end is not None:
+                parts.append(constraints[start:pos])
+                start = separator_end
+        pos = end
+    parts.append(constraints[start:])
+    return parts
+
+
+def parse_constraint(constraints: str) -> VersionConstraint:
+    if constraints == "*":
+        return VersionRange()
+
+    or_groups = []
+    for or_constraint in _split_or(constraints.strip()):
+        and_constraints = _split_and(or_constraint)
+        if len(and_constraints) == 1:
+            # by far the most common case, with nothing to intersect
+            or_groups.append(parse_single_constraint(and_constraints[0]))
+        else:
+            or_groups.append(
+                intersect_all(map(parse_single_constraint, and_constraints))
+            )
+
+    if len(or_groups) == 1:
+        return or_groups[0]
+    return VersionUnion.of(*or_groups)
+
+
+def _is_wildcard(constraint: str) -> bool:
+    if constraint[:1] not in ("v", "V", "x", "X", "*"):
+        return False
+    padded = constraint + _PADDING
+    end = _end(constraint)
+    pos = 1 if padded[0] in "vV" and padded[1] in _WILDCARDS else 0
+    if padded[pos] not in _WILDCARDS:
+        return False
+    pos += 1
+    while padded[pos] == "." and padded[pos + 1] in _WILDCARDS:
+        pos += 2
+    return pos == end
+
+
+def _wildcard_range(constraint: str) -> Optional[VersionConstraint]:
+    # "1.*", "!=1.2.x" and the like
+    if not any(wildcard in constraint for wildcard in _WILDCARDS):
+        return None
+    padded = constraint + _PADDING
+    end = _end(constraint)
+    pos = 0
+    op = padded[:2]
+    if op in ("!=", "=="):
+        pos = 2
+    else:
+        op = None
+    while pos < end and padded[pos].isspace():
+        pos += 1
+    if padded[pos] == "v" and padded[pos + 1].isdecimal():
+        pos += 1
+    if not padded[pos].isdecimal():
+        return None
+
+    numbers = []
+    while len(numbers) < 3 and padded[pos].isdecimal():
+        number_end = _digits(padded, pos)
+        numbers.append(padded[pos:number_end])
+        pos = number_end
+        if not (padded[pos] == "." and padded[pos + 1].isdecimal()):
+            break
+        pos += 1
+    if padded[pos] != "." or padded[pos + 1] not in _WILDCARDS:
+        return None
+    while padded[pos] == "." and padded[pos + 1] in _WILDCARDS:
+        pos += 2
+    if pos != end:
+        return None
+
+    major = int(numbers[0])
+    if len(numbers) > 1:
+        version = Version(major, int(numbers[1]), 0)
+        result = VersionRange(
+            version,
+            version.next_minor,
+            include_min=True,
+            always_include_max_prerelease=True,
+        )
+    elif major == 0:
+        result = VersionRange(max=Version(1, 0, 0))
+    else:
+        version = Version(major, 0, 0)
+        result = VersionRange(
+            version,
+            version.next_major,
+            include_min=True,
+            always_include_max_prerelease=True,
+        )
+
+    if op == "!=":
+        result = VersionRange().difference(result)
+    return result
+
+
+def _basic(constraint: str) -> Optional[VersionConstraint]:
+    # a version, optionally after a comparison operator
+    padded = constraint + _PADDING
+    op = None
+    if constraint[:1] in ("<", ">", "!", "="):
+        for operator in _OPERATORS:
+            if constraint.startswith(operator):
+                op = operator
+                break
+    pos = len(op) if op else 0
+    while padded[pos] != "\0" and padded[pos].isspace():
+        pos += 1
+
+    if _is_numbers(constraint[pos:]):
+        # most often, the rest is a version made of plain numbers
+        end = len(constraint)
+    else:
+        end, _ = _scan_version(padded, pos)
+    if end != -1:
+        version = constraint[pos:end]
+    elif padded[pos : pos + 3].lower() == "dev":  # noqa: E203
+        version = constraint[pos : pos + 3]  # noqa: E203
+    else:
+        return None
+
+    if version == "dev":
+        version = "0.0-dev"
+
+    try:
+        version = Version.parse(version)
+    except ValueError:
+        raise ValueError("Could not parse version constraint: {}".format(constraint))
+
+    return _comparison(op, version)
+
+
+def _comparison(op: Optional[str], version: Version) -> VersionConstraint:
+    if op == "<":
+        return VersionRange(max=version)
+    elif op == "<=":
+        return VersionRange(max=version, include_max=True)
+    elif op == ">":
+        return VersionRange(min=version)
+    elif op == ">=":
+        return VersionRange(min=version, include_min=True)
+    elif op == "!=":
+        return VersionUnion(VersionRange(max=version), VersionRange(min=version))
+    else:
+        return version
+
+
+def _tilde(version: Version, text: str) -> VersionConstraint:
+    high = version.stable.next_minor
+    if len(text.split(".")) == 1:
+        high = version.stable.next_major
+
+    return VersionRange(
+        version, high, include_min=True, always_include_max_prerelease=True
+    )
+
+
+def _tilde_pep440(version: Version, numbers: int) -> VersionConstraint:
+    # as many of the major, minor and patch numbers as are given
+    precision = min(numbers, 3)
+    if precision == 2:
+        low = version
+        high = version.stable.next_major
+    else:
+        low = Version(version.major, version.minor, version.patch)
+        high = version.stable.next_minor
+
+    return VersionRange(low, high, include_min=True, always_include_max_prerelease=True)
+
+
+def _caret(version: Version) -> VersionConstraint:
+    return VersionRange(
+        version,
+        version.next_breaking,
+        include_min=True,
+        always_include_max_prerelease=True,
+    )
+
+
+def _numbers_constraint(constraint: str) -> Optional[VersionConstraint]:
+    """
+    The constraint if it is an operator directly followed by a version made of
+    plain numbers, which most are, read without any scanning.
+    """
+    op = constraint[:2]
+    if op not in ("~=", ">=", "<=", "!=", "==", "<>"):
+        op = constraint[:1]
+        if op not in ("^", "~", ">", "<", "="):
+            op = ""
+    text = constraint[len(op) :]  # noqa: E203
+    if not text or not _is_numbers(text):
+        return None
+
+    version = Version._from_numbers(text)
+    if op == "^":
+        return _caret(version)
+    if op == "~":
+        return _tilde(version, text)
+    if op == "~=":
+        return _tilde_pep440(version, text.count(".") + 1)
+    return _comparison(op, version)
+
+
+def parse_single_constraint(constraint: str) -> VersionConstraint:
+    result = _numbers_constraint(constraint)
+    if result is not None:
+        return result
+
+    if _is_wildcard(constraint):
+        return VersionRange()
+
+    whole = constraint[: _end(constraint)]
+
+    # Tilde range
+    if whole[:1] == "~" and whole[1:2] != "=":
+        text = whole[1:]
+        if _match_whole_version(text) is not None:
+            return _tilde(Version.parse(text), text)
+
+    # PEP 440 Tilde range (~=)
+    if whole[:2] == "~=":
+        text = whole[2:]
+        numbers = _match_whole_version(text)
+        if numbers is not None:
+            return _tilde_pep440(Version.parse(text), numbers)
+
+    # Caret range
+    if whole[:1] == "^":
+        text = whole[1:]
+        if _match_whole_version(text) is not None:
+            return _caret(Version.parse(text))
+
+    # X Range
+    result = _wildcard_range(constraint)
+    if result is not None:
+        return result
+
+    # Basic comparator
+    result = _basic(constraint)
+    if result is not None:
+        return result
+
+    raise ValueError("Could not parse version constraint: {}".format(constraint))
@@ -1,5 +1,5 @@
 import re
-from typing import List, Optional, Union
+from typing import Optional, Tuple, Union
 
 from .empty_constraint import EmptyConstraint
 from .exceptions import ParseVersionError
@@ -8,6 +8,21 @@ from .version_constraint import VersionConstraint
 from .version_range import VersionRange
 from .version_union import VersionUnion
 
+# what a dotted version with fewer than four numbers is padded with
+_MISSING_PARTS = {1: ["0", "0", "0"], 2: ["0", "0"], 3: ["0"], 4: []}
+
+
+def _is_numbers(text: str) -> bool:
+    # one to four dot-separated ASCII numbers, such as "1.2.3"
+    return (
+        text.isascii()
+        and text.replace(".", "").isdigit()
+        and text.count(".") < 4
+        and text[0] != "."
+        and text[-1] != "."
+        and ".." not in text
+    )
+
 
 class Version(VersionRange):
     """
@@ -75,16 +90,17 @@ class Version(VersionRange):
                 text += "+{}".format(build)
 
         self._text = text
+        self._hash = None
 
         pre = self._normalize_prerelease(pre)
 
-        self._prerelease = []
+        self._prerelease = ()
         if pre is not None:
             self._prerelease = self._split_parts(pre)
 
         build = self._normalize_build(build)
 
-        self._build = []
+        self._build = ()
         if build is not None:
             if build.startswith(("-", "+")):
                 build = build[1:]
@@ -108,11 +124,11 @@ class Version(VersionRange):
         return self._rest
 
     @property
-    def prerelease(self) -> List[str]:
+    def prerelease(self) -> Tuple[Union[str, int], ...]:
         return self._prerelease
 
     @property
-    def build(self) -> List[str]:
+    def build(self) -> Tuple[Union[str, int], ...]:
         return self._build
 
     @property
@@ -194,6 +210,31 @@ class Version(VersionRange):
 
     @classmethod
     def parse(cls, text: str) -> "Version":
+        # most versions are plain dotted numbers, which need neither the regex
+        # nor the normalisation of pre-release and build parts done by __init__
+        if isinstance(text, str) and _is_numbers(text):
+            return cls._from_numbers(text)
+
+        return cls._parse_complete(text)
+
+    @classmethod
+    def _from_numbers(cls, text: str) -> "Version":
+        parts = text.split(".")
+        version = cls.__new__(cls)
+        version._precision = len(parts)
+        parts += _MISSING_PARTS[len(parts)]
+        version._major = int(parts[0])
+        version._minor = int(parts[1])
+        version._patch = int(parts[2])
+        version._rest = int(parts[3])
+        version._text = text
+        version._hash = None
+        version._prerelease = ()
+        version._build = ()
+        return version
+
+    @classmethod
+    def _parse_complete(cls, text: str) -> "Version":
         try:
             match = COMPLETE_VERSION.match(text)
         except TypeError:
@@ -215,7 +256,7 @@ class Version(VersionRange):
         if build:
             build = build.lstrip("+")
 
-        return Version(major, minor, patch, rest, pre, build, text)
+        return cls(major, minor, patch, rest, pre, build, text)
 
     def is_any(self):
         return False
@@ -327,7 +368,7 @@ class Version(VersionRange):
 
         return build
 
-    def _split_parts(self, text: str) -> List[Union[str, int]]:
+    def _split_parts(self, text: str) -> Tuple[Union[str, int], ...]:
         parts = text.split(".")
 
         for i, part in enumerate(parts):
@@ -336,7 +377,7 @@ class Version(VersionRange):
             except (TypeError, ValueError):
                 continue
 
-        return parts
+        return tuple(parts)
 
     def __lt__(self, other):
         return self._cmp(other) < 0
@@ -397,7 +438,7 @@ class Version(VersionRange):
 
         return 0
 
-    def _cmp_lists(self, a: List, b: List) -> int:
+    def _cmp_lists(self, a: Tuple, b: Tuple) -> int:
         for i in range(max(len(a), len(b))):
             a_part = None
             if i < len(a):
@@ -453,12 +494,14 @@ class Version(VersionRange):
         return "<Version {}>".format(str(self))
 
     def __hash__(self):
-        return hash(
-            (
-                self.major,
-                self.minor,
-                self.patch,
-                ".".join(str(p) for p in self.prerelease),
-                ".".join(str(p) for p in self.build),
+        if self._hash is None:
+            self._hash = hash(
+                (
+                    self.major,
+                    self.minor,
+                    self.patch,
+                    ".".join(str(p) for p in self.prerelease),
+                    ".".join(str(p) for p in self.build),
+                )
             )
-        )
+        return self._hash
@@ -1,7 +1,16 @@
+from typing import Iterable
+
 import semver
 
+_intersect_all = None
+
 
 class VersionConstraint:
+    """
+    The versions a requirement allows. Constraints never change once created,
+    so they can be hashed, and used as set members or dictionary keys.
+    """
+
     def is_empty(self) -> bool:
         raise NotImplementedError()
 
@@ -25,3 +34,28 @@ class VersionConstraint:
 
     def difference(self, other: "VersionConstraint") -> "VersionConstraint":
         raise NotImplementedError()
+
+    @staticmethod
+    def intersect_all(
+        constraints: Iterable["VersionConstraint"],
+    ) -> "VersionConstraint":
+        """
+        The versions allowed by all of `constraints`, worked out in a single
+        pass rather than one intersection at a time.
+        """
+        global _intersect_all
+        if _intersect_all is None:
+            # imported when first needed, as interval_set builds on this module
+            from .interval_set import intersect_all as _intersect_all
+
+        return _intersect_all(constraints)
+
+    @staticmethod
+    def union_all(constraints: Iterable["VersionConstraint"]) -> "VersionConstraint":
+        """
+        The versions allowed by any of `constraints`, worked out in a single
+        pass rather than one union at a time.
+        """
+        from .version_union import VersionUnion
+
+        return VersionUnion.of(*constraints)
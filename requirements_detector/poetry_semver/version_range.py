@@ -35,6 +35,9 @@ class VersionRange(VersionConstraint):
         self._full_max = full_max
         self._include_min = include_min
         self._include_max = include_max
+        # worked out on first use
+        self._str = None
+        self._hash = None
 
     @property
     def min(self):
@@ -428,6 +431,11 @@ class VersionRange(VersionConstraint):
         return 0
 
     def __str__(self):
+        if self._str is None:
+            self._str = self._format()
+        return self._str
+
+    def _format(self) -> str:
         text = ""
 
         if self.min is not None:
@@ -449,4 +457,6 @@ class VersionRange(VersionConstraint):
         return "<VersionRange ({})>".format(str(self))
 
     def __hash__(self):
-        return hash((self.min, self.max, self.include_min, self.include_max))
+        if self._hash is None:
+            self._hash = hash((self.min, self.max, self.include_min, self.include_max))
+        return self._hash
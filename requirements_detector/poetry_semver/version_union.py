@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, List, Optional
 
 import semver
 
@@ -6,6 +6,7 @@ from .empty_constraint import EmptyConstraint
 from .version_constraint import VersionConstraint
 
 if TYPE_CHECKING:
+    from .version import Version
     from .version_range import VersionRange
 
 
@@ -19,7 +20,10 @@ class VersionUnion(VersionConstraint):
     """
 
     def __init__(self, *ranges):
-        self._ranges = list(ranges)
+        self._ranges = tuple(ranges)
+        # worked out on first use
+        self._str = None
+        self._hash = None
 
     @property
     def ranges(self):
@@ -140,6 +144,9 @@ class VersionUnion(VersionConstraint):
         return VersionUnion.of(self, other)
 
     def difference(self, other: VersionConstraint) -> VersionConstraint:
+        if other.is_empty():
+            return self
+
         our_ranges = iter(self._ranges)
         their_ranges = iter(self._ranges_for(other))
         new_ranges = []
@@ -233,11 +240,18 @@ class VersionUnion(VersionConstraint):
 
         raise ValueError("Unknown VersionConstraint type {}".format(constraint))
 
-    def _excludes_single_version(self) -> bool:
+    def _excluded_version(self) -> Optional["Version"]:
+        # the one version this union allows all others but, if it is such
         from .version import Version
         from .version_range import VersionRange
 
-        return isinstance(VersionRange().difference(self), Version)
+        complement = VersionRange().difference(self)
+        if isinstance(complement, Version):
+            return complement
+        return None
+
+    def _excludes_single_version(self) -> bool:
+        return self._excluded_version() is not None
 
     def __eq__(self, other):
         if not isinstance(other, VersionUnion):
@@ -245,13 +259,19 @@ class VersionUnion(VersionConstraint):
 
         return self._ranges == other.ranges
 
-    def __str__(self):
-        from .version_range import VersionRange
-
-        if self._excludes_single_version():
-            return "!={}".format(VersionRange().difference(self))
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self._ranges)
+        return self._hash
 
-        return " || ".join([str(r) for r in self._ranges])
+    def __str__(self):
+        if self._str is None:
+            excluded = self._excluded_version()
+            if excluded is not None:
+                self._str = "!={}".format(excluded)
+            else:
+                self._str = " || ".join([str(r) for r in self._ranges])
+        return self._str
 
     def __repr__(self):
         return "<VersionUnion {}>".format(str(self))
@@ -0,0 +1,115 @@
+"""
+Reads only the tables of a pyproject.toml file which can declare dependencies.
+
+Many pyproject.toml files are mostly configuration for other tools, hundreds of
+lines of `[tool.*]` tables, and parsing all of it with tomllib (which is pure
+Python) costs far more than reading the few tables wanted. Instead, the raw
+bytes are scanned with one regular expression which skips over strings and
+comments at once, so that table headers can be told apart from the same text
+inside a multi-line string or array. Only the `project`, `build-system` and
+`tool.poetry` tables (and their sub-tables) are then cut out and parsed.
+
+Some documents cannot be taken apart like that, and are parsed in full: those
+with keys at the top level or in a `[tool]` table, which may be dotted keys or
+inline tables defining part of the wanted tables, those with headers using
+quoted keys, and those the scan cannot make sense of.
+"""
+
+import re
+from typing import List, Optional, Tuple
+
+try:
+    # added in Python 3.11: https://docs.python.org/3/library/tomllib.html
+    import tomllib
+except ImportError:
+    # for Python <= 3.10:
+    import tomli as tomllib
+
+__all__ = ["load_dependency_tables"]
+
+# everything which may contain brackets without them being structure, taken as a
+# whole, and the brackets themselves; a quote matching none of the strings is
+# left unterminated, which the scan gives up on
+_TOKEN = re.compile(
+    rb'"""(?:[^"\\]|\\[\s\S]|"(?!""))*"""(?:""?)?'
+    rb"|'''[\s\S]*?'''(?:''?)?"
+    rb'|"(?:[^"\\\n]|\\.)*"'
+    rb"|'[^'\n]*'"
+    rb"|#[^\n]*"
+    rb"|[\[\]{}\"']"
+)
+_KEY = rb"[A-Za-z0-9_-]+"
+_HEADER = re.compile(
+    rb"\[\[?[ \t]*(%s(?:[ \t]*\.[ \t]*%s)*)[ \t]*\]\]?[ \t]*(?:#[^\n]*)?\r?(?=\n|$)"
+    % (_KEY, _KEY)
+)
+_DOT = re.compile(rb"[ \t]*\.[ \t]*")
+# a line with anything on it but a comment
+_CONTENT = re.compile(rb"^[ \t]*[^\s#]", re.MULTILINE)
+
+
+def _wanted(path: Tuple[bytes, ...]) -> bool:
+    return path[0] in (b"project", b"build-system") or path[:2] == (b"tool", b"poetry")
+
+
+def _sections(data: bytes) -> Optional[List[Tuple[Tuple[bytes, ...], int, int]]]:
+    """
+    The key path, and where the header starts and ends, of every table, or None
+    if the document is not understood well enough to tell where they are.
+    """
+    sections = []
+    depth = 0
+    position = 0
+    while True:
+        m = _TOKEN.search(data, position)
+        if m is None:
+            return sections
+        token = m.group()
+        position = m.end()
+
+        if token in (b"[", b"{"):
+            line_start = data.rfind(b"\n", 0, m.start()) + 1
+            before = data[line_start : m.start()]  # noqa: E203
+            if depth == 0 and token == b"[" and not before.strip():
+                # a bracket starting a line outside any value opens a header
+                header = _HEADER.match(data, m.start())
+                if header is None:
+                    return None
+                path = tuple(_DOT.split(header.group(1)))
+                sections.append((path, m.start(), header.end()))
+                position = header.end()
+            else:
+                depth += 1
+        elif token in (b"]", b"}"):
+            depth -= 1
+            if depth < 0:
+                return None
+        elif token in (b'"', b"'"):
+            return None
+
+
+def _loads(data: bytes) -> dict:
+    return tomllib.loads(data.decode("utf-8", errors="replace"))
+
+
+def load_dependency_tables(data: bytes) -> dict:
+    """
+    Parses the tables of a pyproject.toml document which can declare
+    dependencies, leaving the other tables out of the result.
+    """
+    sections = _sections(data)
+    if sections is None:
+        return _loads(data)
+
+    top_level_end = sections[0][1] if sections else len(data)
+    if _CONTENT.search(data, 0, top_level_end):
+        return _loads(data)
+
+    chunks = []
+    ends = [start for _, start, _ in sections[1:]] + [len(data)]
+    for (path, start, body), end in zip(sections, ends):
+        if path == (b"tool",) and _CONTENT.search(data, body, end):
+            return _loads(data)
+        if _wanted(path):
+            chunks.append(data[start:end])
+    return _loads(b"\n".join(chunks))
@@ -12,10 +12,17 @@ list.
 import os
 import re
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 from urllib import parse
 
 from packaging.requirements import Requirement
+from packaging.utils import canonicalize_name
+
+from .pep508 import parse_simple
+
+# the name leading a PEP 508 requirement, and the scheme leading a URL
+_NAME = re.compile(r"[A-Za-z0-9](?:[A-Za-z0-9._-]*[A-Za-z0-9])?")
+_SCHEME = re.compile(r"[A-Za-z][A-Za-z0-9+.-]*:")
 
 
 def _is_filepath(req):
@@ -38,6 +45,40 @@ def _parse_egg_name(url_fragment):
     return parts["egg"][0]  # taking the first value mimics pip's behaviour
 
 
+def parse_name(line: str) -> Optional[str]:
+    """
+    The canonical name of the package a requirement line asks for, or None if
+    it names none. The line is read as `DetectedRequirement.parse` reads it, but
+    no URL or version specifier is parsed: only enough of the line is scanned
+    to find the name, or the `#egg=` name of a URL.
+    """
+    line = line.strip()
+    if line.startswith("--hash=sha256:"):
+        return None
+
+    comment_pos = re.search(r"\s#", line)
+    if comment_pos:
+        line = line[: comment_pos.start()]
+    if line.startswith("-e "):
+        line = line[3:]
+    elif line.startswith("--editable "):
+        line = line[11:]
+    line = line.partition(";")[0]
+
+    if _SCHEME.match(line) is None and not _is_filepath(line):
+        m = _NAME.match(line)
+        if m is None:
+            return None
+        return canonicalize_name(m.group())
+
+    # some kind of URL, named only by its fragment
+    fragment = line.partition("#")[2]
+    name = _parse_egg_name(fragment)
+    if not name:
+        return None
+    return canonicalize_name(name)
+
+
 def _strip_fragment(urlparts):
     new_urlparts = (
         urlparts.scheme,
@@ -57,20 +98,41 @@ class DetectedRequirement:
         url: str = None,
         requirement: Requirement = None,
         location_defined: Path = None,
+        version_specs: List[Tuple[str, str]] = None,
+        group: str = None,
+        extra: str = None,
+        markers: str = None,
     ):
         if requirement is not None:
             self.name = requirement.name
-            self.requirement = requirement
+            self._requirement = requirement
             self.version_specs = [
                 (s.operator, s.version) for s in requirement.specifier
             ]
             self.url = None
         else:
             self.name = name
-            self.version_specs = []
+            self.version_specs = version_specs or []
             self.url = url
-            self.requirement = None
+            self._requirement = None
+        # the text the requirement was read from without packaging, which only
+        # builds a Requirement of it if one is asked for
+        self._requirement_text = None
         self.location_defined = location_defined
+        # where in a pyproject.toml the requirement was declared: the dependency
+        # group ("dev", a Poetry group, or "build-system") and the extra, if any
+        self.group = group
+        self.extra = extra
+        # the PEP 508 environment markers the requirement only applies under
+        if markers is None and requirement is not None and requirement.marker:
+            markers = str(requirement.marker)
+        self.markers = markers
+
+    @property
+    def requirement(self) -> Optional[Requirement]:
+        if self._requirement is None and self._requirement_text is not None:
+            self._requirement = Requirement(self._requirement_text)
+        return self._requirement
 
     def _format_specs(self) -> str:
         return ",".join(
@@ -97,24 +159,33 @@ class DetectedRequirement:
             rep = "%s (%s)" % (rep, self.url)
         return rep
 
+    def _key(self):
+        # requirements which only differ in where they apply are not the same
+        return (
+            self.name,
+            self.url,
+            tuple(self.version_specs),
+            self.markers,
+            self.group,
+            self.extra,
+        )
+
     def __hash__(self):
-        return hash(str(self.name) + str(self.url) + str(self.version_specs))
+        return hash(self._key())
 
     def __repr__(self):
         return "<DetectedRequirement:%s>" % str(self)
 
     def __eq__(self, other):
-        return (
-            self.name == other.name
-            and self.url == other.url
-            and self.version_specs == other.version_specs
-        )
+        return self._key() == other._key()
 
     def __gt__(self, other):
         return (self.name or "") > (other.name or "")
 
     @staticmethod
-    def parse(line, location_defined: Path = None) -> Optional["DetectedRequirement"]:
+    def parse(
+        line, location_defined: Path = None, names_only: bool = False
+    ) -> Optional["DetectedRequirement"]:
         # the options for a Pip requirements file are:
         #
         # 1) <dependency_name>
@@ -124,6 +195,14 @@ class DetectedRequirement:
         # 5) <path_to_dir>
         # 6) (-e|--editable) <path_to_dir>(#egg=<dependency_name)?
         # 7) (-e|--editable) <vcs_url>#egg=<dependency_name>
+        #
+        # with `names_only`, the requirement only has the canonical name
+        if names_only:
+            name = parse_name(line)
+            if name is None:
+                return None
+            return DetectedRequirement(name=name, location_defined=location_defined)
+
         line = line.strip()
 
         if line.startswith("--hash=sha256:"):
@@ -139,8 +218,23 @@ class DetectedRequirement:
         # strip the editable flag
         line = re.sub("^(-e|--editable) ", "", line)
 
-        # remove the python version stuff from poetry files
-        line = line.split(";")[0]
+        # keep the environment markers apart, such as the python version
+        # stuff from poetry files, which may be followed by a line continuation
+        line, _, markers = line.partition(";")
+        markers = markers.strip().rstrip("\\").strip() or None
+
+        simple = parse_simple(line)
+        if simple is not None:
+            # by far the most common case, which is read in the same way as
+            # packaging reads it, but much faster
+            detected = DetectedRequirement(
+                name=simple.name,
+                version_specs=simple.specs,
+                location_defined=location_defined,
+                markers=markers,
+            )
+            detected._requirement_text = line
+            return detected
 
         url = parse.urlparse(line)
 
@@ -163,7 +257,7 @@ class DetectedRequirement:
                 return None
             else:
                 return DetectedRequirement(
-                    requirement=req, location_defined=location_defined
+                    requirement=req, location_defined=location_defined, markers=markers
                 )
 
         # otherwise, this is some kind of URL
@@ -174,5 +268,5 @@ class DetectedRequirement:
             url = "%s://%s" % (vcs_scheme, url)
 
         return DetectedRequirement(
-            name=name, url=url, location_defined=location_defined
+            name=name, url=url, location_defined=location_defined, markers=markers
         )
@@ -0,0 +1,190 @@
+"""
+The same package is often required from several places in a project, spelt
+differently and with different version constraints: `Django>=4` in one file and
+`django<5` in another. A `RequirementSet` holds one entry per package, keyed by
+its PEP 503 canonical name, which combines the version specifiers of every
+source and remembers where each of them came from.
+
+Sources which only apply under different environment markers, such as
+`Django>=4; sys_platform == "win32"` and `Django<4; sys_platform == "linux"`,
+are required in different places, so combining their specifiers would require
+versions which neither asks for. They are kept as separate entries of the
+package instead, one for each set of markers.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from packaging.utils import canonicalize_name
+
+from .poetry_semver import parse_constraint
+from .poetry_semver.version_constraint import VersionConstraint
+from .requirement import DetectedRequirement
+
+__all__ = ["RequirementSet"]
+
+
+def _key(requirement: Union[str, DetectedRequirement]) -> str:
+    if isinstance(requirement, str):
+        return canonicalize_name(requirement)
+    if requirement.name:
+        return canonicalize_name(requirement.name)
+    # a URL with no egg name can only be matched by the URL itself
+    return requirement.url or ""
+
+
+def _merge(sources: List[DetectedRequirement]) -> List[DetectedRequirement]:
+    by_markers: Dict[Optional[str], List[DetectedRequirement]] = {}
+    for source in sources:
+        by_markers.setdefault(source.markers, []).append(source)
+    return [_combine(group) for group in by_markers.values()]
+
+
+def _combine(sources: List[DetectedRequirement]) -> DetectedRequirement:
+    # sources which all apply under the same markers
+    first = sources[0]
+    if len(sources) == 1:
+        return first
+
+    # every specifier has to hold, so the union of the lists is the intersection
+    # of the versions they allow
+    version_specs = list(
+        dict.fromkeys(spec for source in sources for spec in source.version_specs)
+    )
+    url = next((source.url for source in sources if source.url), None)
+    # a package required unconditionally anywhere is required unconditionally
+    group = None if any(s.group is None for s in sources) else first.group
+    extra = None if any(s.extra is None for s in sources) else first.extra
+    return DetectedRequirement(
+        name=first.name,
+        url=url,
+        location_defined=first.location_defined,
+        version_specs=version_specs,
+        group=group,
+        extra=extra,
+        markers=first.markers,
+    )
+
+
+class RequirementSet:
+    """
+    Requirements indexed by canonical package name. Lookups, additions and the
+    set operations are all by name, so `"Django"`, `"django"` and a requirement
+    for either find the same entry.
+    """
+
+    def __init__(self, requirements: Iterable[DetectedRequirement] = ()):
+        self._sources: Dict[str, List[DetectedRequirement]] = {}
+        self._merged: Dict[str, List[DetectedRequirement]] = {}
+        self.update(requirements)
+
+    def add(self, requirement: DetectedRequirement):
+        key = _key(requirement)
+        sources = self._sources.setdefault(key, [])
+        for source in sources:
+            if source == requirement and (
+                source.location_defined,
+                source.group,
+                source.extra,
+            ) == (requirement.location_defined, requirement.group, requirement.extra):
+                # the very same requirement, from the very same place
+                return
+        sources.append(requirement)
+        self._merged.pop(key, None)
+
+    def update(self, requirements: Iterable[DetectedRequirement]):
+        for requirement in requirements:
+            self.add(requirement)
+
+    def merge(self, other: "RequirementSet") -> "RequirementSet":
+        """
+        A new set with the requirements of both, specifiers combined by name.
+        """
+        merged = RequirementSet()
+        for sources in self._sources.values():
+            merged.update(sources)
+        for sources in other._sources.values():
+            merged.update(sources)
+        return merged
+
+    def difference(self, other: "RequirementSet") -> "RequirementSet":
+        """
+        A new set with the packages of this set which `other` does not require
+        at all, whatever the version.
+        """
+        difference = RequirementSet()
+        for key, sources in self._sources.items():
+            if key not in other._sources:
+                difference.update(sources)
+        return difference
+
+    __or__ = merge
+    __sub__ = difference
+
+    def sources(self, name: str) -> List[DetectedRequirement]:
+        """
+        The requirements for `name` as found, one per source.
+        """
+        return list(self._sources[_key(name)])
+
+    def locations(self, name: str) -> List[Path]:
+        return [
+            source.location_defined
+            for source in self._sources[_key(name)]
+            if source.location_defined is not None
+        ]
+
+    def constraint(self, name: str) -> Optional[VersionConstraint]:
+        """
+        The versions of `name` allowed by all of its sources together, or None
+        if they are not all constraints `poetry_semver` understands. When its
+        sources apply under different markers, these are the versions allowed
+        by its entry `self[name]`.
+        """
+        specs = self[name]._format_specs()
+        try:
+            return parse_constraint(specs or "*")
+        except ValueError:
+            return None
+
+    def get(
+        self, name: str, default: Optional[DetectedRequirement] = None
+    ) -> Optional[DetectedRequirement]:
+        if name not in self:
+            return default
+        return self[name]
+
+    def _entries(self, key: str) -> List[DetectedRequirement]:
+        if key not in self._merged:
+            self._merged[key] = _merge(self._sources[key])
+        return self._merged[key]
+
+    def entries(self, name: str) -> List[DetectedRequirement]:
+        """
+        The combined requirements for `name`, one for each set of environment
+        markers its sources apply under.
+        """
+        return list(self._entries(_key(name)))
+
+    def __getitem__(self, name: str) -> DetectedRequirement:
+        # the entry which applies everywhere, if there is one
+        entries = self._entries(_key(name))
+        return next((entry for entry in entries if entry.markers is None), entries[0])
+
+    def __contains__(self, requirement: Union[str, DetectedRequirement]) -> bool:
+        return _key(requirement) in self._sources
+
+    def __iter__(self) -> Iterator[DetectedRequirement]:
+        for key in self._sources:
+            yield from self._entries(key)
+
+    def __len__(self):
+        # the number of entries, as many as there are packages unless some are
+        # required under different markers
+        return sum(
+            len({source.markers for source in sources})
+            for sources in self._sources.values()
+        )
+
+    def __repr__(self):
+        return "<RequirementSet:%s>" % ", ".join(str(req) for req in self)
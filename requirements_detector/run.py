@@ -1,10 +1,12 @@
+import argparse
 import sys
 from pathlib import Path
-from typing import NoReturn
+from typing import List, NoReturn, Optional
 
-from . import find_requirements
 from .exceptions import RequirementsNotFound
 from .formatters import FORMATTERS
+from .pipeline import STRATEGIES, Pipeline
+from .tree import FilesystemTree
 
 
 def _die(message) -> NoReturn:
@@ -12,11 +14,39 @@ def _die(message) -> NoReturn:
     sys.exit(1)
 
 
-def run() -> NoReturn:
-    if len(sys.argv) > 1:
-        path = Path(sys.argv[1])
-    else:
-        path = Path.cwd()
+def run(argv: Optional[List[str]] = None) -> NoReturn:
+    parser = argparse.ArgumentParser(
+        prog="detect-requirements",
+        description="List the requirements of a Python project.",
+    )
+    parser.add_argument("path", nargs="?", type=Path, default=Path.cwd())
+    parser.add_argument(
+        "--names-only",
+        action="store_true",
+        help="only list the canonical name of each package, which is faster",
+    )
+    parser.add_argument(
+        "--lockfiles",
+        action="store_true",
+        help="use a poetry.lock, uv.lock or Pipfile.lock before anything else",
+    )
+    parser.add_argument(
+        "--strategy",
+        default="default",
+        help="%s, or a comma-separated list of the sources to try in order; "
+        "exhaustive lists what each source found" % ", ".join(STRATEGIES),
+    )
+    args = parser.parse_args(argv)
+    path = args.path
+    strategy = args.strategy
+    if strategy not in STRATEGIES:
+        strategy = [name.strip() for name in strategy.split(",")]
+    try:
+        pipeline = Pipeline(
+            lockfiles=args.lockfiles, names_only=args.names_only, strategy=strategy
+        )
+    except ValueError as e:
+        parser.error(str(e))
 
     if not path.exists():
         _die("%s does not exist" % path)
@@ -24,13 +54,17 @@ def run() -> NoReturn:
     if not path.is_dir():
         _die("%s is not a directory" % path)
 
+    format_name = "requirements_file"  # TODO: other output formats such as JSON
     try:
-        requirements = find_requirements(path)
+        if strategy == "exhaustive":
+            by_source = pipeline.detect_by_source(FilesystemTree(path))
+            for source, requirements in by_source.items():
+                sys.stdout.write("# %s\n" % source)
+                FORMATTERS[format_name](requirements)
+        else:
+            FORMATTERS[format_name](pipeline.detect(FilesystemTree(path)))
     except RequirementsNotFound:
         _die("Unable to find requirements at %s" % path)
-
-    format_name = "requirements_file"  # TODO: other output formats such as JSON
-    FORMATTERS[format_name](requirements)
     sys.exit(0)
 
 
@@ -0,0 +1,258 @@
+"""
+Scans many projects on a few workers, the most expensive projects first.
+
+Detection costs very different amounts from one project to the next: a project
+with only a requirements.txt takes a fraction of a millisecond, while a large
+setup.py, parsed by astroid, can take seconds. Scanned in directory order, a few
+of those left until last keep one worker busy long after the others are done.
+
+So every project is first discovered, which only lists its files, and its cost
+estimated by a `CostModel` from which sources it has and the sizes of their
+files. Projects are then dealt out longest first, each to the worker with the
+least estimated work so far, and a worker which runs out takes projects from the
+end of the queue of the worker with the most left, where the cheapest are.
+
+Each result comes with how long its project took, so that the estimates can be
+checked against the time really spent, and `CostModel.tuned` corrects the
+weights of the model from those timings.
+"""
+
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .pipeline import (
+    Pipeline,
+    ProjectResult,
+    _discover,
+    _guarded,
+    _in_process,
+    _Project,
+    _settle,
+)
+from .tree import SourceTree
+
+__all__ = ["CostModel", "RootTiming", "ScheduledResult", "Scheduler"]
+
+# for each source: the number of its files and their size in bytes
+Features = Dict[str, Tuple[int, int]]
+
+
+class RootTiming(NamedTuple):
+    root: Path
+    # seconds
+    estimate: float
+    seconds: float
+    features: Features
+    # the worker which scanned the project, and whether it was taken from
+    # another worker's queue
+    worker: int = 0
+    stolen: bool = False
+
+
+class ScheduledResult(NamedTuple):
+    result: ProjectResult
+    timing: RootTiming
+
+
+class CostModel:
+    """
+    Estimates how many seconds detection takes for a project, as `base` plus,
+    for each source, a cost per file and a cost per byte of its files. Sources
+    without weights of their own cost as much as `default`.
+    """
+
+    DEFAULT_WEIGHTS = {
+        # parsed with astroid, which dwarfs everything else
+        "setup.py": (2e-3, 4e-6),
+        "setup.cfg": (5e-4, 4e-7),
+        "pyproject.toml": (5e-4, 4e-7),
+        "lockfile": (5e-4, 2e-7),
+    }
+    # assumed for files whose size the tree cannot tell without reading them
+    TYPICAL_SIZE = 2048
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, Tuple[float, float]]] = None,
+        default: Tuple[float, float] = (2e-4, 4e-7),
+        base: float = 1e-3,
+    ):
+        self.weights = dict(self.DEFAULT_WEIGHTS if weights is None else weights)
+        self.default = default
+        self.base = base
+
+    def features(self, project: _Project) -> Features:
+        features: Features = {}
+        for file in project.files:
+            try:
+                size = project.tree.size(file.name)
+            except OSError:
+                # gone or unreadable since it was listed: reading it fails in
+                # the scan of its project, where errors are recorded
+                size = None
+            files, total = features.get(file.source.name, (0, 0))
+            features[file.source.name] = (
+                files + 1,
+                total + (self.TYPICAL_SIZE if size is None else size),
+            )
+        return features
+
+    def _source_cost(self, source: str, files: int, size: int) -> float:
+        per_file, per_byte = self.weights.get(source, self.default)
+        return files * per_file + size * per_byte
+
+    def estimate(self, features: Features) -> float:
+        return self.base + sum(
+            self._source_cost(source, files, size)
+            for source, (files, size) in features.items()
+        )
+
+    def tuned(self, timings: Iterable[RootTiming]) -> "CostModel":
+        """
+        A copy of this model with the weights of each source scaled by how much
+        longer (or shorter) than estimated the projects it dominated the
+        estimate of took, as the median over those projects.
+        """
+        ratios: Dict[str, List[float]] = {}
+        for timing in timings:
+            if not timing.features or timing.seconds <= 0:
+                continue
+            estimate = self.estimate(timing.features)
+            dominant = max(
+                timing.features,
+                key=lambda source: self._source_cost(source, *timing.features[source]),
+            )
+            ratios.setdefault(dominant, []).append(timing.seconds / estimate)
+
+        weights = dict(self.weights)
+        for source, source_ratios in ratios.items():
+            ratio = statistics.median(source_ratios)
+            per_file, per_byte = weights.get(source, self.default)
+            weights[source] = (per_file * ratio, per_byte * ratio)
+        return CostModel(weights, self.default, self.base)
+
+
+class _Job(NamedTuple):
+    project: _Project
+    estimate: float
+    features: Features
+
+
+class Scheduler:
+    """
+    Detects the requirements of many projects with `pipeline` (by default, one
+    with the default options) on `workers` workers, scheduling them longest
+    first by the estimates of `cost_model`.
+
+    `executor` is "thread", or "process" for each worker to hand its projects
+    to a pool of worker processes, as with the stages of a `Pipeline`.
+    """
+
+    def __init__(
+        self,
+        pipeline: Optional[Pipeline] = None,
+        cost_model: Optional[CostModel] = None,
+        workers: int = 4,
+        executor: str = "thread",
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError("Unknown executor: %s" % executor)
+        self.pipeline = Pipeline() if pipeline is None else pipeline
+        self.cost_model = CostModel() if cost_model is None else cost_model
+        self.workers = workers
+        self.executor = executor
+
+    def _plan(self, trees: Iterable[SourceTree]) -> List[_Job]:
+        def discover(tree):
+            project = _guarded(
+                partial(_discover, self.pipeline.sources),
+                _Project(tree, self.pipeline.options),
+            )
+            features = self.cost_model.features(project)
+            return _Job(project, self.cost_model.estimate(features), features)
+
+        # listing directories waits on the disk far more than it computes
+        with ThreadPoolExecutor(self.workers) as pool:
+            jobs = list(pool.map(discover, trees))
+        return sorted(jobs, key=lambda job: job.estimate, reverse=True)
+
+    def run(self, trees: Iterable[SourceTree]) -> Iterator[ScheduledResult]:
+        """
+        Detects the requirements of every project in `trees`, yielding each
+        result, with its timing, as it is ready. With one worker, the results
+        come most expensive first.
+        """
+        jobs = self._plan(trees)
+        settle = partial(_guarded, _settle)
+        pool = None
+        if self.executor == "process":
+            pool = ProcessPoolExecutor(self.workers)
+            settle = partial(_in_process, pool, settle)
+
+        queues = [deque() for _ in range(self.workers)]
+        loads = [0.0] * self.workers
+        for job in jobs:
+            worker = loads.index(min(loads))
+            queues[worker].append(job)
+            loads[worker] += job.estimate
+        lock = threading.Lock()
+        results: queue.Queue = queue.Queue()
+
+        def take(worker: int) -> Tuple[Optional[_Job], bool]:
+            with lock:
+                if queues[worker]:
+                    job, stolen = queues[worker].popleft(), False
+                else:
+                    victims = [i for i in range(self.workers) if queues[i]]
+                    if not victims:
+                        return None, False
+                    worker = max(victims, key=lambda i: loads[i])
+                    job, stolen = queues[worker].pop(), True
+                loads[worker] -= job.estimate
+                return job, stolen
+
+        def step(worker: int) -> bool:
+            job, stolen = take(worker)
+            if job is None:
+                return False
+            start = time.perf_counter()
+            project = settle(job.project)
+            timing = RootTiming(
+                project.tree.root,
+                job.estimate,
+                time.perf_counter() - start,
+                job.features,
+                worker,
+                stolen,
+            )
+            results.put(ScheduledResult(ProjectResult._of(project), timing))
+            return True
+
+        def work(worker: int) -> None:
+            while step(worker):
+                pass
+
+        try:
+            if self.workers == 1:
+                while step(0):
+                    yield results.get()
+                return
+
+            threads = [
+                threading.Thread(target=work, args=(worker,), daemon=True)
+                for worker in range(self.workers)
+            ]
+            for thread in threads:
+                thread.start()
+            for _ in jobs:
+                yield results.get()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
@@ -0,0 +1,188 @@
+"""
+setup.py parsing in a pool of isolated, pre-warmed worker processes.
+
+A pathological setup.py (huge literal tables, deep nesting) can keep astroid busy
+for minutes, exhaust the recursion limit or take a lot of memory. Parsed in a
+worker process with a wall-time budget, such a file costs at most that budget:
+the worker is killed and replaced, and `CouldNotParseRequirements` is raised as
+for any other file which cannot be parsed. Workers are also replaced after a
+number of files, which caps the memory that astroid can accumulate in them.
+"""
+
+import multiprocessing
+import queue
+import threading
+from pathlib import Path
+from typing import List, Optional, Union
+
+from .exceptions import CouldNotParseRequirements
+from .requirement import DetectedRequirement
+from .tree import FilesystemTree, SourceTree
+
+__all__ = ["SetupPyPool"]
+
+
+def _worker_main(conn, search_path):
+    # importing astroid is the slow part of starting up, so it is done before the
+    # first file arrives rather than while it waits
+    from .handle_setup import SetupModuleCache, _setup_requires
+
+    # kept for as long as the worker, which is at most one scan, as a pool is
+    # made for each
+    module_cache = SetupModuleCache(search_path)
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+
+        source, root = job
+        tree = FilesystemTree(Path(root)) if root is not None else None
+        try:
+            conn.send((True, _setup_requires(source, tree, module_cache)))
+        except Exception:
+            # whatever went wrong is confined to this file
+            conn.send((False, None))
+
+
+class _Worker:
+    def __init__(self, context, search_path):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, search_path), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+        self.files_parsed = 0
+
+    def stop(self, kill: bool = False):
+        if not kill:
+            try:
+                self.conn.send(None)
+            except OSError:
+                kill = True
+        if kill:
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class SetupPyPool:
+    """
+    A pool of `workers` processes parsing setup.py files, shared safely by any
+    number of threads. Each file gets `timeout` seconds of wall time and files
+    larger than `max_size` bytes are refused outright; a worker is replaced after
+    `max_files_per_worker` files. `search_path` is handed to the
+    `SetupModuleCache` of each worker.
+
+    As with a `SetupModuleCache`, the modules parsed by each worker are kept
+    until the worker is replaced, and files are assumed not to change meanwhile:
+    use a new pool for each scan. Use it as a context manager, or call `close`
+    when done.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        timeout: float = 30.0,
+        max_size: int = 1024 * 1024,
+        max_files_per_worker: int = 500,
+        search_path=(),
+    ):
+        self.timeout = timeout
+        self.max_size = max_size
+        self.max_files_per_worker = max_files_per_worker
+        self._search_path = [str(path) for path in search_path]
+        self._context = multiprocessing.get_context()
+        # workers are replaced by whichever thread was using them
+        self._lock = threading.Lock()
+        self._workers = [
+            self._spawn() for _ in range(workers or multiprocessing.cpu_count())
+        ]
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self._context, self._search_path)
+
+    def _replace(self, worker: _Worker, kill: bool) -> _Worker:
+        worker.stop(kill=kill)
+        replacement = self._spawn()
+        with self._lock:
+            self._workers[self._workers.index(worker)] = replacement
+        return replacement
+
+    def _requires(self, source: str, root: Optional[Path]) -> List[str]:
+        if len(source.encode("utf-8")) > self.max_size:
+            raise CouldNotParseRequirements
+
+        worker = self._idle.get()
+        try:
+            try:
+                worker.conn.send((source, None if root is None else str(root)))
+                if not worker.conn.poll(self.timeout):
+                    worker = self._replace(worker, kill=True)
+                    raise CouldNotParseRequirements
+                parsed, requires = worker.conn.recv()
+            except (EOFError, OSError):
+                # the worker died, most likely by running out of memory
+                worker = self._replace(worker, kill=True)
+                raise CouldNotParseRequirements
+
+            worker.files_parsed += 1
+            if worker.files_parsed >= self.max_files_per_worker:
+                worker = self._replace(worker, kill=False)
+        finally:
+            self._idle.put(worker)
+
+        if not parsed:
+            raise CouldNotParseRequirements
+        return requires
+
+    def parse(
+        self,
+        source: str,
+        setup_file: Path,
+        tree: Optional[SourceTree] = None,
+        names_only: bool = False,
+    ) -> List[DetectedRequirement]:
+        """
+        Parses the content of a setup.py file. Imported constants are only
+        resolved when `tree` is on disk, as workers cannot read any other tree.
+        """
+        root = tree.root if isinstance(tree, FilesystemTree) else None
+        requirements = [
+            DetectedRequirement.parse(req, setup_file, names_only)
+            for req in self._requires(source, root)
+        ]
+        return [requirement for requirement in requirements if requirement is not None]
+
+    def from_setup_py(
+        self, setup_file: Union[str, Path], names_only: bool = False
+    ) -> List[DetectedRequirement]:
+        if isinstance(setup_file, str):
+            setup_file = Path(setup_file)
+
+        if setup_file.stat().st_size > self.max_size:
+            raise CouldNotParseRequirements
+
+        with setup_file.open() as f:
+            source = f.read()
+        return self.parse(
+            source, setup_file, FilesystemTree(setup_file.parent), names_only
+        )
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+        for worker in workers:
+            worker.stop()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
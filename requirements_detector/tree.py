@@ -0,0 +1,59 @@
+"""
+Detection only ever needs to list the files at the root of a project (and in its
+`requirements` folder) and to read a handful of small files. A `SourceTree` is
+the read-only view which provides exactly that, so that the working tree on disk
+and other places project files can live all look the same to the parsers.
+"""
+
+from pathlib import Path
+from typing import List, Optional
+
+
+class SourceTree:
+    def __init__(self, root: Path):
+        self.root = root
+
+    def list_files(self, directory: str = "") -> List[str]:
+        """
+        Returns the names of the regular files directly inside `directory`,
+        which is relative to the root of the tree.
+        """
+        raise NotImplementedError()
+
+    def is_dir(self, directory: str) -> bool:
+        raise NotImplementedError()
+
+    def read_bytes(self, name: str) -> bytes:
+        raise NotImplementedError()
+
+    def read_text(self, name: str) -> str:
+        return self.read_bytes(name).decode("utf-8", errors="replace")
+
+    def size(self, name: str) -> Optional[int]:
+        """
+        The size of `name` in bytes, if it can be known without reading it.
+        """
+        return None
+
+    def location(self, name: str) -> Path:
+        """
+        The path reported as `location_defined` for requirements read from `name`.
+        """
+        return self.root / name
+
+
+class FilesystemTree(SourceTree):
+    def list_files(self, directory: str = "") -> List[str]:
+        path = self.root / directory
+        if not path.is_dir():
+            return []
+        return [entry.name for entry in path.iterdir() if entry.is_file()]
+
+    def is_dir(self, directory: str) -> bool:
+        return (self.root / directory).is_dir()
+
+    def read_bytes(self, name: str) -> bytes:
+        return (self.root / name).read_bytes()
+
+    def size(self, name: str) -> Optional[int]:
+        return (self.root / name).stat().st_size
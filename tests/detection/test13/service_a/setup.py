@@ -0,0 +1,5 @@
+from setuptools import setup
+
+from shared.deps import COMMON
+
+setup(name="service-a", install_requires=COMMON)
@@ -0,0 +1,5 @@
+from setuptools import setup
+
+from shared import deps
+
+setup(name="service-b", install_requires=deps.COMMON)
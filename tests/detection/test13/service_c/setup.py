@@ -0,0 +1,10 @@
+from setuptools import find_packages, setup
+
+from svc_c._deps import INSTALL_REQUIRES
+
+setup(
+    name="service-c",
+    packages=find_packages("src"),
+    package_dir={"": "src"},
+    install_requires=INSTALL_REQUIRES,
+)
@@ -0,0 +1 @@
+BASE = ("Django==1.5.0", "django-gubbins==1.1.2")
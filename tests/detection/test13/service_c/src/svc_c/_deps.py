@@ -0,0 +1 @@
+from ._base import BASE as INSTALL_REQUIRES
@@ -0,0 +1 @@
+COMMON = ["requests>=2.0", "attrs"]
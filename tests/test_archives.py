@@ -0,0 +1,169 @@
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from requirements_detector.archives import (
+    find_requirements_in_archive,
+    find_requirements_in_archives,
+)
+from requirements_detector.exceptions import RequirementsNotFound
+from requirements_detector.requirement import DetectedRequirement
+
+_TEST_DIR = Path(__file__).parent / "detection"
+
+
+def _expected(*requirements):
+    return sorted(DetectedRequirement.parse(req) for req in requirements)
+
+
+def _write_tar(path, files):
+    with tarfile.open(path, "w:gz") as tar:
+        for name, content in files.items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+
+
+def _write_zip(path, files):
+    with zipfile.ZipFile(path, "w") as zip_file:
+        for name, content in files.items():
+            zip_file.writestr(name, content)
+
+
+@pytest.fixture
+def archives(tmp_path):
+    _write_tar(
+        tmp_path / "simple-1.0.tar.gz",
+        {
+            "simple-1.0/setup.py": (_TEST_DIR / "test4/simple.py").read_text(),
+            "simple-1.0/simple/__init__.py": "",
+            "simple-1.0/tests/data/requirements.txt": "ignored==1.0\n",
+        },
+    )
+    _write_zip(
+        tmp_path / "reqs-2.0.zip",
+        {
+            "reqs-2.0/requirements.txt": "amqp==1.0.13\n",
+            "reqs-2.0/requirements/base.txt": "anyjson==0.3.3\n",
+        },
+    )
+    _write_zip(
+        tmp_path / "wheely-1.0-py3-none-any.whl",
+        {
+            "wheely/__init__.py": "",
+            "wheely/data/requirements.txt": "ignored==1.0\n",
+            "wheely-1.0.dist-info/METADATA": (
+                "Metadata-Version: 2.1\n"
+                "Name: wheely\n"
+                "Version: 1.0\n"
+                "Requires-Dist: requests (>=2.0)\n"
+                'Requires-Dist: pytest ; extra == "test"\n'
+                "\n"
+                "A long description.\n"
+            ),
+        },
+    )
+    _write_tar(
+        tmp_path / "modern-1.0.tar.gz",
+        {
+            "modern-1.0/PKG-INFO": (
+                "Metadata-Version: 2.2\nName: modern\nRequires-Dist: click>=8\n"
+            ),
+        },
+    )
+    _write_tar(tmp_path / "empty-1.0.tar.gz", {"empty-1.0/README": "nothing\n"})
+    (tmp_path / "notes.txt").write_text("not an archive\n")
+    return tmp_path
+
+
+def test_sdist(archives):
+    reqs = find_requirements_in_archive(archives / "simple-1.0.tar.gz")
+    assert reqs == _expected("Django==1.5.0", "django-gubbins==1.1.2")
+    assert (
+        reqs[0].location_defined == archives / "simple-1.0.tar.gz/simple-1.0/setup.py"
+    )
+
+
+def test_zip(archives):
+    reqs = find_requirements_in_archive(str(archives / "reqs-2.0.zip"))
+    assert reqs == _expected("amqp==1.0.13", "anyjson==0.3.3")
+
+
+def test_wheel(archives):
+    reqs = find_requirements_in_archive(archives / "wheely-1.0-py3-none-any.whl")
+    assert [str(req) for req in reqs] == ["pytest", "requests>=2.0"]
+    # pytest is only required by the "test" extra
+    assert [(req.name, req.extra) for req in reqs] == [
+        ("pytest", "test"),
+        ("requests", None),
+    ]
+
+
+def test_wheel_metadata_not_utf8(tmp_path):
+    wheel = tmp_path / "latin-1.0-py3-none-any.whl"
+    with zipfile.ZipFile(wheel, "w") as zip_file:
+        zip_file.writestr(
+            "latin-1.0.dist-info/METADATA",
+            "Name: latin\nAuthor: Jos\xe9\nRequires-Dist: six\n".encode("latin-1"),
+        )
+    assert find_requirements_in_archive(wheel) == _expected("six")
+
+
+def test_sdist_metadata(archives):
+    reqs = find_requirements_in_archive(archives / "modern-1.0.tar.gz")
+    assert reqs == _expected("click>=8")
+
+
+def test_nothing_found(archives):
+    with pytest.raises(RequirementsNotFound):
+        find_requirements_in_archive(archives / "empty-1.0.tar.gz")
+
+
+def test_unsupported(archives):
+    with pytest.raises(ValueError):
+        find_requirements_in_archive(archives / "notes.txt")
+
+
+def test_directory_of_archives(archives):
+    found = find_requirements_in_archives(archives)
+    assert sorted(path.name for path in found) == [
+        "empty-1.0.tar.gz",
+        "modern-1.0.tar.gz",
+        "reqs-2.0.zip",
+        "simple-1.0.tar.gz",
+        "wheely-1.0-py3-none-any.whl",
+    ]
+    assert found[archives / "empty-1.0.tar.gz"] == []
+    assert found[archives / "reqs-2.0.zip"] == _expected(
+        "amqp==1.0.13", "anyjson==0.3.3"
+    )
+
+
+def test_bad_archives_do_not_stop_the_others(archives):
+    (archives / "truncated-1.0.tar.gz").write_bytes(
+        (archives / "simple-1.0.tar.gz").read_bytes()[:40]
+    )
+    (archives / "broken-1.0.zip").write_bytes(b"PK not really a zip")
+    _write_tar(
+        archives / "badtoml-1.0.tar.gz",
+        {"badtoml-1.0/pyproject.toml": "[project\ndependencies = [\n"},
+    )
+
+    errors = {}
+    found = find_requirements_in_archives(archives, errors)
+    # unreadable, rather than without requirements
+    assert sorted(path.name for path in errors) == [
+        "badtoml-1.0.tar.gz",
+        "broken-1.0.zip",
+        "truncated-1.0.tar.gz",
+    ]
+    assert not any(path in found for path in errors)
+    assert isinstance(errors[archives / "broken-1.0.zip"], zipfile.BadZipFile)
+    assert found[archives / "empty-1.0.tar.gz"] == []
+    assert found[archives / "reqs-2.0.zip"] == _expected(
+        "amqp==1.0.13", "anyjson==0.3.3"
+    )
@@ -0,0 +1,135 @@
+import random
+
+from requirements_detector.conflicts import find_conflicts
+from requirements_detector.poetry_semver import Version, parse_constraint
+from requirements_detector.requirement import DetectedRequirement
+
+
+def _project(*lines):
+    return [DetectedRequirement.parse(line) for line in lines]
+
+
+def test_no_conflicts():
+    projects = {
+        "api": _project("Django>=3.2,<5", "six"),
+        "worker": _project("django>=4.0", "six==1.16.0"),
+        "web": _project("django~=4.2"),
+    }
+    assert find_conflicts(projects) == []
+
+
+def test_conflict():
+    projects = {
+        "api": _project("Django>=4.0,<5", "requests"),
+        "worker": _project("django<4"),
+        "web": _project("django==4.2.1"),
+        "cron": _project("DJANGO>4.2"),
+    }
+    (conflict,) = find_conflicts(projects)
+    assert conflict.name == "django"
+    assert conflict.compatible == ["api", "web", "cron"]
+    assert conflict.conflicting == ["worker"]
+    assert conflict.constraints["worker"] == "<4"
+
+
+def test_bounds_touching():
+    # an inclusive bound meets an inclusive one, not an exclusive one
+    assert find_conflicts({"a": _project("x<=2"), "b": _project("x>=2")}) == []
+    (conflict,) = find_conflicts({"a": _project("x<2"), "b": _project("x>=2")})
+    assert len(conflict.compatible) == 1
+
+
+def test_within_one_project():
+    # requirements on a package inside a project are combined first
+    projects = {
+        "a": _project("x>=2", "x<3"),
+        "b": _project("x==3.1"),
+    }
+    (conflict,) = find_conflicts(projects)
+    assert len(conflict.compatible) == 1
+
+
+def test_marker_split_entries_count_once():
+    projects = {
+        "a": _project(
+            'Django>=4; sys_platform == "win32"', 'django>=4.1; sys_platform == "linux"'
+        ),
+        "b": _project("django<4"),
+    }
+    (conflict,) = find_conflicts(projects)
+    assert sorted(conflict.compatible + conflict.conflicting) == ["a", "b"]
+
+
+def test_unions_and_unparseable():
+    projects = {
+        "a": _project("x!=2.0"),
+        "b": _project("x==2.0"),
+        "c": _project("x===2.0"),
+        "d": _project("x!=2.0,!=3.0"),
+    }
+    (conflict,) = find_conflicts(projects)
+    assert "c" not in conflict.constraints
+    assert conflict.compatible == ["a", "d"]
+    assert conflict.conflicting == ["b"]
+
+
+def _random_constraint(rng):
+    low = rng.randint(0, 8)
+    high = rng.randint(low, 10)
+    return rng.choice(
+        [
+            f">={low}.0,<{high}.0",
+            f">{low}.0,<={high}.0",
+            f"=={low}.{rng.randint(0, 3)}",
+            f"!={low}.0",
+            f"!={low}.0,!={high}.0",
+        ]
+    )
+
+
+def test_matches_brute_force():
+    rng = random.Random(1234)
+    candidates = [
+        Version.parse(f"{major}.{minor}") for major in range(12) for minor in range(5)
+    ]
+    candidates += [Version.parse(f"{major}.0.1") for major in range(12)]
+    for _ in range(200):
+        lines = {
+            project: f"x{_random_constraint(rng)}"
+            for project in range(rng.randint(2, 6))
+        }
+        projects = {project: _project(line) for project, line in lines.items()}
+
+        constraints = {
+            project: parse_constraint(line[1:]) for project, line in lines.items()
+        }
+        best = max(
+            sum(1 for constraint in constraints.values() if constraint.allows(version))
+            for version in candidates
+        )
+
+        conflicts = find_conflicts(projects)
+        if best == len(projects):
+            assert conflicts == []
+        else:
+            (conflict,) = conflicts
+            assert len(conflict.compatible) == best
+            # the group found really is compatible
+            assert any(
+                all(
+                    constraints[project].allows(version)
+                    for project in conflict.compatible
+                )
+                for version in candidates
+            )
+
+
+def test_benchmark(benchmark):
+    rng = random.Random(42)
+    projects = {
+        f"service-{n}": _project(
+            *(f"package{p}{_random_constraint(rng)}" for p in range(50))
+        )
+        for n in range(400)
+    }
+    benchmark(find_conflicts, projects)
@@ -1,14 +1,21 @@
+import tempfile
 from pathlib import Path
-from unittest import TestCase
+from unittest import TestCase, mock
+
+from packaging.utils import canonicalize_name
 
 from requirements_detector.detect import (
     CouldNotParseRequirements,
+    SetupModuleCache,
+    find_requirements,
     from_pyproject_toml,
     from_requirements_blob,
     from_requirements_dir,
     from_requirements_txt,
+    from_setup_cfg,
     from_setup_py,
 )
+from requirements_detector.exceptions import RequirementsNotFound
 from requirements_detector.requirement import DetectedRequirement
 
 _TEST_DIR = Path(__file__).parent / "detection"
@@ -107,6 +114,80 @@ class DependencyDetectionTest(TestCase):
 
         self.assertEqual("mixed>=1.0,<2.0", str(by_name["mixed"]))
 
+    def test_pyproject_toml_all_tables(self):
+        # PEP 621 and Poetry tables are all read, each tagged with its group/extra
+        filepath = _TEST_DIR / "test10/pyproject.toml"
+        reqs = from_pyproject_toml(filepath)
+
+        tags = {req.name: (req.group, req.extra) for req in reqs}
+        self.assertEqual(
+            {
+                "requests": (None, None),
+                "attrs": (None, None),
+                "sphinx": (None, "docs"),
+                "pytest": (None, "test"),
+                "coverage": (None, "test"),
+                "click": (None, None),
+                "pyroma": (None, "lint"),
+                "black": ("dev", None),
+                "mypy": ("typing", None),
+            },
+            tags,
+        )
+
+        by_name = {req.name: req for req in reqs}
+        self.assertEqual("requests>=2.28", str(by_name["requests"]))
+        self.assertEqual("mypy>=1.0,<2.0", str(by_name["mypy"]))
+
+    def test_pyproject_toml_build_system(self):
+        filepath = _TEST_DIR / "test10/pyproject.toml"
+        reqs = from_pyproject_toml(filepath, include_build_system=True)
+
+        build = sorted(str(req) for req in reqs if req.group == "build-system")
+        self.assertEqual(["poetry-core>=1.0", "wheel"], build)
+
+    def test_setup_cfg(self):
+        filepath = _TEST_DIR / "test12/setup.cfg"
+        reqs = from_setup_cfg(str(filepath))
+
+        extras = {str(req): req.extra for req in reqs}
+        self.assertEqual(
+            {
+                "Django>=1.5.0": None,
+                "django-gubbins==1.1.2": None,
+                "pytest>=7": "test",
+                "coverage": "test",
+                "sphinx>=7": "docs",
+                "sphinx-rtd-theme": "docs",
+            },
+            extras,
+        )
+
+    def test_setup_cfg_files_outside_the_project(self):
+        with tempfile.TemporaryDirectory() as directory:
+            root = Path(directory)
+            project = root / "project"
+            project.mkdir()
+            (root / "secret.txt").write_text("django\n")
+            (project / "inside.txt").symlink_to(root / "secret.txt")
+            for name in ["../secret.txt", str(root / "secret.txt"), "inside.txt"]:
+                (project / "setup.cfg").write_text(
+                    "[options]\ninstall_requires = file: %s\n" % name
+                )
+                with self.assertRaises(CouldNotParseRequirements):
+                    from_setup_cfg(project / "setup.cfg")
+                with self.assertRaises(RequirementsNotFound):
+                    find_requirements(project)
+
+    def test_setup_cfg_before_setup_py(self):
+        # the stub setup.py is never handed to astroid
+        with mock.patch(
+            "requirements_detector.pipeline._from_setup_source",
+            side_effect=AssertionError("setup.py was parsed"),
+        ):
+            reqs = find_requirements(_TEST_DIR / "test12")
+        self.assertEqual(6, len(reqs))
+
     def _test_setup_py(self, setup_py_file, *expected):
         filepath = _TEST_DIR / "test4" / setup_py_file
         dependencies = from_setup_py(str(filepath))
@@ -148,3 +229,66 @@ class DependencyDetectionTest(TestCase):
 
     def test_callable_install_requires(self):
         self._test_setup_py_not_parseable("callable.py")
+
+    def test_setup_py_imported_from_project(self):
+        filepath = _TEST_DIR / "test13/service_c/setup.py"
+        dependencies = from_setup_py(filepath)
+        expected = self._expected("Django==1.5.0", "django-gubbins==1.1.2")
+        self.assertEqual(expected, sorted(dependencies))
+
+    def test_setup_py_imported_from_outside_project(self):
+        filepath = _TEST_DIR / "test13/service_a/setup.py"
+        self.assertRaises(CouldNotParseRequirements, from_setup_py, filepath)
+
+    def test_setup_py_shared_module_cache(self):
+        cache = SetupModuleCache(search_path=[_TEST_DIR / "test13"])
+        expected = self._expected("requests>=2.0", "attrs")
+
+        for service in ("service_a", "service_b"):
+            dependencies = find_requirements(
+                _TEST_DIR / "test13" / service, module_cache=cache
+            )
+            self.assertEqual(expected, sorted(dependencies))
+
+        # shared/deps.py was parsed once, for both projects
+        self.assertEqual(1, len(cache))
+
+    def test_names_only(self):
+        for project in ("test1", "test2", "test6", "test8", "test9", "test10"):
+            full = find_requirements(_TEST_DIR / project)
+            fast = find_requirements(_TEST_DIR / project, names_only=True)
+            self.assertEqual(
+                sorted({canonicalize_name(req.name) for req in full if req.name}),
+                sorted(req.name for req in fast),
+            )
+            self.assertTrue(all(not req.version_specs for req in fast))
+
+    def test_names_only_from_functions(self):
+        self.assertEqual(
+            ["django", "south", "amqp", "six"],
+            [
+                req.name
+                for req in from_requirements_txt(
+                    _TEST_DIR / "test1/requirements.txt", names_only=True
+                )
+            ],
+        )
+        self.assertEqual(
+            ["django", "django-gubbins"],
+            sorted(
+                req.name
+                for req in from_setup_py(_TEST_DIR / "test4/simple.py", names_only=True)
+            ),
+        )
+
+    def test_strategy(self):
+        project = _TEST_DIR / "test12"
+        self.assertEqual(
+            find_requirements(project), find_requirements(project, strategy="first-hit")
+        )
+        self.assertEqual(
+            find_requirements(project),
+            find_requirements(project, strategy=["setup.py", "setup.cfg"]),
+        )
+        with self.assertRaises(RequirementsNotFound):
+            find_requirements(project, strategy=["setup.py", "requirements"])
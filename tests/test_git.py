@@ -0,0 +1,101 @@
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from requirements_detector import find_requirements_at_revision
+from requirements_detector.exceptions import RequirementsNotFound
+from requirements_detector.git import GitObjectReader, GitRevisionTree
+from requirements_detector.requirement import DetectedRequirement
+
+_TEST_DIR = Path(__file__).parent / "detection"
+
+
+def _git(repo, *args):
+    subprocess.run(
+        ["git", "-C", str(repo), "-c", "user.name=test", "-c", "user.email=t@t"]
+        + list(args),
+        check=True,
+        capture_output=True,
+    )
+
+
+def _commit(repo, files, message):
+    for name, content in files.items():
+        path = repo / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", message)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q")
+    _commit(
+        repo,
+        {
+            "requirements.txt": (_TEST_DIR / "test1/requirements.txt").read_text(),
+            "requirements/base.txt": "anyjson==0.3.3\n",
+            "README": "not a requirements file\n",
+        },
+        "first",
+    )
+    _commit(repo, {"setup.py": (_TEST_DIR / "test4/simple.py").read_text()}, "second")
+    return repo
+
+
+def _expected(*requirements):
+    return sorted(DetectedRequirement.parse(req) for req in requirements)
+
+
+def test_head(repo):
+    reqs = find_requirements_at_revision(repo)
+    assert reqs == _expected("Django==1.5.0", "django-gubbins==1.1.2")
+    assert reqs[0].location_defined == repo / "setup.py"
+
+
+def test_historical_revision(repo):
+    reqs = find_requirements_at_revision(repo, "HEAD~1")
+    assert reqs == _expected(
+        "amqp!=1.0.13",
+        "anyjson==0.3.3",
+        "Django>=1.5.0",
+        "six<1.4,>=1.3.0",
+        "South==0.8.2",
+    )
+
+
+def test_bare_mirror(repo, tmp_path):
+    mirror = tmp_path / "mirror.git"
+    subprocess.run(
+        ["git", "clone", "-q", "--mirror", str(repo), str(mirror)], check=True
+    )
+    with GitObjectReader(mirror) as reader:
+        head = find_requirements_at_revision(mirror, reader=reader)
+        previous = find_requirements_at_revision(mirror, "HEAD~1", reader=reader)
+    assert head == find_requirements_at_revision(repo)
+    assert previous == find_requirements_at_revision(repo, "HEAD~1")
+
+
+def test_unknown_revision(repo):
+    with pytest.raises(RequirementsNotFound):
+        find_requirements_at_revision(repo, "no-such-branch")
+
+
+def test_not_a_repository(tmp_path):
+    with pytest.raises(RequirementsNotFound, match="not a git repository"):
+        GitObjectReader(tmp_path)
+    with pytest.raises(RequirementsNotFound):
+        find_requirements_at_revision(tmp_path / "missing")
+
+
+def test_missing_object(repo):
+    with GitObjectReader(repo) as reader:
+        tree = GitRevisionTree(reader, "HEAD", repo)
+        # as if the blob were left out of a partial clone
+        tree._trees[""]["setup.py"] = (b"100644", "0" * 40)
+        with pytest.raises(FileNotFoundError, match="setup.py"):
+            tree.read_bytes("setup.py")
@@ -0,0 +1,187 @@
+import os
+
+import pytest
+
+from requirements_detector.index import RequirementIndex, _RecordingTree, main
+
+
+def _project(root, requirements):
+    root.mkdir(parents=True, exist_ok=True)
+    (root / "requirements.txt").write_text("\n".join(requirements) + "\n")
+    return root
+
+
+@pytest.fixture
+def fleet(tmp_path):
+    projects = tmp_path / "projects"
+    return [
+        _project(projects / "alpha", ["Django>=3.2,<4.0", "six"]),
+        _project(projects / "beta", ["django==4.2.1", "requests"]),
+        _project(projects / "gamma", ["DJANGO>=4.1", "odd===1.0"]),
+        _project(projects / "delta", ["flask"]),
+    ]
+
+
+@pytest.fixture
+def index(tmp_path, fleet):
+    with RequirementIndex(tmp_path / "fleet.db") as index:
+        assert index.update(fleet) == 4
+        yield index
+
+
+def _projects(entries):
+    return [entry.project.name for entry in entries]
+
+
+def test_query_by_name(index, fleet):
+    entries = index.query("django")
+    assert _projects(entries) == ["alpha", "beta", "gamma"]
+    assert entries[0].specifier == ">=3.2,<4.0"
+    assert entries[0].source == fleet[0].resolve() / "requirements.txt"
+    assert _projects(index.query("Flask")) == ["delta"]
+    assert index.query("numpy") == []
+
+
+def test_query_by_version(index):
+    assert _projects(index.query("django", version="4.2.1")) == ["beta", "gamma"]
+    assert _projects(index.query("django", version="3.2.5")) == ["alpha"]
+    assert _projects(index.query("six", version="1.16.0")) == ["alpha"]
+
+
+def test_query_by_range(index):
+    assert _projects(index.query("django", constraint=">=3.0,<3.3")) == ["alpha"]
+    assert _projects(index.query("django", constraint=">=3.0,<4.2")) == [
+        "alpha",
+        "gamma",
+    ]
+
+
+def test_unparseable_specifiers_are_included(index):
+    assert _projects(index.query("odd", version="2.0")) == ["gamma"]
+
+
+def test_incremental_update(index, fleet):
+    assert index.update(fleet) == 0
+
+    _touch(fleet[3] / "requirements.txt", "flask\ndjango<3\n")
+
+    assert index.update(fleet) == 1
+    assert _projects(index.query("django")) == ["alpha", "beta", "delta", "gamma"]
+    assert index.update(fleet, force=True) == 4
+
+
+def _touch(path, text):
+    path.write_text(text)
+    # make sure the change is seen even on a coarse clock
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_helper_modules_are_fingerprinted(index, tmp_path):
+    project = tmp_path / "projects" / "service"
+    (project / "src" / "service").mkdir(parents=True)
+    (project / "setup.py").write_text(
+        "from setuptools import setup\n"
+        "from service._deps import INSTALL_REQUIRES\n"
+        "setup(install_requires=INSTALL_REQUIRES)\n"
+    )
+    (project / "src" / "service" / "__init__.py").write_text("")
+    deps = project / "src" / "service" / "_deps.py"
+    deps.write_text("INSTALL_REQUIRES = ['attrs']\n")
+    assert index.update([project]) == 1
+    assert index.update([project]) == 0
+
+    _touch(deps, "INSTALL_REQUIRES = ['attrs', 'django<3']\n")
+    assert index.update([project]) == 1
+    assert "service" in _projects(index.query("django"))
+
+
+def test_errors_do_not_stop_the_update(index, fleet, monkeypatch):
+    broken = fleet[1].resolve()
+    list_files = _RecordingTree.list_files
+
+    def failing(tree, directory=""):
+        if tree.root == broken:
+            raise PermissionError(directory)
+        return list_files(tree, directory)
+
+    monkeypatch.setattr(_RecordingTree, "list_files", failing)
+    assert index.update(fleet, force=True) == 3
+    assert list(index.errors()) == [broken]
+    assert "PermissionError" in index.errors()[broken]
+    # its stale requirements are gone, and it is scanned again next time
+    assert _projects(index.query("django")) == ["alpha", "gamma"]
+
+    monkeypatch.undo()
+    assert index.update(fleet) == 1
+    assert index.errors() == {}
+    assert _projects(index.query("django")) == ["alpha", "beta", "gamma"]
+
+
+def test_remove_and_missing_requirements(index, fleet, tmp_path):
+    empty = tmp_path / "projects" / "empty"
+    empty.mkdir()
+    assert index.update([empty]) == 1
+    assert empty.resolve() in index.projects()
+
+    index.remove(fleet[1])
+    assert _projects(index.query("django")) == ["alpha", "gamma"]
+    assert len(index.projects()) == 4
+
+
+def test_persistent(index, tmp_path):
+    with RequirementIndex(tmp_path / "fleet.db") as reopened:
+        assert len(reopened.query("django")) == 3
+
+
+def test_cli(fleet, tmp_path, capsys):
+    database = str(tmp_path / "cli.db")
+    assert main(["build", database] + [str(root) for root in fleet]) == 0
+    assert "4 of 4 projects scanned" in capsys.readouterr().out
+
+    assert main(["query", database, "django", "--version", "4.1.5"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert len(out) == 1
+    assert out[0].split("\t")[:2] == [str(fleet[2].resolve()), "django>=4.1"]
+
+    assert main(["query", database, "numpy"]) == 1
+
+
+@pytest.mark.parametrize("option", ["--version", "--range"])
+def test_cli_invalid_version(fleet, tmp_path, capsys, option):
+    database = str(tmp_path / "cli.db")
+    assert main(["build", database] + [str(root) for root in fleet]) == 0
+    with pytest.raises(SystemExit) as exit:
+        main(["query", database, "django", option, "nonsense"])
+    assert exit.value.code == 2
+    assert "nonsense" in capsys.readouterr().err
+
+
+def test_timings(index, fleet):
+    timings = index.timings()
+    assert sorted(timing.root for timing in timings) == sorted(
+        root.resolve() for root in fleet
+    )
+    assert all(timing.seconds > 0 and timing.estimate > 0 for timing in timings)
+    assert timings[0].features["requirements"][0] == 1
+    assert [timing.root for timing in index.timings(fleet[:1])] == [fleet[0].resolve()]
+
+    index.remove(fleet[0])
+    assert len(index.timings()) == 3
+
+
+def test_update_on_several_workers(fleet, tmp_path):
+    with RequirementIndex(tmp_path / "threads.db") as index:
+        assert index.update(fleet, workers=3) == 4
+        assert _projects(index.query("django")) == ["alpha", "beta", "gamma"]
+
+
+def test_cli_timings(fleet, tmp_path, capsys):
+    database = str(tmp_path / "cli.db")
+    roots = [str(root) for root in fleet]
+    assert main(["build", database, "--workers", "2", "--timings"] + roots) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0] == "4 of 4 projects scanned"
+    assert sorted(line.split("\t")[0] for line in out[1:]) == sorted(
+        str(root.resolve()) for root in fleet
+    )
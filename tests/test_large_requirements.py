@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import pytest
+
+from requirements_detector import detect
+from requirements_detector.detect import from_requirements_txt
+
+_TEST_DIR = Path(__file__).parent / "detection"
+
+_FIXTURES = [
+    "test1/requirements.txt",
+    "test2/requirements/base.txt",
+    "test3/pip_requirements.txt",
+    "test5/invalid_requirements.txt",
+    "test6/requirements.txt",
+    "test7/poetry-format-requirements.txt",
+]
+
+
+def _lock_export(path, packages):
+    with path.open("w") as f:
+        f.write(
+            "# generated by pip-compile\n--index-url https://example.com/simple\n\n"
+        )
+        for i in range(packages):
+            f.write(f'package-{i}==1.{i}.0 ; python_version >= "3.8" \\\n')
+            for j in range(20):
+                f.write(f"    --hash=sha256:{i:032x}{j:032x}\n")
+            f.write(f"    # via package-{i + 1}\n")
+    return path
+
+
+def _as_tuples(requirements):
+    return [
+        (req.name, req.version_specs, req.url, req.location_defined)
+        for req in requirements
+    ]
+
+
+@pytest.mark.parametrize("fixture", _FIXTURES)
+def test_bytes_scanning_matches_text(fixture, monkeypatch):
+    filepath = _TEST_DIR / fixture
+    expected = _as_tuples(from_requirements_txt(filepath))
+
+    monkeypatch.setattr(detect, "MMAP_THRESHOLD", 0)
+    assert _as_tuples(from_requirements_txt(filepath)) == expected
+
+
+def test_large_file_is_memory_mapped(tmp_path, monkeypatch):
+    filepath = _lock_export(tmp_path / "requirements.txt", 2000)
+    assert filepath.stat().st_size > detect.MMAP_THRESHOLD
+
+    scanned = from_requirements_txt(filepath)
+    assert len(scanned) == 2000
+    assert scanned[-1].name == "package-1999"
+    assert scanned[-1].version_specs == [("==", "1.1999.0")]
+
+    monkeypatch.setattr(detect, "MMAP_THRESHOLD", filepath.stat().st_size)
+    assert _as_tuples(from_requirements_txt(filepath)) == _as_tuples(scanned)
+
+
+def test_benchmark_large_lock_export(tmp_path, benchmark):
+    filepath = _lock_export(tmp_path / "requirements.txt", 2000)
+    result = benchmark(from_requirements_txt, filepath)
+    assert len(result) == 2000
+
+
+def test_benchmark_large_lock_export_names_only(tmp_path, benchmark):
+    filepath = _lock_export(tmp_path / "requirements.txt", 2000)
+    result = benchmark(from_requirements_txt, filepath, names_only=True)
+    assert [req.name for req in result[:2]] == ["package-0", "package-1"]
+    assert len(result) == 2000
@@ -0,0 +1,103 @@
+from pathlib import Path
+
+import pytest
+
+from requirements_detector.detect import find_requirements, from_pyproject_toml
+from requirements_detector.exceptions import CouldNotParseRequirements
+from requirements_detector.lockfiles import from_lockfile
+
+_TEST_DIR = Path(__file__).parent / "detection"
+
+
+def _pins(requirements):
+    return sorted((req.name, req.version_specs, req.group) for req in requirements)
+
+
+def test_poetry_lock():
+    reqs = from_lockfile(_TEST_DIR / "test11/poetry.lock")
+    assert _pins(reqs) == [
+        ("certifi", [("==", "2024.2.2")], None),
+        ("localdep", [("==", "0.1.0")], None),
+        ("requests", [("==", "2.31.0")], None),
+    ]
+
+
+def test_uv_lock():
+    reqs = from_lockfile(str(_TEST_DIR / "test11/uv.lock"))
+    assert _pins(reqs) == [
+        ("certifi", [("==", "2024.2.2")], None),
+        ("requests", [("==", "2.31.0")], None),
+    ]
+
+
+def test_pipfile_lock():
+    reqs = from_lockfile(_TEST_DIR / "test11/Pipfile.lock")
+    assert _pins(reqs) == [
+        ("certifi", [("==", "2024.2.2")], None),
+        ("localdep", [], None),
+        ("pytest", [("==", "8.0.0")], "dev"),
+        ("requests", [("==", "2.31.0")], None),
+    ]
+
+
+@pytest.mark.parametrize("content", ['{"default": ', "[]"])
+def test_broken_pipfile_lock(tmp_path, content):
+    (tmp_path / "Pipfile.lock").write_text(content)
+    (tmp_path / "requirements.txt").write_text("requests\n")
+    with pytest.raises(CouldNotParseRequirements):
+        from_lockfile(tmp_path / "Pipfile.lock")
+    # detection goes on to the other files
+    assert [str(req) for req in find_requirements(tmp_path, lockfiles=True)] == [
+        "requests"
+    ]
+
+
+def test_odd_pipfile_lock(tmp_path):
+    (tmp_path / "Pipfile.lock").write_text(
+        '{"default": [], "develop": {"pytest": "8.0.0", "mock": {"version": 5}}}'
+    )
+    assert _pins(from_lockfile(tmp_path / "Pipfile.lock")) == [("mock", [], "dev")]
+
+
+def test_unsupported_lockfile():
+    with pytest.raises(ValueError):
+        from_lockfile(_TEST_DIR / "test11/pyproject.toml")
+
+
+def test_find_requirements_lockfiles_opt_in():
+    path = _TEST_DIR / "test11"
+    assert [str(req) for req in find_requirements(path)] == ["requests>=2.28,<3.0"]
+    assert [str(req) for req in find_requirements(path, lockfiles=True)] == [
+        "certifi==2024.2.2",
+        "localdep==0.1.0",
+        "requests==2.31.0",
+    ]
+
+
+def _large_project(path, packages):
+    with (path / "poetry.lock").open("w") as lock, (path / "pyproject.toml").open(
+        "w"
+    ) as pyproject:
+        pyproject.write("[tool.poetry.dependencies]\npython = '^3.10'\n")
+        for i in range(packages):
+            pyproject.write(f'package-{i} = "^{i % 7}.{i % 5}"\n')
+            lock.write(
+                f'[[package]]\nname = "package-{i}"\nversion = "{i % 7}.{i % 5}.{i}"\n'
+                'description = "A package"\noptional = false\npython-versions = ">=3.8"\n'
+                'files = [\n    {file = "package.whl", hash = "sha256:00"},\n]\n\n'
+                f'[package.dependencies]\npackage-{i + 1} = ">=1.0"\n\n'
+            )
+    return path
+
+
+def test_benchmark_poetry_lock(tmp_path, benchmark):
+    lockfile = _large_project(tmp_path, 600) / "poetry.lock"
+    reqs = benchmark(from_lockfile, lockfile)
+    assert len(reqs) == 600
+
+
+def test_benchmark_pyproject_constraints(tmp_path, benchmark):
+    # the constraint parsing path which the lockfile reader avoids, for comparison
+    pyproject = _large_project(tmp_path, 600) / "pyproject.toml"
+    reqs = benchmark(from_pyproject_toml, pyproject)
+    assert len(reqs) == 600
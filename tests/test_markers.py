@@ -0,0 +1,149 @@
+from requirements_detector import markers
+from requirements_detector.detect import (
+    find_requirements,
+    from_pyproject_toml,
+    from_requirements_dir,
+)
+from requirements_detector.markers import MarkerEvaluator, for_environments
+from requirements_detector.requirement import DetectedRequirement
+from requirements_detector.requirement_set import RequirementSet
+
+_ENVIRONMENTS = [
+    {
+        "python_version": python,
+        "python_full_version": python + ".0",
+        "sys_platform": platform,
+    }
+    for python in ("3.8", "3.12")
+    for platform in ("linux", "win32")
+]
+
+
+def test_markers_are_kept():
+    req = DetectedRequirement.parse('pywin32>=300; sys_platform == "win32"')
+    assert str(req) == "pywin32>=300"
+    assert req.markers == 'sys_platform == "win32"'
+
+    url = DetectedRequirement.parse(
+        "git+https://github.com/org/lib#egg=lib; python_version < '3.9'"
+    )
+    assert url.name == "lib"
+    assert url.markers == "python_version < '3.9'"
+
+    # from `poetry export`, before the hashes on the next lines
+    exported = DetectedRequirement.parse('astroid==1.6.6; python_version >= "2.7" \\')
+    assert exported.markers == 'python_version >= "2.7"'
+
+    assert DetectedRequirement.parse("django>=4").markers is None
+
+
+def test_poetry_markers(tmp_path):
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text("""
+[tool.poetry.dependencies]
+python = "^3.8"
+tomli = { version = ">=1.1", python = "<3.11" }
+pywin32 = { version = ">=300", markers = "sys_platform == 'win32'" }
+numpy = [
+    { version = ">=1.20,<1.25", python = "<3.9" },
+    { version = ">=1.24,<2", python = ">=3.9" },
+]
+both = { version = ">=1", python = "~3.10.1", markers = "os_name == 'posix'" }
+click = "^8.0"
+""")
+    by_name = {req.name: req.markers for req in from_pyproject_toml(pyproject)}
+    assert by_name == {
+        "tomli": 'python_version < "3.11"',
+        "pywin32": "sys_platform == 'win32'",
+        "numpy": '(python_version < "3.9") or (python_version >= "3.9")',
+        "both": '(os_name == \'posix\') and (python_full_version >= "3.10.1" and python_full_version < "3.11.0")',
+        "click": None,
+    }
+
+
+def test_for_environments():
+    requirements = [
+        DetectedRequirement.parse("django>=4"),
+        DetectedRequirement.parse('pywin32>=300; sys_platform == "win32"'),
+        DetectedRequirement.parse('tomli; python_version < "3.11"'),
+        DetectedRequirement.parse("broken; not a marker"),
+    ]
+    views = for_environments(requirements, _ENVIRONMENTS)
+    assert [[req.name for req in view] for view in views] == [
+        ["django", "tomli", "broken"],
+        ["django", "pywin32", "tomli", "broken"],
+        ["django", "broken"],
+        ["django", "pywin32", "broken"],
+    ]
+    assert views[0][0] is requirements[0]
+
+
+def test_marker_split_requirements_are_kept(tmp_path):
+    lines = 'foo; sys_platform == "win32"\nfoo; sys_platform == "linux"\n'
+    (tmp_path / "requirements.txt").write_text(lines)
+    (tmp_path / "requirements").mkdir()
+    (tmp_path / "requirements" / "base.txt").write_text(lines)
+    for requirements in [
+        find_requirements(tmp_path),
+        from_requirements_dir(tmp_path / "requirements"),
+    ]:
+        assert sorted(req.markers for req in requirements) == [
+            'sys_platform == "linux"',
+            'sys_platform == "win32"',
+        ]
+        views = for_environments(requirements, _ENVIRONMENTS)
+        assert [[req.name for req in view] for view in views] == [["foo"]] * 4
+
+
+def test_extra_markers():
+    requirement = DetectedRequirement.parse('sphinx; extra == "docs"')
+    evaluator = MarkerEvaluator()
+    assert not evaluator.applies(requirement, _ENVIRONMENTS[0])
+    requirement.extra = "docs"
+    assert evaluator.applies(requirement, _ENVIRONMENTS[0])
+
+
+def test_markers_are_compiled_and_evaluated_once(monkeypatch):
+    compiled = []
+    original = markers.Marker
+
+    class CountingMarker(original):
+        def __init__(self, text):
+            compiled.append(text)
+            super().__init__(text)
+
+        def evaluate(self, environment=None):
+            compiled.append(environment["sys_platform"])
+            return super().evaluate(environment)
+
+    monkeypatch.setattr(markers, "Marker", CountingMarker)
+    requirements = [
+        DetectedRequirement.parse('package%d; sys_platform == "linux"' % i)
+        for i in range(100)
+    ]
+    evaluator = MarkerEvaluator()
+    evaluator.for_environments(requirements, _ENVIRONMENTS)
+    evaluator.for_environments(requirements, _ENVIRONMENTS)
+    assert compiled == ['sys_platform == "linux"', "linux", "win32", "linux", "win32"]
+
+
+def test_merged_markers():
+    requirements = RequirementSet(
+        [
+            DetectedRequirement.parse('tomli>=1; python_version < "3.11"'),
+            DetectedRequirement.parse('tomli<3; sys_platform == "win32"'),
+            DetectedRequirement.parse("django>=4"),
+            DetectedRequirement.parse('django<5; python_version < "3.11"'),
+        ]
+    )
+    # required in different places, so kept apart
+    assert [
+        (entry.version_specs, entry.markers) for entry in requirements.entries("tomli")
+    ] == [
+        ([(">=", "1")], 'python_version < "3.11"'),
+        ([("<", "3")], 'sys_platform == "win32"'),
+    ]
+    assert requirements["tomli"].markers == 'python_version < "3.11"'
+    assert requirements["django"].markers is None
+    assert requirements["django"].version_specs == [(">=", "4")]
+    assert len(requirements) == 4
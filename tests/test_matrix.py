@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from requirements_detector.matrix import allows_matrix
+from requirements_detector.poetry_semver import Version, parse_constraint
+from requirements_detector.poetry_semver.empty_constraint import EmptyConstraint
+
+
+def _versions(rng, count):
+    versions = []
+    for _ in range(count):
+        text = "%d.%d.%d" % (rng.randint(0, 5), rng.randint(0, 5), rng.randint(0, 3))
+        if rng.random() < 0.1:
+            text += rng.choice(["a1", "b2", "rc1", ".post1"])
+        versions.append(Version.parse(text))
+    # repeated versions, and ones spelt differently
+    versions += [Version.parse("1.0"), Version.parse("1.0.0"), versions[0]]
+    return versions
+
+
+def _constraints(rng, count):
+    constraints = [parse_constraint("*"), EmptyConstraint(), Version.parse("1.0")]
+    for _ in range(count):
+        low = "%d.%d" % (rng.randint(0, 5), rng.randint(0, 5))
+        high = "%d.%d" % (rng.randint(0, 6), rng.randint(0, 5))
+        constraints.append(
+            parse_constraint(
+                rng.choice(
+                    [
+                        f">={low},<{high}",
+                        f">{low},<={high}",
+                        f"=={low}",
+                        f"!={low}",
+                        f"~={low}",
+                        f"^{low}",
+                        f"<{low}",
+                        f">={low}",
+                        f">={low},!={high}",
+                        f"{low}.*",
+                    ]
+                )
+            )
+        )
+    return constraints
+
+
+def _scalar(constraints, versions):
+    return [
+        [constraint.allows(version) for version in versions]
+        for constraint in constraints
+    ]
+
+
+@pytest.fixture
+def cases():
+    rng = random.Random(2024)
+    return [(_constraints(rng, 60), _versions(rng, 80)) for _ in range(5)]
+
+
+def test_python_matches_scalar(cases):
+    for constraints, versions in cases:
+        assert allows_matrix(constraints, versions, use_numpy=False) == _scalar(
+            constraints, versions
+        )
+
+
+def test_numpy_matches_scalar(cases):
+    pytest.importorskip("numpy")
+    for constraints, versions in cases:
+        matrix = allows_matrix(constraints, versions, use_numpy=True)
+        assert matrix.shape == (len(constraints), len(versions))
+        assert matrix.tolist() == _scalar(constraints, versions)
+
+
+def test_empty():
+    assert allows_matrix([], [Version.parse("1.0")], use_numpy=False) == []
+    assert allows_matrix([parse_constraint(">=1")], [], use_numpy=False) == [[]]
+
+
+@pytest.fixture
+def dashboard():
+    rng = random.Random(7)
+    return _constraints(rng, 1000), _versions(rng, 1000)
+
+
+def test_benchmark_scalar(benchmark, dashboard):
+    benchmark.pedantic(_scalar, args=dashboard, rounds=1, iterations=1)
+
+
+def test_benchmark_python(benchmark, dashboard):
+    benchmark(allows_matrix, *dashboard, use_numpy=False)
+
+
+def test_benchmark_numpy(benchmark, dashboard):
+    pytest.importorskip("numpy")
+    benchmark(allows_matrix, *dashboard, use_numpy=True)
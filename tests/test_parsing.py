@@ -1,10 +1,13 @@
-from unittest import TestCase
+from unittest import TestCase, mock
 from urllib import parse as urlparse
 
+from packaging.utils import canonicalize_name
+
 from requirements_detector.requirement import (
     DetectedRequirement,
     _parse_egg_name,
     _strip_fragment,
+    parse_name,
 )
 
 
@@ -90,6 +93,36 @@ class TestRequirementParsing(TestCase):
         )
 
 
+class TestNameParsing(TestCase):
+    def test_same_names_as_full_parsing(self):
+        for line in (
+            "Django==1.5.2",
+            "django_gubbins!=1.1.1,>1.1",
+            "Zope.Interface[extra] ; python_version < '3.8'",
+            "celery == 0.1\t# comment",
+            "-e git+ssh://git@github.com/something/Some_Lib.git#egg=Some_Lib",
+            "http://example.com/somelib.tar.gz#egg=somelib # comment",
+            "http://example.com/somelib.tar.gz",
+            "-e ../somelib",
+            "--hash=sha256:0123abcd",
+            "# comment",
+        ):
+            req = DetectedRequirement.parse(line)
+            expected = DetectedRequirement.parse(line, names_only=True)
+            self.assertEqual(expected and expected.name, parse_name(line))
+            if req is None or req.name is None:
+                self.assertIsNone(expected)
+            else:
+                self.assertEqual(canonicalize_name(req.name), expected.name)
+                self.assertEqual([], expected.version_specs)
+                self.assertIsNone(expected.url)
+
+    def test_names_only_skips_full_parsing(self):
+        with mock.patch("requirements_detector.requirement.Requirement") as req:
+            self.assertEqual("django", parse_name("Django>=4,<5"))
+        req.assert_not_called()
+
+
 class TestEggFragmentParsing(TestCase):
     def test_simple(self):
         self.assertEqual("somelib", _parse_egg_name("egg=somelib"))
@@ -0,0 +1,144 @@
+import random
+from pathlib import Path
+
+import pytest
+from packaging.requirements import Requirement
+
+from requirements_detector import requirement
+from requirements_detector.pep508 import parse_simple
+from requirements_detector.requirement import DetectedRequirement
+
+_TEST_DIR = Path(__file__).parent / "detection"
+
+_PIECES = [
+    "foo", "Foo", "a", "b1", "x.y", "x_y", "x-y", "-", ".", "_", "[", "]", ",", ", ",
+    " ", "  ", "\t", "(", ")", "==", "!=", "~=", "<=", ">=", "<", ">", "===", "1",
+    "0", "10", "1.0", "1.2.3", ".*", "*", "a1", "b2", "rc1", "RC1", ".post1",
+    ".dev0", "post1", "+local", "v", "1!", "extra", "é", ";", "@", "#",
+]  # fmt: skip
+
+
+def _corpus(size, seed=7):
+    rng = random.Random(seed)
+    return ["".join(rng.choices(_PIECES, k=rng.randint(1, 10))) for _ in range(size)]
+
+
+def _requirements(size, seed=7):
+    # requirements as they are found in projects
+    rng = random.Random(seed)
+    forms = [
+        "{name}",
+        "{name}=={version}",
+        "{name}>={version}",
+        "{name}>={version},<{major}",
+        "{name} >= {version}, < {major}",
+        "{name}[{extra}]>={version}",
+        "{name}[{extra}, other]",
+        "{name}~={version}.0",
+        "{name}!={version}",
+        "{name}=={major}.*",
+        "{name} (=={version})",
+        "{name} (>={version})",
+        "{name}>={version}rc1",
+        "{name}=={version}.post1",
+    ]
+    lines = []
+    for _ in range(size):
+        name = rng.choice(["Django", "requests", "zope.interface", "typing_extensions"])
+        major = rng.randint(1, 20)
+        version = "%d.%d" % (major, rng.randint(0, 20))
+        lines.append(
+            rng.choice(forms).format(
+                name=name, version=version, major=major + 1, extra="argon2"
+            )
+        )
+    return lines
+
+
+def _packaging(text):
+    req = Requirement(text)
+    return (
+        req.name,
+        sorted(req.extras),
+        [(s.operator, s.version) for s in req.specifier],
+    )
+
+
+def _simple(text):
+    req = parse_simple(text)
+    return req.name, sorted(set(req.extras)), req.specs
+
+
+def test_same_as_packaging_on_random_text():
+    recognised = 0
+    for text in _corpus(50_000):
+        if parse_simple(text) is None:
+            continue
+        recognised += 1
+        assert _simple(text) == _packaging(text), text
+    assert recognised > 1000
+
+
+def test_realistic_requirements_are_recognised():
+    for text in _requirements(2000):
+        assert parse_simple(text) is not None, text
+        assert _simple(text) == _packaging(text), text
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "foo>=1.0.*",
+        "foo~=1",
+        "foo==1.0a1.*",
+        "foo==1.0+local",
+        "foo===1.0",
+        "foo>=1.0,",
+        "foo>=1.0 <2.0",
+        "foo (>=1.0",
+        "foo @ https://example.com/foo.zip",
+        "foo; python_version < '3.8'",
+        "foo==1.0RC1",
+        "foo==v1.0",
+        "foo-",
+    ],
+)
+def test_unusual_requirements_left_to_packaging(text):
+    assert parse_simple(text) is None
+
+
+def test_detected_requirements_unchanged(monkeypatch):
+    lines = _requirements(500)
+    for path in _TEST_DIR.rglob("*.txt"):
+        lines += path.read_text().splitlines()
+
+    def detect():
+        return [
+            (req.name, req.version_specs, req.url, req.markers)
+            for req in map(DetectedRequirement.parse, lines)
+            if req is not None
+        ]
+
+    fast = detect()
+    monkeypatch.setattr(requirement, "parse_simple", lambda text: None)
+    assert fast == detect()
+
+
+def test_requirement_built_when_asked_for():
+    req = DetectedRequirement.parse("Django[argon2]>=4.2,<5")
+    assert req._requirement is None
+    assert req.requirement == Requirement("Django[argon2]>=4.2,<5")
+    assert req.requirement.extras == {"argon2"}
+
+
+@pytest.mark.parametrize("simple", [True, False], ids=["parse_simple", "packaging"])
+def test_parse_benchmark(benchmark, monkeypatch, simple):
+    if not simple:
+        monkeypatch.setattr(requirement, "parse_simple", lambda text: None)
+    lines = _requirements(2_000 if benchmark.disabled else 50_000)
+
+    def parse_all():
+        for line in lines:
+            DetectedRequirement.parse(line)
+
+    benchmark.pedantic(parse_all, rounds=1)
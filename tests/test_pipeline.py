@@ -0,0 +1,234 @@
+import threading
+from pathlib import Path
+
+import pytest
+
+from requirements_detector import pipeline
+from requirements_detector.detect import find_requirements
+from requirements_detector.exceptions import RequirementsNotFound
+from requirements_detector.pipeline import Pipeline, Source, register_source
+from requirements_detector.requirement import DetectedRequirement
+from requirements_detector.tree import FilesystemTree
+
+_TEST_DIR = Path(__file__).parent / "detection"
+_PROJECTS = sorted(path for path in _TEST_DIR.iterdir() if path.is_dir())
+
+
+class _DepsListSource(Source):
+    # one requirement per line of a deps.list file
+    name = "deps.list"
+
+    def discover(self, tree, root_files, options):
+        return ["deps.list"] if "deps.list" in root_files else []
+
+    def parse(self, data, name, tree, options):
+        return [
+            DetectedRequirement.parse(line, tree.location(name))
+            for line in data.decode("utf-8").splitlines()
+            if line.strip()
+        ]
+
+
+class _CountingTree(FilesystemTree):
+    def __init__(self, root):
+        super().__init__(root)
+        self.read = []
+
+    def read_bytes(self, name):
+        self.read.append(name)
+        return super().read_bytes(name)
+
+
+def _expected(path):
+    try:
+        return find_requirements(path), None
+    except RequirementsNotFound:
+        return None, RequirementsNotFound
+
+
+@pytest.mark.parametrize(
+    "executors",
+    [
+        {},
+        {"read": "thread", "parse": "thread"},
+        dict.fromkeys(pipeline.STAGES, "thread"),
+        {"parse": "process"},
+    ],
+    ids=["serial", "threads", "all-threads", "processes"],
+)
+def test_run_same_as_find_requirements(executors):
+    results = Pipeline(executors=executors, workers=2, queue_size=2).run(
+        FilesystemTree(path) for path in _PROJECTS
+    )
+    found = {result.tree.root: result for result in results}
+
+    assert sorted(found) == _PROJECTS
+    for path in _PROJECTS:
+        requirements, error = _expected(path)
+        assert found[path].requirements == requirements
+        assert type(found[path].error) is (type(None) if error is None else error)
+
+
+def test_serial_run_keeps_order():
+    trees = [FilesystemTree(path) for path in reversed(_PROJECTS)]
+    assert [result.tree for result in Pipeline().run(trees)] == trees
+
+
+def test_detect_stops_at_first_answer():
+    tree = _CountingTree(_TEST_DIR / "test12")
+    requirements = Pipeline().detect(tree)
+    assert requirements == find_requirements(_TEST_DIR / "test12")
+    # setup.cfg (and the file it refers to) answered, so setup.py was never read
+    assert tree.read == ["setup.cfg", "requirements-test.txt"]
+
+
+def test_custom_source(tmp_path):
+    (tmp_path / "deps.list").write_text("Django>=4\nrequests\n")
+    (tmp_path / "requirements.txt").write_text("attrs\n")
+
+    tree = FilesystemTree(tmp_path)
+    assert [req.name for req in Pipeline().detect(tree)] == ["attrs"]
+    requirements = Pipeline(sources=[_DepsListSource()]).detect(tree)
+    assert [req.name for req in requirements] == ["Django", "requests"]
+
+    (tmp_path / "deps.list").write_text("")
+    with pytest.raises(RequirementsNotFound):
+        Pipeline(sources=[_DepsListSource()]).detect(tree)
+
+
+def test_register_source(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "SOURCES", list(pipeline.SOURCES))
+    register_source(_DepsListSource(), before="requirements")
+    names = [source.name for source in pipeline.SOURCES]
+    assert names[names.index("deps.list") + 1] == "requirements"
+
+    (tmp_path / "deps.list").write_text("Django>=4\n")
+    (tmp_path / "requirements.txt").write_text("attrs\n")
+    requirements = Pipeline().detect(FilesystemTree(tmp_path))
+    assert [req.name for req in requirements] == ["Django"]
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        Pipeline(executors={"parse": "cluster"})
+    with pytest.raises(ValueError):
+        Pipeline(executors={"compile": "thread"})
+
+
+def _conflicting_project(path):
+    (path / "setup.py").write_text(
+        'from setuptools import setup\nsetup(install_requires=["Django>=4"])\n'
+    )
+    (path / "requirements.txt").write_text("Django==4.2\nattrs\n")
+    (path / "requirements").mkdir()
+    (path / "requirements" / "dev.txt").write_text("pytest\n")
+    return FilesystemTree(path)
+
+
+def _names(requirements):
+    return [str(req) for req in requirements]
+
+
+def test_strategies(tmp_path):
+    tree = _conflicting_project(tmp_path)
+
+    assert _names(Pipeline().detect(tree)) == ["Django>=4"]
+    assert _names(Pipeline(strategy="first-hit").detect(tree)) == ["Django>=4"]
+    by_source = Pipeline(strategy="exhaustive").detect_by_source(tree)
+    assert {source: _names(reqs) for source, reqs in by_source.items()} == {
+        "setup.py": ["Django>=4"],
+        "requirements": ["Django==4.2", "attrs"],
+        "requirements-dir": ["pytest"],
+    }
+    assert sorted(_names(Pipeline(strategy="exhaustive").detect(tree))) == [
+        "Django==4.2",
+        "Django>=4",
+        "attrs",
+        "pytest",
+    ]
+
+    explicit = Pipeline(strategy=["requirements-dir", "setup.py"])
+    assert _names(explicit.detect(tree)) == ["pytest"]
+    assert list(explicit.detect_by_source(tree)) == ["requirements-dir"]
+
+
+def test_first_hit_takes_requirements_files_alone(tmp_path):
+    (tmp_path / "requirements.txt").write_text("attrs\n")
+    (tmp_path / "requirements").mkdir()
+    (tmp_path / "requirements" / "base.txt").write_text("Django\n")
+    tree = FilesystemTree(tmp_path)
+
+    assert _names(Pipeline().detect(tree)) == ["Django", "attrs"]
+    assert _names(Pipeline(strategy="first-hit").detect(tree)) == ["attrs"]
+
+
+def test_file_left_to_first_source_to_discover_it(tmp_path):
+    # requirements.txt also matches the names of the blob source
+    (tmp_path / "requirements.txt").write_text("attrs\n")
+    (tmp_path / "requirements_dev.txt").write_text("pytest\n")
+    by_source = Pipeline(strategy="exhaustive").detect_by_source(
+        FilesystemTree(tmp_path)
+    )
+    assert {source: _names(reqs) for source, reqs in by_source.items()} == {
+        "requirements": ["attrs"],
+        "requirements-blob": ["pytest"],
+    }
+
+
+def test_strategy_in_run(tmp_path):
+    _conflicting_project(tmp_path)
+    [result] = Pipeline(strategy="exhaustive", executors={"parse": "thread"}).run(
+        [FilesystemTree(tmp_path)]
+    )
+    assert list(result.by_source) == ["setup.py", "requirements", "requirements-dir"]
+
+
+def test_lockfile_strategy():
+    path = _TEST_DIR / "test11"
+    expected = find_requirements(path, lockfiles=True)
+    assert find_requirements(path, strategy=["lockfile"]) == expected
+    assert find_requirements(path, strategy=["lockfile", "pyproject.toml"]) == expected
+
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        Pipeline(strategy="everything")
+    with pytest.raises(ValueError):
+        Pipeline(strategy=["setup.py", "Pipfile"])
+
+
+@pytest.mark.parametrize(
+    "executors", [{}, {"parse": "process"}], ids=["serial", "processes"]
+)
+def test_run_ignores_files_it_does_not_need(tmp_path, executors):
+    (tmp_path / "setup.py").write_text(
+        'from setuptools import setup\nsetup(install_requires=["six"])\n'
+    )
+    (tmp_path / "pyproject.toml").write_text("[project\ndependencies = [\n")
+    tree = FilesystemTree(tmp_path)
+
+    expected = Pipeline().detect(tree)
+    assert _names(expected) == ["six"]
+    [result] = Pipeline(executors=executors, workers=1).run([tree])
+    assert result.error is None
+    assert result.requirements == expected
+
+
+def test_run_fails_on_files_it_needs(tmp_path):
+    (tmp_path / "pyproject.toml").write_text("[project\ndependencies = [\n")
+    tree = FilesystemTree(tmp_path)
+
+    with pytest.raises(Exception) as raised:
+        Pipeline().detect(tree)
+    [result] = Pipeline().run([tree])
+    assert type(result.error) is raised.type
+
+
+def test_run_stopped_early(tmp_path):
+    before = threading.active_count()
+    results = Pipeline(
+        executors=dict.fromkeys(pipeline.STAGES, "thread"), workers=2, queue_size=1
+    ).run(FilesystemTree(path) for path in _PROJECTS * 10)
+    next(results)
+    results.close()
+    assert threading.active_count() == before
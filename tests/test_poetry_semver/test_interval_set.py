@@ -0,0 +1,184 @@
+import random
+
+import pytest
+
+from requirements_detector.poetry_semver import (
+    IntervalSet,
+    Version,
+    VersionRange,
+    VersionUnion,
+    parse_constraint,
+)
+from requirements_detector.poetry_semver.empty_constraint import EmptyConstraint
+from requirements_detector.poetry_semver.version_constraint import VersionConstraint
+
+_VERSIONS = sorted(
+    Version.parse(v)
+    for v in [
+        "0.1",
+        "1.0a1",
+        "1.0",
+        "1.0+local",
+        "1.0.1",
+        "1.5",
+        "2.0rc1",
+        "2.0",
+        "3.0",
+    ]
+)
+
+
+def _random_constraint(rng, ranges):
+    # plain ranges, whose object algebra is exact
+    constraints = []
+    for _ in range(ranges):
+        low, high = sorted(rng.sample(range(len(_VERSIONS) + 1), 2))
+        low = _VERSIONS[low] if low < len(_VERSIONS) and rng.random() < 0.8 else None
+        high = _VERSIONS[high] if high < len(_VERSIONS) and rng.random() < 0.8 else None
+        if low is not None and low == high:
+            constraints.append(low)
+            continue
+        include_min = low is not None and rng.random() < 0.5
+        include_max = high is not None and rng.random() < 0.5
+        constraints.append(VersionRange(low, high, include_min, include_max))
+    return VersionUnion.of(*constraints)
+
+
+@pytest.mark.parametrize(
+    "constraint",
+    ["*", ">=1.0,<2.0", "!=1.5", "<1.0 || >=2.0", "1.2.3", ">1.0 || 0.5", "<=1.0"],
+)
+def test_round_trip(constraint):
+    constraint = parse_constraint(constraint)
+    assert IntervalSet.of(constraint).to_constraint() == constraint
+
+
+def test_empty():
+    empty = IntervalSet.of(EmptyConstraint())
+    assert empty.is_empty()
+    assert len(empty) == 0
+    assert isinstance(empty.to_constraint(), EmptyConstraint)
+    assert IntervalSet.of(parse_constraint("*")).is_any()
+
+
+def test_touching_ranges_are_joined():
+    intervals = IntervalSet.of(parse_constraint("<1.0")) | IntervalSet.of(
+        parse_constraint(">=1.0,<2.0")
+    )
+    assert intervals.to_constraint() == VersionRange(max=Version.parse("2.0"))
+    assert len(intervals) == 1
+
+    # both exclude 1.0, so they don't touch
+    apart = IntervalSet.of(parse_constraint("<1.0 || >1.0"))
+    assert len(apart) == 2
+    assert not apart.allows(Version.parse("1.0"))
+
+
+def test_operations_match_constraints():
+    rng = random.Random(3)
+    for _ in range(500):
+        first = _random_constraint(rng, rng.randint(0, 4))
+        second = _random_constraint(rng, rng.randint(0, 4))
+        ours, theirs = IntervalSet.of(first), IntervalSet.of(second)
+
+        assert ours & theirs == IntervalSet.of(first.intersect(second))
+        assert ours | theirs == IntervalSet.of(first.union(second))
+        assert ours - theirs == IntervalSet.of(first.difference(second))
+        for version in _VERSIONS:
+            assert ours.allows(version) == first.allows(version)
+
+
+def test_intervals():
+    intervals = IntervalSet.of(parse_constraint("<1.0 || >=2.0,<=3.0"))
+    assert intervals.intervals() == [
+        (None, False, Version.parse("1.0"), False),
+        (Version.parse("2.0"), True, Version.parse("3.0"), True),
+    ]
+
+
+def _many_ranges(count, offset):
+    # disjoint ranges, such as the releases of a package left after many
+    # exclusions
+    return VersionUnion.of(
+        *[
+            VersionRange(
+                Version(i + offset, 0), Version(i + offset, 5), include_min=True
+            )
+            for i in range(0, count * 2, 2)
+        ]
+    )
+
+
+@pytest.mark.parametrize("form", ["constraints", "interval-sets"])
+def test_operations_benchmark(benchmark, form):
+    size = 20 if benchmark.disabled else 500
+    first, second = _many_ranges(size, 0), _many_ranges(size, 1)
+    if form == "interval-sets":
+        first, second = IntervalSet.of(first), IntervalSet.of(second)
+
+    def operations():
+        for _ in range(10):
+            first.intersect(second)
+            first.union(second)
+            first.difference(second)
+
+    benchmark.pedantic(operations, rounds=1)
+
+
+def _specifier_lists(rng, count):
+    versions = ["0.5", "1.0", "1.0.0", "1.0a1", "1.5", "2", "2.0a1", "2.0rc1", "3.0"]
+    operators = ["^", "~", "~=", ">=", ">", "<", "<=", "==", "!=", ""]
+    for _ in range(count):
+        yield [
+            parse_constraint(
+                " || ".join(
+                    rng.choice(operators) + rng.choice(versions)
+                    for _ in range(rng.choice([1, 1, 2, 3]))
+                )
+            )
+            for _ in range(rng.randint(0, 5))
+        ]
+
+
+def test_intersect_all_matches_intersecting_in_turn():
+    rng = random.Random(5)
+    for constraints in _specifier_lists(rng, 2000):
+        expected = constraints[0] if constraints else VersionRange()
+        for constraint in constraints[1:]:
+            expected = expected.intersect(constraint)
+        result = VersionConstraint.intersect_all(constraints)
+        if expected.is_empty():
+            assert result.is_empty()
+        else:
+            assert result == expected, [str(c) for c in constraints]
+            # sorted, and with no pieces left to merge
+            assert VersionUnion.of(result) == result
+
+
+def test_union_all_allows_what_any_constraint_allows():
+    rng = random.Random(6)
+    probes = [Version.parse(v) for v in ["0.1", "1.0a1", "1.0", "1.2", "2.0a2", "2"]]
+    for constraints in _specifier_lists(rng, 2000):
+        result = VersionConstraint.union_all(constraints)
+        for version in probes:
+            assert result.allows(version) == any(c.allows(version) for c in constraints)
+
+
+@pytest.mark.parametrize("form", ["in-turn", "all"])
+def test_intersect_all_benchmark(benchmark, form):
+    # the exclusions of many projects on one package, with a range each
+    size = 20 if benchmark.disabled else 200
+    constraints = [parse_constraint("!=1.%d" % i) for i in range(size)]
+    constraints += [parse_constraint(">=1.%d,<3" % (i % 10)) for i in range(size)]
+
+    def intersect():
+        if form == "all":
+            return VersionConstraint.intersect_all(constraints)
+        result = constraints[0]
+        for constraint in constraints[1:]:
+            result = result.intersect(constraint)
+        return result
+
+    result = benchmark.pedantic(intersect, rounds=1)
+    # between each of the exclusions from 1.9 up, and from the last one to 3
+    assert len(result.ranges) == size - 9
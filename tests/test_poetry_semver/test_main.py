@@ -217,3 +217,35 @@ def test_versions_list(constraint, expected):
     from requirements_detector.detect import _version_from_spec
 
     assert _version_from_spec(constraint) == expected
+
+
+def test_constraints_are_hashable():
+    constraints = [
+        parse_constraint(c)
+        for c in [">=1.0,<2.0", "!=1.5", "<1.0 || >=2.0", "1.2.3", "^1.0"] * 2
+    ]
+    constraints.append(parse_constraint("1.0").intersect(parse_constraint("2.0")))
+    constraints.append(parse_constraint("3.0").intersect(parse_constraint("4.0")))
+
+    # "^1.0" is the same range as ">=1.0,<2.0", and empty constraints are alike
+    assert len(set(constraints)) == 5
+    assert {parse_constraint("!=1.5"): "excluded"}[
+        VersionUnion(VersionRange(max=Version(1, 5)), VersionRange(min=Version(1, 5)))
+    ] == "excluded"
+
+
+def test_union_string_is_worked_out_once(monkeypatch):
+    union = parse_constraint("!=1.5")
+    assert str(union) == "!=1.5"
+
+    def difference(self, other):
+        raise AssertionError("the string should have been kept")
+
+    monkeypatch.setattr(VersionRange, "difference", difference)
+    assert str(union) == "!=1.5"
+    assert repr(union) == "<VersionUnion !=1.5>"
+
+
+def test_union_difference_with_empty_constraint():
+    union = parse_constraint("<1.0 || >=2.0")
+    assert union.difference(union.intersect(Version(1, 5))) == union
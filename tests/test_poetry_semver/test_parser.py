@@ -0,0 +1,292 @@
+import random
+import re
+import time
+
+import pytest
+
+from requirements_detector.poetry_semver import (
+    Version,
+    VersionRange,
+    VersionUnion,
+    parse_constraint,
+)
+from requirements_detector.poetry_semver.patterns import _COMPLETE_VERSION
+
+# the regular expressions constraints used to be parsed with, to check that the
+# parser accepts the very same constraints and reads them the same way
+_CARET = re.compile(r"(?i)^\^({})$".format(_COMPLETE_VERSION))
+_TILDE = re.compile("(?i)^~(?!=)({})$".format(_COMPLETE_VERSION))
+_TILDE_PEP440 = re.compile("(?i)^~=({})$".format(_COMPLETE_VERSION))
+_X = re.compile(r"^(!=|==)?\s*v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:\.[xX*])+$")
+_BASIC = re.compile(r"(?i)^(<>|!=|>=?|<=?|==?)?\s*({}|dev)".format(_COMPLETE_VERSION))
+
+
+def _regex_parse_constraint(constraints):
+    if constraints == "*":
+        return VersionRange()
+
+    or_groups = []
+    for or_constraint in re.split(r"\s*\|\|?\s*", constraints.strip()):
+        and_constraints = re.split(
+            "(?<!^)(?<![=>< ,]) *(?<!-)[, ](?!-) *(?!,|$)", or_constraint
+        )
+        constraint = _regex_parse_single_constraint(and_constraints[0])
+        for and_constraint in and_constraints[1:]:
+            constraint = constraint.intersect(
+                _regex_parse_single_constraint(and_constraint)
+            )
+        or_groups.append(constraint)
+
+    if len(or_groups) == 1:
+        return or_groups[0]
+    return VersionUnion.of(*or_groups)
+
+
+def _regex_parse_single_constraint(constraint):
+    if re.match(r"(?i)^v?[xX*](\.[xX*])*$", constraint):
+        return VersionRange()
+
+    m = _TILDE.match(constraint)
+    if m:
+        version = Version.parse(m.group(1))
+        high = version.stable.next_minor
+        if len(m.group(1).split(".")) == 1:
+            high = version.stable.next_major
+        return VersionRange(
+            version, high, include_min=True, always_include_max_prerelease=True
+        )
+
+    m = _TILDE_PEP440.match(constraint)
+    if m:
+        precision = 1
+        if m.group(3):
+            precision += 1
+            if m.group(4):
+                precision += 1
+        version = Version.parse(m.group(1))
+        if precision == 2:
+            low = version
+            high = version.stable.next_major
+        else:
+            low = Version(version.major, version.minor, version.patch)
+            high = version.stable.next_minor
+        return VersionRange(
+            low, high, include_min=True, always_include_max_prerelease=True
+        )
+
+    m = _CARET.match(constraint)
+    if m:
+        version = Version.parse(m.group(1))
+        return VersionRange(
+            version,
+            version.next_breaking,
+            include_min=True,
+            always_include_max_prerelease=True,
+        )
+
+    m = _X.match(constraint)
+    if m:
+        major = int(m.group(2))
+        if m.group(3) is not None:
+            version = Version(major, int(m.group(3)), 0)
+            result = VersionRange(
+                version,
+                version.next_minor,
+                include_min=True,
+                always_include_max_prerelease=True,
+            )
+        elif major == 0:
+            result = VersionRange(max=Version(1, 0, 0))
+        else:
+            version = Version(major, 0, 0)
+            result = VersionRange(
+                version,
+                version.next_major,
+                include_min=True,
+                always_include_max_prerelease=True,
+            )
+        if m.group(1) == "!=":
+            result = VersionRange().difference(result)
+        return result
+
+    m = _BASIC.match(constraint)
+    if m:
+        op = m.group(1)
+        version = m.group(2)
+        if version == "dev":
+            version = "0.0-dev"
+        version = Version.parse(version)
+        if op == "<":
+            return VersionRange(max=version)
+        elif op == "<=":
+            return VersionRange(max=version, include_max=True)
+        elif op == ">":
+            return VersionRange(min=version)
+        elif op == ">=":
+            return VersionRange(min=version, include_min=True)
+        elif op == "!=":
+            return VersionUnion(VersionRange(max=version), VersionRange(min=version))
+        return version
+
+    raise ValueError("Could not parse version constraint: {}".format(constraint))
+
+
+def _outcome(parse, constraints):
+    try:
+        result = parse(constraints)
+    except ValueError:
+        return "ValueError"
+    if result.is_empty():
+        # empty constraints are all alike, but don't compare equal
+        return "EmptyConstraint"
+    # the text a version was read from is part of how it is shown
+    return type(result).__name__, str(result), result
+
+
+_PIECES = [
+    "1", "2", "0", "10", "1.2", "1.2.3", "1.2.3.4", "1.2.3.4.5", "v1", "V2", "x", "X",
+    "*", ".", ".x", ".*", "-", "_", "+", "a", "b", "rc", "RC", "beta", "post", "dev",
+    "pre", "pl", "patch", "alpha", "c", "p", "g", "build", "a1", ".1", "-1", "+local",
+    "^", "~", "~=", ">", ">=", "<", "<=", "=", "==", "!=", "<>", " ", "  ", ",", ", ",
+    " ,", "|", "||", " || ", "\n", "\t", "٣",
+]  # fmt: skip
+
+
+def _corpus(size, seed=7):
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        corpus.append("".join(rng.choices(_PIECES, k=rng.randint(1, 9))))
+    return corpus
+
+
+@pytest.mark.parametrize(
+    "constraints",
+    [
+        "1.0a1.x",
+        "^1.0a1.x",
+        "~=1.0a1.x",
+        "~1.0a1.x",
+        "~=1.2.3.4",
+        "~=1.2",
+        "~=1",
+        "^1.0-beta1.2.3",
+        "^1.0.post1",
+        ">=1.0, <2.0",
+        ">=1.0 ,<2.0",
+        ">=1.0 , <2.0",
+        ">=1.0,,<2.0",
+        ">= 1.0 <2.0",
+        "1.0 - 2.0",
+        "1.0 -2.0",
+        ">=1.0,",
+        ">=1.0 ",
+        ">=1.0,\n",
+        "1.0 || 2.0",
+        "1.0|2.0",
+        "1.0|||2.0",
+        "!= 1.2.*",
+        "==1.2.3.x",
+        "1.2.3.4.x",
+        "v1.x",
+        "V1.x",
+        "dev",
+        ">DEV",
+        "1.0+local build",
+        "٣.1",
+    ],
+)
+def test_parse_constraint_same_as_regular_expressions(constraints):
+    assert _outcome(parse_constraint, constraints) == _outcome(
+        _regex_parse_constraint, constraints
+    )
+
+
+def test_parse_constraint_corpus_same_as_regular_expressions():
+    for constraints in _corpus(20_000):
+        assert _outcome(parse_constraint, constraints) == _outcome(
+            _regex_parse_constraint, constraints
+        ), constraints
+
+
+@pytest.mark.parametrize(
+    "constraints",
+    [
+        "^1.0a" + "1" * 100_000 + "!",
+        "~=1.0a" + "1" * 100_000 + "!",
+        "^1" + ".1" * 100_000 + "!",
+        "1" + " " * 100_000 + "-",
+        ">=1" + " ," * 100_000 + "!",
+    ],
+)
+def test_parse_constraint_linear_time(constraints):
+    start = time.perf_counter()
+    try:
+        parse_constraint(constraints)
+    except ValueError:
+        pass
+    assert time.perf_counter() - start < 5
+
+
+def _specifiers(size, seed=7):
+    # constraints as they are found in projects
+    rng = random.Random(seed)
+    forms = [
+        ">={0}",
+        ">={0},<{1}",
+        "^{0}",
+        "~{0}",
+        "~={0}",
+        "=={0}",
+        "{0}",
+        "{2}.*",
+        "!={0}",
+        ">={0} <{1} || ^{1}",
+        ">={0}rc1",
+    ]
+    specifiers = []
+    for _ in range(size):
+        low = ".".join(str(rng.randint(0, 20)) for _ in range(rng.randint(1, 3)))
+        high = "%d.0" % (int(low.split(".")[0]) + 1)
+        specifiers.append(rng.choice(forms).format(low, high, low.split(".")[0]))
+    return specifiers
+
+
+@pytest.mark.parametrize(
+    "parse",
+    [parse_constraint, _regex_parse_constraint],
+    ids=["parser", "regular-expressions"],
+)
+def test_parse_constraint_benchmark(benchmark, parse):
+    specifiers = _specifiers(2_000 if benchmark.disabled else 100_000)
+
+    def parse_all():
+        for constraints in specifiers:
+            parse(constraints)
+
+    benchmark.pedantic(parse_all, rounds=1)
+
+
+@pytest.mark.parametrize(
+    "parse",
+    [parse_constraint, _regex_parse_constraint],
+    ids=["parser", "regular-expressions"],
+)
+def test_parse_crafted_constraint_benchmark(benchmark, parse):
+    # where the parser wins: the regular expressions take four times as long
+    # for each two digits more, the parser no longer
+    digits = 10 if benchmark.disabled else 18
+    crafted = [
+        "^1.0a" + "1" * digits + "!",
+        "~=1.0a" + "1" * digits + "!",
+        ">=1.0-" + "1" * digits + "!",
+    ]
+
+    def parse_all():
+        for constraints in crafted:
+            try:
+                parse(constraints)
+            except ValueError:
+                pass
+
+    benchmark.pedantic(parse_all, rounds=1)
@@ -163,3 +163,62 @@ def test_difference():
     assert (
         v.difference(VersionRange(Version.parse("1.4.0"), Version.parse("3.0.0"))) == v
     )
+
+
+@pytest.mark.parametrize(
+    "input",
+    ["0", "1", "1.2", "1.2.3", "1.2.3.4", "01.002", "2024.10.19", "1.0.0.0"],
+)
+def test_parse_numeric_fast_path(input):
+    parsed = Version.parse(input)
+    expected = Version._parse_complete(input)
+
+    assert parsed == expected
+    assert parsed.text == expected.text
+    assert parsed.precision == expected.precision
+    assert (parsed.prerelease, parsed.build) == (expected.prerelease, expected.build)
+    assert str(parsed.next_minor) == str(expected.next_minor)
+    assert hash(parsed) == hash(expected)
+
+
+@pytest.mark.parametrize(
+    "input", ["1.2.3.4.5", "1.", "1..2", "v1.2", "1.2a1", "１.２", "1.2+3"]
+)
+def test_parse_outside_fast_path(input):
+    parsed = Version.parse(input)
+    expected = Version._parse_complete(input)
+
+    assert parsed == expected
+    assert parsed.text == expected.text
+    assert parsed.precision == expected.precision
+
+
+def test_parse_subclass():
+    class Release(Version):
+        pass
+
+    assert type(Release.parse("1.2.3")) is Release
+    assert type(Release.parse("1.2.3rc1")) is Release
+
+
+def _corpus(size):
+    # mostly plain releases, as found in requirements, with some pre-releases
+    corpus = []
+    for i in range(size):
+        version = "%d.%d.%d" % (i % 7, i % 13, i % 29)
+        if i % 20 == 0:
+            version += "rc%d" % (i % 3)
+        corpus.append(version)
+    return corpus
+
+
+@pytest.mark.parametrize("parse", [Version.parse, Version._parse_complete])
+def test_parse_benchmark(benchmark, parse):
+    # a million versions make for a meaningful timing, but take a while
+    corpus = _corpus(10_000 if benchmark.disabled else 1_000_000)
+
+    def parse_all():
+        for text in corpus:
+            parse(text)
+
+    benchmark.pedantic(parse_all, rounds=1)
@@ -0,0 +1,140 @@
+import pytest
+
+from requirements_detector import pyproject
+from requirements_detector.detect import from_pyproject_toml
+from requirements_detector.pyproject import load_dependency_tables
+
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
+_DEPENDENCIES = """\
+[build-system]
+requires = ["poetry-core>=1.0"]
+
+[project]
+name = "example"
+dependencies = [
+    "requests>=2.0",
+    "attrs",
+]
+
+[project.optional-dependencies]
+argon2 = ["argon2-cffi"]
+
+[tool.poetry.dependencies]
+python = "^3.10"
+django = { version = "^4.2", extras = ["argon2"] }
+
+[tool.poetry.group.dev.dependencies]
+pytest = ">=7"
+"""
+
+_TOOL_CONFIGURATION = '''\
+[tool.black]
+line-length = 88
+extend-exclude = """
+[tool.poetry.dependencies]
+evil = "1.0"
+"""
+
+[tool.isort]
+profile = 'black'
+known_first_party = ['[not.a.header]']
+
+[tool.mypy]
+strict = true # [tool.poetry.dependencies]
+
+[[tool.mypy.overrides]]
+module = [
+    "tests.*",
+]
+ignore_missing_imports = true
+
+[tool.pytest.ini_options]
+markers = [
+["nested"],
+]
+filterwarnings = [
+    "ignore::DeprecationWarning",
+]
+'''
+
+
+def _wanted(parsed):
+    wanted = {key: parsed[key] for key in ("project", "build-system") if key in parsed}
+    if "poetry" in parsed.get("tool", {}):
+        wanted["tool"] = {"poetry": parsed["tool"]["poetry"]}
+    return wanted
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        _DEPENDENCIES,
+        _TOOL_CONFIGURATION + _DEPENDENCIES,
+        _DEPENDENCIES + _TOOL_CONFIGURATION,
+        (_TOOL_CONFIGURATION + _DEPENDENCIES).replace("\n", "\r\n"),
+        "[tool.poetry]\nname = 'x'\n\n[tool.poetry.dependencies]\nrequests = '*'\n",
+        "",
+        _TOOL_CONFIGURATION,
+    ],
+)
+def test_same_tables_as_full_parse(document):
+    data = document.encode("utf-8")
+    assert pyproject._sections(data) is not None
+    assert load_dependency_tables(data) == _wanted(tomllib.loads(document))
+
+
+@pytest.mark.parametrize(
+    "document",
+    [
+        # keys outside any table which may be part of the wanted ones
+        'project.dependencies = ["requests"]\n' + _TOOL_CONFIGURATION,
+        "[tool]\npoetry.dependencies.requests = '*'\n" + _TOOL_CONFIGURATION,
+        "[tool]\npoetry = { dependencies = { requests = '*' } }\n",
+        # headers with quoted keys
+        '[tool."poetry".dependencies]\nrequests = "*"\n',
+    ],
+)
+def test_full_parse_when_tables_cannot_be_cut_out(document, monkeypatch):
+    data = document.encode("utf-8")
+    loads = []
+    monkeypatch.setattr(pyproject, "_loads", lambda data: loads.append(data) or {})
+    load_dependency_tables(data)
+    assert loads == [data]
+    monkeypatch.undo()
+
+    assert _wanted(load_dependency_tables(data)) == _wanted(tomllib.loads(document))
+
+
+def test_unterminated_string_parsed_in_full():
+    with pytest.raises(tomllib.TOMLDecodeError):
+        load_dependency_tables(b'[tool.black]\nexclude = "oops\n[project]\n')
+
+
+def _large_pyproject(path, tools=200):
+    with path.open("w") as f:
+        for i in range(tools):
+            f.write(_TOOL_CONFIGURATION.replace("[tool.", "[tool.t%d." % i))
+            f.write("\n")
+        f.write(_DEPENDENCIES)
+    return path
+
+
+def test_large_pyproject(tmp_path):
+    path = _large_pyproject(tmp_path / "pyproject.toml")
+    assert load_dependency_tables(path.read_bytes()) == _wanted(
+        tomllib.loads(path.read_text())
+    )
+    assert len(from_pyproject_toml(path)) == 5
+
+
+@pytest.mark.parametrize("targeted", [True, False], ids=["tables", "tomllib"])
+def test_pyproject_benchmark(tmp_path, benchmark, monkeypatch, targeted):
+    path = _large_pyproject(tmp_path / "pyproject.toml")
+    if not targeted:
+        monkeypatch.setattr(pyproject, "_sections", lambda data: None)
+    result = benchmark(from_pyproject_toml, path)
+    assert len(result) == 5
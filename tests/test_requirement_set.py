@@ -0,0 +1,115 @@
+from pathlib import Path
+
+from requirements_detector import RequirementSet, find_requirements
+from requirements_detector.poetry_semver import Version
+from requirements_detector.requirement import DetectedRequirement
+
+
+def _req(line, location=None):
+    return DetectedRequirement.parse(line, Path(location) if location else None)
+
+
+def test_keyed_by_canonical_name():
+    reqs = RequirementSet(
+        [_req("Django>=4", "requirements.txt"), _req("django<5", "base.txt")]
+    )
+    assert len(reqs) == 1
+    assert "DJANGO" in reqs
+    assert _req("Django") in reqs
+    assert "flask" not in reqs
+    assert reqs["django"].name == "Django"
+    assert reqs["Django"].version_specs == [(">=", "4"), ("<", "5")]
+    assert reqs.locations("django") == [Path("requirements.txt"), Path("base.txt")]
+    assert reqs.sources("django") == [_req("Django>=4"), _req("django<5")]
+
+
+def test_separator_normalisation():
+    reqs = RequirementSet([_req("zope.interface"), _req("Zope_Interface==5.0")])
+    assert len(reqs) == 1
+    assert reqs["zope-interface"].version_specs == [("==", "5.0")]
+
+
+def test_same_requirement_twice_from_one_file():
+    reqs = RequirementSet(
+        [
+            _req("six==1.0", "a.txt"),
+            _req("six==1.0", "a.txt"),
+            _req("six==1.0", "b.txt"),
+        ]
+    )
+    assert reqs.locations("six") == [Path("a.txt"), Path("b.txt")]
+    assert reqs["six"].version_specs == [("==", "1.0")]
+
+
+def test_constraint():
+    reqs = RequirementSet(
+        [_req("Django>=4"), _req("django<5"), _req("six"), _req("odd===1.0")]
+    )
+    constraint = reqs.constraint("django")
+    assert constraint.allows(Version.parse("4.2"))
+    assert not constraint.allows(Version.parse("5.0"))
+    assert reqs.constraint("six").is_any()
+    assert reqs.constraint("odd") is None
+
+
+def test_different_markers():
+    reqs = RequirementSet(
+        [
+            _req('pkg>=2; sys_platform == "win32"', "a.txt"),
+            _req('pkg<2; sys_platform == "linux"', "b.txt"),
+            _req('pkg!=2.5; sys_platform == "win32"', "c.txt"),
+        ]
+    )
+    # each applies somewhere the other does not, so neither narrows the other
+    assert [(e.version_specs, e.markers) for e in reqs.entries("pkg")] == [
+        ([(">=", "2"), ("!=", "2.5")], 'sys_platform == "win32"'),
+        ([("<", "2")], 'sys_platform == "linux"'),
+    ]
+    assert list(reqs) == reqs.entries("pkg")
+    assert len(reqs) == 2
+    assert reqs["pkg"].markers == 'sys_platform == "win32"'
+    assert reqs.constraint("pkg").allows(Version.parse("3"))
+
+
+def test_merge_and_difference():
+    first = RequirementSet([_req("Django>=4"), _req("six")])
+    second = RequirementSet([_req("django<5"), _req("requests")])
+
+    merged = first | second
+    assert sorted(r.name for r in merged) == ["Django", "requests", "six"]
+    assert merged["django"].version_specs == [(">=", "4"), ("<", "5")]
+    # the operands are left alone
+    assert first["django"].version_specs == [(">=", "4")]
+
+    assert [r.name for r in first - second] == ["six"]
+    assert [r.name for r in second.difference(first)] == ["requests"]
+
+
+def test_group_and_extra():
+    dev = DetectedRequirement(name="pytest", group="dev")
+    main = DetectedRequirement(name="pytest")
+    assert RequirementSet([dev])["pytest"].group == "dev"
+    assert RequirementSet([dev, main])["pytest"].group is None
+
+
+def test_url_requirements():
+    url = DetectedRequirement(url="https://example.com/thing.tar.gz")
+    reqs = RequirementSet([url, _req("six")])
+    assert len(reqs) == 2
+    assert url in reqs
+    assert list(reqs)[0] is url
+
+
+def test_find_requirements_as_set(tmp_path):
+    (tmp_path / "requirements.txt").write_text("Django>=4\n")
+    (tmp_path / "requirements").mkdir()
+    (tmp_path / "requirements" / "base.txt").write_text("django<5\nsix\n")
+
+    assert len(find_requirements(tmp_path)) == 3
+    reqs = find_requirements(tmp_path, as_set=True)
+    assert len(reqs) == 2
+    assert sorted(reqs["django"].version_specs) == [("<", "5"), (">=", "4")]
+    assert sorted(reqs.locations("django")) == [
+        tmp_path / "requirements" / "base.txt",
+        tmp_path / "requirements.txt",
+    ]
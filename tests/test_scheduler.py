@@ -0,0 +1,157 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from requirements_detector.detect import find_requirements
+from requirements_detector.exceptions import RequirementsNotFound
+from requirements_detector.pipeline import (
+    SOURCES,
+    Pipeline,
+    Source,
+    _discover,
+    _Project,
+)
+from requirements_detector.requirement import DetectedRequirement
+from requirements_detector.scheduler import CostModel, RootTiming, Scheduler
+from requirements_detector.tree import FilesystemTree, SourceTree
+
+_TEST_DIR = Path(__file__).parent / "detection"
+_PROJECTS = sorted(path for path in _TEST_DIR.iterdir() if path.is_dir())
+
+
+class _SlowSource(Source):
+    # takes as many seconds to parse as the file says
+    name = "slow"
+
+    def discover(self, tree, root_files, options):
+        return ["slow"] if "slow" in root_files else []
+
+    def parse(self, data, name, tree, options):
+        time.sleep(float(data))
+        return [DetectedRequirement.parse("attrs", tree.location(name))]
+
+
+class _UnsizedTree(FilesystemTree):
+    def size(self, name):
+        return SourceTree.size(self, name)
+
+
+class _UnstatTree(FilesystemTree):
+    def size(self, name):
+        raise PermissionError(name)
+
+
+def _large_setup_py(path, entries=500):
+    path.mkdir()
+    table = "".join("    'k%d': [%d, 'v%d'],\n" % (i, i, i) for i in range(entries))
+    (path / "setup.py").write_text(
+        "from setuptools import setup\nTABLE = {\n%s}\n"
+        "setup(install_requires=['Django>=4'])\n" % table
+    )
+    return path
+
+
+def test_same_as_find_requirements():
+    for executor, workers in [("thread", 1), ("thread", 3), ("process", 2)]:
+        scheduler = Scheduler(workers=workers, executor=executor)
+        found = {
+            scheduled.result.tree.root: scheduled
+            for scheduled in scheduler.run(FilesystemTree(path) for path in _PROJECTS)
+        }
+        assert sorted(found) == _PROJECTS
+        for path in _PROJECTS:
+            try:
+                expected = find_requirements(path)
+            except RequirementsNotFound:
+                assert isinstance(found[path].result.error, RequirementsNotFound)
+            else:
+                assert found[path].result.requirements == expected
+            assert found[path].timing.root == path
+            assert found[path].timing.seconds > 0
+
+
+def test_longest_first(tmp_path):
+    large = _large_setup_py(tmp_path / "large")
+    roots = _PROJECTS + [large]
+    results = list(Scheduler(workers=1).run(FilesystemTree(root) for root in roots))
+
+    assert results[0].timing.root == large
+    estimates = [scheduled.timing.estimate for scheduled in results]
+    assert estimates == sorted(estimates, reverse=True)
+    assert results[0].timing.features == {
+        "setup.py": (1, (large / "setup.py").stat().st_size)
+    }
+
+
+def test_idle_worker_steals(tmp_path, monkeypatch):
+    monkeypatch.setattr("requirements_detector.pipeline.SOURCES", [_SlowSource()])
+    roots = []
+    for i in range(8):
+        root = tmp_path / str(i)
+        root.mkdir()
+        # every project is estimated the same, but the first takes far longer
+        (root / "slow").write_text("0.50" if i == 0 else "0.01")
+        roots.append(root)
+
+    results = list(Scheduler(workers=2).run(FilesystemTree(root) for root in roots))
+    assert sorted(scheduled.timing.root for scheduled in results) == roots
+    stolen = [scheduled.timing for scheduled in results if scheduled.timing.stolen]
+    assert stolen
+    # while one worker was busy with the slow project, the other took the rest
+    # of its queue
+    assert all(timing.worker == 1 for timing in stolen)
+    assert [s.timing.worker for s in results if s.timing.root == roots[0]] == [0]
+
+
+def test_estimate_without_sizes():
+    model = CostModel()
+    path = _TEST_DIR / "test1"
+    sized = _discover(SOURCES, _Project(FilesystemTree(path), Pipeline().options))
+    unsized = _discover(SOURCES, _Project(_UnsizedTree(path), Pipeline().options))
+
+    size = (path / "requirements.txt").stat().st_size
+    assert model.features(sized) == {"requirements": (1, size)}
+    assert model.features(unsized) == {"requirements": (1, CostModel.TYPICAL_SIZE)}
+    assert model.estimate({}) == model.base
+
+
+def test_estimate_of_vanished_file(tmp_path):
+    (tmp_path / "requirements.txt").write_text("six\n")
+    project = _discover(SOURCES, _Project(FilesystemTree(tmp_path), Pipeline().options))
+    (tmp_path / "requirements.txt").unlink()
+
+    features = CostModel().features(project)
+    assert features == {"requirements": (1, CostModel.TYPICAL_SIZE)}
+
+    # the other projects are still scanned
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / "requirements.txt").write_text("six\n")
+    results = Scheduler(workers=1).run([FilesystemTree(tmp_path), _UnstatTree(other)])
+    errors = {s.timing.root: s.result.error for s in results}
+    assert isinstance(errors[tmp_path], RequirementsNotFound)
+    assert errors[other] is None
+
+
+def test_tuned():
+    model = CostModel()
+    features = {"setup.py": (1, 10_000), "requirements": (1, 100)}
+    estimate = model.estimate(features)
+    timings = [
+        RootTiming(Path(str(i)), estimate, estimate * ratio, features)
+        for i, ratio in enumerate([2, 3, 100])
+    ]
+
+    tuned = model.tuned(timings)
+    assert tuned.weights["setup.py"] == pytest.approx(
+        tuple(weight * 3 for weight in model.weights["setup.py"])
+    )
+    # none of the projects were dominated by it
+    assert "requirements" not in tuned.weights
+    assert model.weights == CostModel.DEFAULT_WEIGHTS
+
+
+def test_unknown_executor():
+    with pytest.raises(ValueError):
+        Scheduler(executor="cluster")
@@ -0,0 +1,82 @@
+import gc
+from unittest import mock
+
+from astroid import MANAGER
+
+from requirements_detector.handle_setup import (
+    SetupModuleCache,
+    _build,
+    _ReadOnlyBuilder,
+    from_setup_py,
+)
+
+_SOAK_FILES = 10000
+# a parsed setup.py alone is a few hundred objects, so anything kept per file
+# shows up in the thousands
+_SOAK_ALLOWANCE = 500
+
+
+def _write_setup_files(directory, count):
+    files = []
+    for i in range(count):
+        # a hundred setup.py files per project directory, sharing its helpers
+        project = directory / f"project{i // 100}"
+        if not project.exists():
+            project.mkdir()
+            for n in range(5):
+                (project / f"deps{n}.py").write_text(f"REQUIRES = ['shared{n}>=1.0']\n")
+
+        if i % 3 == 0:
+            body = f"from deps{i % 5} import REQUIRES\n"
+        elif i % 3 == 1:
+            body = f"from email.mime.text import *\nREQUIRES = ['package{i}==1.{i}']\n"
+        else:
+            body = f"REQUIRES = ['package{i}=={i}.0', 'other>={i}']\n"
+        setup_file = project / f"setup{i}.py"
+        setup_file.write_text(
+            "from setuptools import setup\n"
+            + body
+            + "setup(name='project', install_requires=REQUIRES)\n"
+        )
+        files.append(setup_file)
+    return files
+
+
+def test_astroid_cache_is_left_alone(tmp_path):
+    files = _write_setup_files(tmp_path, 6)
+    from_setup_py(files[0])
+    cached = set(MANAGER.astroid_cache)
+    for setup_file in files:
+        assert from_setup_py(setup_file)
+    assert set(MANAGER.astroid_cache) == cached
+    assert "email.mime.text" not in cached
+
+
+def test_wildcard_import_hook_is_called():
+    # if astroid stops calling it, wildcard imports are followed again
+    with mock.patch.object(
+        _ReadOnlyBuilder, "add_from_names_to_locals", autospec=True
+    ) as hook:
+        _build("from email.mime.text import *\nX = 1\n")
+    assert [call.args[1].modname for call in hook.call_args_list] == ["email.mime.text"]
+
+
+def test_soak_memory_is_flat(tmp_path, benchmark):
+    files = _write_setup_files(tmp_path, _SOAK_FILES)
+    cache = SetupModuleCache()
+
+    def scan(setup_files):
+        for setup_file in setup_files:
+            from_setup_py(setup_file, cache)
+            cache.clear()
+
+    # warm up whatever the interpreter and astroid set up once
+    scan(files[:500])
+    gc.collect()
+
+    before = len(gc.get_objects())
+    benchmark.pedantic(scan, args=(files[500:],), rounds=1, iterations=1)
+    gc.collect()
+    after = len(gc.get_objects())
+
+    assert after - before < _SOAK_ALLOWANCE
@@ -0,0 +1,84 @@
+from pathlib import Path
+from unittest import mock
+
+import pytest
+
+from requirements_detector.detect import find_requirements
+from requirements_detector.exceptions import CouldNotParseRequirements
+from requirements_detector.requirement import DetectedRequirement
+from requirements_detector.setup_pool import SetupPyPool
+
+_TEST_DIR = Path(__file__).parent / "detection"
+
+
+def _expected(*requirements):
+    return sorted(DetectedRequirement.parse(req) for req in requirements)
+
+
+@pytest.fixture
+def pool():
+    with SetupPyPool(workers=2, timeout=10, max_files_per_worker=3) as pool:
+        yield pool
+
+
+def test_parses_like_from_setup_py(pool):
+    for name in ("simple.py", "in_file.py", "tuple.py", "utf8.py"):
+        reqs = pool.from_setup_py(_TEST_DIR / "test4" / name)
+        assert sorted(reqs) == _expected("Django==1.5.0", "django-gubbins==1.1.2")
+
+
+def test_unparseable(pool):
+    with pytest.raises(CouldNotParseRequirements):
+        pool.from_setup_py(_TEST_DIR / "test4/callable.py")
+    with pytest.raises(CouldNotParseRequirements):
+        pool.from_setup_py(_TEST_DIR / "syntax_error/setup.py")
+
+
+def test_imported_constants(pool):
+    reqs = pool.from_setup_py(str(_TEST_DIR / "test13/service_c/setup.py"))
+    assert sorted(reqs) == _expected("Django==1.5.0", "django-gubbins==1.1.2")
+
+
+def test_recursion_error_is_contained(pool):
+    source = "x = " + "+".join(["a"] * 50000) + "\nsetup(install_requires=['a'])\n"
+    with pytest.raises(CouldNotParseRequirements):
+        pool.parse(source, Path("setup.py"))
+    assert pool.parse("setup(install_requires=['a'])", Path("setup.py"))
+
+
+def test_size_budget():
+    with SetupPyPool(workers=1, max_size=10) as pool:
+        with pytest.raises(CouldNotParseRequirements):
+            pool.from_setup_py(_TEST_DIR / "test4/simple.py")
+
+
+def test_timeout_replaces_worker():
+    source = "X = [%s]\nsetup(install_requires=X)\n" % ",".join(
+        repr(f"package-{i}==1.0") for i in range(50000)
+    )
+    with SetupPyPool(workers=1, timeout=0.01) as pool:
+        worker = pool._workers[0]
+        with pytest.raises(CouldNotParseRequirements):
+            pool.parse(source, Path("setup.py"))
+        assert pool._workers[0] is not worker
+        assert not worker.process.is_alive()
+
+        pool.timeout = 10
+        assert len(pool.parse(source, Path("setup.py"))) == 50000
+
+
+def test_workers_are_recycled(pool):
+    first = list(pool._workers)
+    for _ in range(6):
+        pool.from_setup_py(_TEST_DIR / "test4/simple.py")
+    assert not any(worker in pool._workers for worker in first)
+
+
+def test_find_requirements(pool):
+    # setup.py files are never parsed in this process when given a pool
+    with mock.patch(
+        "requirements_detector.pipeline._from_setup_source",
+        side_effect=AssertionError("setup.py was parsed in-process"),
+    ):
+        reqs = find_requirements(_TEST_DIR / "test13/service_c", setup_pool=pool)
+    assert reqs == _expected("Django==1.5.0", "django-gubbins==1.1.2")